@@ -0,0 +1,161 @@
+"""Compare parse_date_str with the original regex-then-dateutil version.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_dates [--rounds N]
+
+Both parsers read a corpus of date phrases as they appear in syllabi and
+user messages. Results that differ are listed (the legacy parser misreads
+some of them) before timings for the legacy parser, the grammar with its
+cache cleared, and the cached grammar.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import re
+import time
+from typing import Callable, List, Optional
+
+from dateutil import parser as date_parser
+
+from manager.tools import utils
+from manager.tools.utils import WEEKDAYS, parse_date_str
+
+TODAY = dt.date(2026, 9, 8)
+
+CORPUS: List[str] = [
+    "Midterm 1: October 14, 2026",
+    "Midterm exam on Oct 14",
+    "Midterm II - Wednesday, November 4th, 2026 (in class)",
+    "Final exam: December 15, 2026, 9:00-12:00",
+    "Exam date 2026-10-21",
+    "MA 201 on 2026-11-02",
+    "CS 101 midterm Nov 2 2026",
+    "The midterm will be held on 12 October 2026 in room B201",
+    "Quiz 3 is due the 5th of October",
+    "Reading week: Oct 12 - Oct 16 (no classes)",
+    "Assignment 2 due Sept 30 at 11:59 pm",
+    "Project proposal due Sep. 25",
+    "Lab report due 3 Nov",
+    "midterm is tomorrow",
+    "start today",
+    "exam in 10 days",
+    "exam in two weeks",
+    "my exam is 3 weeks from now",
+    "next friday",
+    "I have a test next Monday morning",
+    "it was 2 days ago",
+    "Final: Dec 9",
+    "Term test 2 — March 3rd",
+    "STAT 230 final exam April 22, 2027",
+    "Midterm: Thursday Oct. 29th",
+    "Exam period: December 7-19",
+    "PHYS 121 Midterm 2026/10/20 18:30",
+    "Week 6 (Oct 13): Midterm review",
+    "Problem set 4 released Oct 1, due Oct 8",
+    "The final is scheduled for the 18th of December, 2026.",
+    "SYSD 300 exam on 2026-12-03",
+    "ECON 101 midterm: 10/28/2026",
+    "Due: Friday, Nov 20, 2026 by 5pm",
+    "Presentations in 4 weeks",
+    "Deadline is next Wednesday",
+    "Midterm 2 Nov 14",
+    "Lecture 3 November 4, 2026",
+    "section 12 Dec 3",
+    "SYSD 300 course outline: Midterm 1 Oct 28",
+]
+
+
+def legacy_parse_date_str(text: str, today: Optional[dt.date] = None) -> Optional[dt.date]:
+    """The original parse_date_str."""
+    if not text:
+        return None
+    if today is None:
+        today = dt.date.today()
+
+    t = text.lower()
+
+    if "today" in t:
+        return today
+    if "tomorrow" in t:
+        return today + dt.timedelta(days=1)
+    if "yesterday" in t:
+        return today - dt.timedelta(days=1)
+
+    for pattern in [
+        r"in\s+(\d+)\s+days?",
+        r"(\d+)\s+days?\s+from\s+now",
+        r"(\d+)\s+days?\s+from\s+today",
+    ]:
+        m = re.search(pattern, t)
+        if m:
+            return today + dt.timedelta(days=int(m.group(1)))
+
+    for pattern in [
+        r"(\d+)\s+days?\s+ago",
+        r"(\d+)\s+days?\s+before\s+today",
+    ]:
+        m = re.search(pattern, t)
+        if m:
+            return today - dt.timedelta(days=int(m.group(1)))
+
+    m = re.search(r"next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)", t)
+    if m:
+        target = WEEKDAYS.index(m.group(1))
+        days_ahead = (target - today.weekday() + 7) % 7
+        if days_ahead == 0:
+            days_ahead = 7
+        return today + dt.timedelta(days=days_ahead)
+
+    try:
+        default_dt = dt.datetime.combine(today, dt.time())
+        parsed = date_parser.parse(text, fuzzy=True, default=default_dt)
+    except Exception:
+        return None
+
+    parsed_date = parsed.date()
+    has_year = re.search(r"\b\d{4}\b", text) is not None
+    if not has_year and parsed_date < today:
+        parsed_date = parsed_date.replace(year=parsed_date.year + 1)
+
+    return parsed_date
+
+
+def _uncached(text: str, today: dt.date) -> Optional[dt.date]:
+    utils._parse_date_cached.cache_clear()
+    return parse_date_str(text, today)
+
+
+def _time(fn: Callable, rounds: int) -> float:
+    began = time.perf_counter()
+    for _ in range(rounds):
+        for text in CORPUS:
+            fn(text, TODAY)
+    return (time.perf_counter() - began) / (rounds * len(CORPUS))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"today: {TODAY.isoformat()}, phrases: {len(CORPUS)}")
+    for text in CORPUS:
+        old = legacy_parse_date_str(text, TODAY)
+        new = _uncached(text, TODAY)
+        if old != new:
+            print(f"  differs: {text!r}: legacy {old}, grammar {new}")
+
+    legacy = _time(legacy_parse_date_str, args.rounds)
+    for label, fn in (
+        ("legacy", legacy_parse_date_str),
+        ("grammar", _uncached),
+        ("cached", parse_date_str),
+    ):
+        seconds = legacy if fn is legacy_parse_date_str else _time(fn, args.rounds)
+        print(f"{label + ':':9} {seconds * 1e6:8.1f} us/phrase  ({legacy / seconds:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Estimate what the server-side CSV path saves over a model-written CSV.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_plan_export [--weeks 2 4 8 16] [--courses N]
+                                           [--tokens-per-second T]
+
+For each plan length a plan is built and exported by the generate_plan code
+path (solver, columnar plan, streamed CSV export), and timed. The model-
+written path emits the CSV twice in output tokens (in its reply and again as
+the export_plan `content` argument); its cost is estimated from the CSV size
+at CHARS_PER_TOKEN characters per token and the given decode rate. Live
+numbers per agent are recorded in session state as `_model_metrics`.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from manager.tools.export_plan import write_export
+from manager.tools.generate_plan import focus_labels
+from manager.tools.model_metrics import CHARS_PER_TOKEN
+from manager.tools.plan_solver import solve_plan
+from manager.tools.study_plan import StudyPlan
+
+
+def build_and_export(specs: list, start: dt.date, directory: Path) -> dict:
+    solved = solve_plan(specs, start, {"sunday"}, 4.0)
+    plan = StudyPlan.from_rows(solved["plan"])
+    return write_export(directory, "csv", lambda sink: plan.write_csv(sink, focus=focus_labels(plan)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weeks", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--courses", type=int, default=5)
+    parser.add_argument("--tokens-per-second", type=float, default=150.0)
+    args = parser.parse_args()
+
+    start = dt.date(2026, 9, 1)
+    print(
+        f"{'weeks':>5} {'rows':>6} {'csv chars':>10} {'llm out tok':>12} "
+        f"{'llm est s':>10} {'fast out tok':>13} {'fast ms':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for weeks in args.weeks:
+            horizon = weeks * 7
+            specs = [
+                (
+                    f"COURSE {100 + k}",
+                    start + dt.timedelta(days=horizon - k * horizon // (2 * args.courses)),
+                    round(horizon * 0.5, 1),
+                )
+                for k in range(args.courses)
+            ]
+            began = time.perf_counter()
+            written = build_and_export(specs, start, Path(tmp))
+            fast_ms = (time.perf_counter() - began) * 1000
+            text = Path(written["path"]).read_text(encoding="utf-8")
+            rows = text.count("\n") - 1
+            llm_tokens = 2 * -(-len(text) // CHARS_PER_TOKEN)
+            call_args = {
+                "courses": [
+                    {"code": code, "exam_date": exam.isoformat(), "hours": hours}
+                    for code, exam, hours in specs
+                ],
+                "daily_max_hours": 4.0,
+                "days_off": ["sunday"],
+                "start_date": start.isoformat(),
+            }
+            fast_tokens = -(-len(json.dumps(call_args)) // CHARS_PER_TOKEN)
+            print(
+                f"{weeks:>5} {rows:>6} {len(text):>10} {llm_tokens:>12} "
+                f"{llm_tokens / args.tokens_per_second:>10.1f} {fast_tokens:>13} {fast_ms:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Compare the study-plan allocators with the original day-by-day version.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_planning [--profiles N] [--seed S]
+
+Every generated profile is planned by each implementation (the NumPy batch
+engine only when NumPy is installed); the outputs must match exactly before
+any timings are reported.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import random
+import time
+from typing import Any, Dict, List, Sequence
+
+from manager.tools import planning
+from manager.tools.planning import WEEKDAYS, CourseSpec, allocate_plan, allocate_plans
+
+
+def legacy_allocate_plan(
+    specs: Sequence[CourseSpec],
+    start_date: dt.date,
+    days_off: set[str],
+    daily_max: float,
+) -> List[Dict[str, Any]]:
+    """The original build_plan loop, with STATE replaced by arguments."""
+    courses = {
+        code: {"exam_date": exam.isoformat(), "estimated_hours": hours}
+        for code, exam, hours in specs
+    }
+    last_exam = max(dt.date.fromisoformat(c["exam_date"]) for c in courses.values())
+    end_date = last_exam - dt.timedelta(days=1)
+    if end_date < start_date:
+        end_date = start_date
+
+    remaining = {code: float(c["estimated_hours"]) for code, c in courses.items()}
+
+    plan: List[Dict[str, Any]] = []
+    for day in _date_range(start_date, end_date):
+        if WEEKDAYS[day.weekday()] in days_off:
+            continue
+
+        active = [
+            code
+            for code, course in courses.items()
+            if dt.date.fromisoformat(course["exam_date"]) > day and remaining[code] > 0
+        ]
+        if not active:
+            continue
+
+        targets: Dict[str, float] = {}
+        total_target = 0.0
+        for code in active:
+            exam_date = dt.date.fromisoformat(courses[code]["exam_date"])
+            days_left = _remaining_days(day, exam_date, days_off)
+            target = remaining[code] / max(days_left, 1)
+            targets[code] = target
+            total_target += target
+
+        scale = 1.0
+        if total_target > daily_max:
+            scale = daily_max / total_target
+
+        tasks = []
+        for code, target in targets.items():
+            hours = round(target * scale, 2)
+            if hours <= 0:
+                continue
+            remaining[code] = round(remaining[code] - hours, 2)
+            tasks.append({"course": code, "hours": hours})
+
+        total_hours = round(sum(t["hours"] for t in tasks), 2)
+        plan.append({"date": day.isoformat(), "tasks": tasks, "total_hours": total_hours})
+
+    return plan
+
+
+def _date_range(start: dt.date, end: dt.date) -> List[dt.date]:
+    days = []
+    cur = start
+    while cur <= end:
+        days.append(cur)
+        cur += dt.timedelta(days=1)
+    return days
+
+
+def _remaining_days(start: dt.date, end: dt.date, days_off: set[str]) -> int:
+    count = 0
+    cur = start
+    while cur < end:
+        if WEEKDAYS[cur.weekday()] not in days_off:
+            count += 1
+        cur += dt.timedelta(days=1)
+    return max(count, 1)
+
+
+def make_profiles(count: int, seed: int) -> List[tuple]:
+    rng = random.Random(seed)
+    start = dt.date(2025, 9, 1)
+    profiles = []
+    for _ in range(count):
+        n_courses = rng.randint(1, 10)
+        horizon = rng.randint(7, 120)
+        specs = [
+            (
+                f"C{k:03d}",
+                start + dt.timedelta(days=rng.randint(1, horizon)),
+                round(rng.uniform(2, 60), 1),
+            )
+            for k in range(n_courses)
+        ]
+        days_off = set(rng.sample(WEEKDAYS, rng.randint(0, 2)))
+        daily_max = rng.choice([1.5, 2.0, 3.0, 4.0, 6.0])
+        profiles.append((specs, start, days_off, daily_max))
+    return profiles
+
+
+def _time(fn: Any, profiles: Sequence[tuple]) -> float:
+    began = time.perf_counter()
+    for profile in profiles:
+        fn(*profile)
+    return time.perf_counter() - began
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    profiles = make_profiles(args.profiles, args.seed)
+    expected = [legacy_allocate_plan(*profile) for profile in profiles]
+    for profile, plan in zip(profiles, expected):
+        if allocate_plan(*profile) != plan:
+            raise SystemExit(f"Plans differ for profile {profile!r}")
+    has_numpy = planning.np is not None
+    if has_numpy and allocate_plans(profiles, engine="numpy") != expected:
+        raise SystemExit("NumPy engine plans differ from the legacy plans")
+
+    legacy = _time(legacy_allocate_plan, profiles)
+    print(f"profiles: {len(profiles)} (outputs identical)")
+    _report("legacy", legacy, legacy, len(profiles))
+    _report("python", _time(allocate_plan, profiles), legacy, len(profiles))
+    if has_numpy:
+        began = time.perf_counter()
+        allocate_plans(profiles, engine="numpy")
+        _report("numpy", time.perf_counter() - began, legacy, len(profiles))
+    else:
+        print("numpy:    not installed, skipped")
+
+
+def _report(label: str, seconds: float, baseline: float, count: int) -> None:
+    print(
+        f"{label + ':':9} {seconds * 1000:8.1f} ms  ({count / seconds:8.0f} plans/s, "
+        f"{baseline / seconds:5.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Compare state reads and writes with the original deep-copying accessors.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_state [--courses N] [--materials M] [--calls K]
+
+A session with N courses of M materials each is built twice: once as the
+original nested STATE dict, read and written through copy.deepcopy, and once
+through the versioned state in manager.tools.state. Each accessor is called
+K times. show_state still renders a copy the caller owns; `snapshot` is the
+O(1) read the tools use internally.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import time
+from typing import Any, Callable, Dict
+
+from manager.tools import state
+from manager.tools.session_store import session_scope, snapshot
+
+
+def legacy_state(courses: int, materials: int) -> Dict[str, Any]:
+    return {
+        "courses": {
+            f"C{k:03d}": {
+                "name": "",
+                "materials": [
+                    {"path": f"/notes/C{k:03d}/part{m}.pdf", "pages": 40, "chapters": [1, 2, 3]}
+                    for m in range(materials)
+                ],
+                "exam_date": None,
+                "estimated_hours": None,
+            }
+            for k in range(courses)
+        },
+        "preferences": {"daily_max_hours": 3.0, "days_off": [], "start_date": None},
+        "study_plan": [],
+    }
+
+
+def fill_session(courses: int, materials: int) -> None:
+    state.reset_state()
+    for k in range(courses):
+        code = f"C{k:03d}"
+        state.add_course(code)
+        for m in range(materials):
+            state.add_material(code, f"/notes/{code}/part{m}.pdf", pages=40, chapters=[1, 2, 3])
+
+
+def _time(fn: Callable[[], Any], calls: int) -> float:
+    began = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - began) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=8)
+    parser.add_argument("--materials", type=int, default=300)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    legacy = legacy_state(args.courses, args.materials)
+
+    def legacy_add_course() -> Any:
+        course = legacy["courses"]["C000"]
+        course["name"] = "Algorithms"
+        return copy.deepcopy(course)
+
+    def legacy_set_preferences() -> Any:
+        legacy["preferences"]["daily_max_hours"] = 3.0
+        return copy.deepcopy(legacy["preferences"])
+
+    with session_scope("bench-state"):
+        fill_session(args.courses, args.materials)
+        if state.show_state()["courses"] != {
+            code: dict(course, code=code) for code, course in legacy["courses"].items()
+        }:
+            raise SystemExit("Versioned state differs from the legacy state")
+
+        rows = [
+            ("show_state", lambda: copy.deepcopy(legacy), state.show_state),
+            ("snapshot", lambda: copy.deepcopy(legacy), snapshot),
+            ("add_course", legacy_add_course, lambda: state.add_course("C000", "Algorithms")),
+            (
+                "set_preferences",
+                legacy_set_preferences,
+                lambda: state.set_preferences(daily_max_hours=3.0),
+            ),
+        ]
+        print(
+            f"courses: {args.courses}, materials per course: {args.materials}, "
+            f"calls: {args.calls}"
+        )
+        for label, old, new in rows:
+            old_s = _time(old, args.calls)
+            new_s = _time(new, args.calls)
+            print(
+                f"{label + ':':17} deepcopy {old_s * 1e6:9.1f} us   "
+                f"versioned {new_s * 1e6:8.1f} us  ({old_s / new_s:7.0f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,11 @@ from google.adk.agents.llm_agent import LlmAgent
 
 from .config import MODEL_NAME
 from .tools.sanitize_inline_data import sanitize_inline_data_tool
+from .tools.history_compaction import compact_history_tool
 from .tools.strip_inline_data import strip_inline_data_tool
 from .tools.artifact_memory import artifact_memory_tool
 from .tools.current_date import current_date_tool
+from .tools.preprocess import build_preprocess_tool
 from .sub_agents.ingestion_agent.agent import root_agent as ingestion_agent
 from .sub_agents.estimation_agent.agent import root_agent as estimation_agent
 from .sub_agents.planning_agent.agent import root_agent as planning_agent
@@ -78,10 +80,13 @@ root_agent = LlmAgent(
     model=model,
     instruction=INSTRUCTION,
     tools=[
-        strip_inline_data_tool,
-        sanitize_inline_data_tool,
-        current_date_tool,
-        artifact_memory_tool,
+        build_preprocess_tool(
+            strip_inline_data_tool,
+            sanitize_inline_data_tool,
+            compact_history_tool,
+            current_date_tool,
+            artifact_memory_tool,
+        ),
     ],
     sub_agents=[
         ingestion_agent,
@@ -90,4 +95,4 @@ root_agent = LlmAgent(
         review_agent,
         greeting_agent,
     ],
-)
+)
@@ -11,4 +11,28 @@ load_dotenv(dotenv_path=ENV_PATH)
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 MODEL_NAME = os.getenv("MODEL_NAME", "gemini-3-flash-preview")
 TESSERACT_CMD = os.getenv("TESSERACT_CMD", "")
-POPPLER_PATH = os.getenv("POPPLER_PATH", "")
+POPPLER_PATH = os.getenv("POPPLER_PATH", "")
+CACHE_DIR = Path(os.getenv("CACHE_DIR", "") or Path.cwd() / ".cache")
+DIGEST_CACHE_MAX_BYTES = int(os.getenv("DIGEST_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PDF_EXECUTOR = os.getenv("PDF_EXECUTOR", "thread").strip().lower()
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", "60"))
+UPLOAD_SPILL_BYTES = int(os.getenv("UPLOAD_SPILL_BYTES", str(8 * 1024 * 1024)))
+SPILL_MAX_BYTES = int(os.getenv("SPILL_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(6 * 3600)))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "1000"))
+PLAN_FAST_PATH = os.getenv("PLAN_FAST_PATH", "1").strip().lower() not in ("0", "false", "no")
+# Tokens of context (upload summaries, notes, attachments) preprocessing may
+# add per request; 0 disables the limit. CONTEXT_TOKEN_BUDGETS overrides it
+# per agent, e.g. "ingestion_agent=8000,planning_agent=1500".
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+CONTEXT_TOKEN_BUDGETS = {
+    name.strip(): int(value)
+    for name, _, value in (
+        item.partition("=") for item in os.getenv("CONTEXT_TOKEN_BUDGETS", "").split(",")
+    )
+    if name.strip() and value.strip()
+}
+# User turns sent verbatim; older ones are folded into a short summary
+# (0 keeps every turn).
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "8"))
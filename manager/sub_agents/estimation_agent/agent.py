@@ -4,9 +4,12 @@ from google.adk.agents.llm_agent import LlmAgent
 
 from ...config import MODEL_NAME
 from ...tools.sanitize_inline_data import sanitize_inline_data_tool
+from ...tools.history_compaction import compact_history_tool
 from ...tools.strip_inline_data import strip_inline_data_tool
 from ...tools.artifact_memory import artifact_memory_tool
 from ...tools.current_date import current_date_tool
+from ...tools.preprocess import build_preprocess_tool
+from ...tools.scan_chapters import scan_chapters_tool
 INSTRUCTION = """
 You estimate study hours per course using the available materials and summaries.
 
@@ -18,6 +21,8 @@ Guidelines:
 - If scope is unclear (chapters, topics, pages), ask for clarification.
 - Provide a brief per-course estimate and a total.
 - Be explicit about any assumptions you make.
+- When coverage is given as textbook chapters, call `scan_chapters` with the
+  textbook artifact and chapters to get real page counts before estimating.
 """
 
 model = MODEL_NAME
@@ -27,9 +32,13 @@ root_agent = LlmAgent(
     model=model,
     instruction=INSTRUCTION,
     tools=[
-        strip_inline_data_tool,
-        sanitize_inline_data_tool,
-        current_date_tool,
-        artifact_memory_tool,
+        build_preprocess_tool(
+            strip_inline_data_tool,
+            sanitize_inline_data_tool,
+            compact_history_tool,
+            current_date_tool,
+            artifact_memory_tool,
+        ),
+        scan_chapters_tool,
     ],
 )
@@ -4,7 +4,9 @@ from google.adk.agents.llm_agent import LlmAgent
 
 from ...config import MODEL_NAME
 from ...tools.sanitize_inline_data import sanitize_inline_data_tool
+from ...tools.history_compaction import compact_history_tool
 from ...tools.strip_inline_data import strip_inline_data_tool
+from ...tools.preprocess import build_preprocess_tool
 
 INSTRUCTION = """
 You are a friendly greeting and general Q&A agent.
@@ -28,5 +30,9 @@ root_agent = LlmAgent(
     name="greeting_agent",
     model=model,
     instruction=INSTRUCTION,
-    tools=[strip_inline_data_tool, sanitize_inline_data_tool],
-)
+    tools=[
+        build_preprocess_tool(
+            strip_inline_data_tool, sanitize_inline_data_tool, compact_history_tool
+        )
+    ],
+)
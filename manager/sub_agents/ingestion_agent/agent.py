@@ -5,9 +5,12 @@ from google.adk.agents.llm_agent import LlmAgent
 from ...tools.auto_artifacts import auto_attach_artifacts_tool
 from ...tools.pdf_extract import pdf_extract_tool
 from ...tools.sanitize_inline_data import sanitize_inline_data_tool
+from ...tools.history_compaction import compact_history_tool
 from ...tools.strip_inline_data import strip_inline_data_tool
 from ...tools.artifact_memory import artifact_memory_tool
 from ...tools.current_date import current_date_tool
+from ...tools.preprocess import build_preprocess_tool
+from ...tools.scan_chapters import scan_chapters_tool
 
 from ...config import MODEL_NAME
 INSTRUCTION = """
@@ -37,6 +40,10 @@ Your job:
   parentheses (e.g., "from upload_abcd.pdf"). If the textbook is only listed
   in a course outline, say "listed in the course outline (upload_xxx.pdf)" and
   do not claim the textbook file itself was processed.
+- A recognised course outline arrives as a facts JSON block (course, exams,
+  coverage, textbook, each with the page it came from) instead of page text.
+  Its course, first exam date and coverage are already recorded for planning;
+  report them, citing the file and page (e.g., "upload_abcd.pdf, p. 2").
 - If you cannot tie a detail to a specific uploaded file, omit it and ask the
   user for clarification or the missing document.
 - If a coverage list contains duplicates, deduplicate and keep chapters in
@@ -57,6 +64,10 @@ Your job:
   successfully extracted, and ask the user to re-upload or try again.
 - For very large PDFs, mention that you sample key pages and can re-scan
   specific sections on request.
+- When the user asks about specific chapters of a textbook, or a midterm
+  covers specific chapters, call `scan_chapters` with the textbook artifact
+  and the chapters (e.g. "1-4, 7") instead of guessing from sampled pages.
+  Pass the course code when known so the page count is recorded.
 
 Be concise and natural; do not require strict formats.
 """
@@ -68,11 +79,15 @@ root_agent = LlmAgent(
     model=model,
     instruction=INSTRUCTION,
     tools=[
-        strip_inline_data_tool,
-        sanitize_inline_data_tool,
-        current_date_tool,
-        artifact_memory_tool,
-        pdf_extract_tool,
-        auto_attach_artifacts_tool,
+        build_preprocess_tool(
+            strip_inline_data_tool,
+            sanitize_inline_data_tool,
+            compact_history_tool,
+            current_date_tool,
+            artifact_memory_tool,
+            pdf_extract_tool,
+            auto_attach_artifacts_tool,
+        ),
+        scan_chapters_tool,
     ],
 )
@@ -3,11 +3,16 @@ from __future__ import annotations
 from google.adk.agents.llm_agent import LlmAgent
 from ...tools.export_plan import export_plan_tool
 from ...tools.sanitize_inline_data import sanitize_inline_data_tool
+from ...tools.history_compaction import compact_history_tool
 from ...tools.strip_inline_data import strip_inline_data_tool
 from ...tools.artifact_memory import artifact_memory_tool
 from ...tools.current_date import current_date_tool
+from ...tools.preprocess import build_preprocess_tool
+
+from ...config import MODEL_NAME, PLAN_FAST_PATH
+from ...tools.generate_plan import generate_plan_tool
+from ...tools.model_metrics import record_model_end, record_model_start
 
-from ...config import MODEL_NAME
 INSTRUCTION = """
 You build a clear day-by-day study plan.
 
@@ -27,6 +32,9 @@ Guidelines:
 - Do not schedule study tasks before today's date unless the user explicitly
   asks for a historical schedule. If dates would be in the past, ask to confirm.
 - Use absolute dates (YYYY-MM-DD) for each study day.
+"""
+
+LLM_CSV_STEPS = """
 - Output a CSV with columns: Date, Course, Focus, Hours (one row per task).
 - When the plan is ready, call `export_plan` with format="csv" and the
   CSV content.
@@ -34,17 +42,35 @@ Guidelines:
   they want edits.
 """
 
+FAST_PATH_STEPS = """
+- Once courses, exam dates, daily hours, days off and start date are
+  confirmed, call `generate_plan` with them. Pass hours per course only if
+  the user or the uploaded materials give them; otherwise they are estimated.
+- Do not write the CSV yourself: `generate_plan` builds and exports it.
+- After `generate_plan`, give the file path, the date range and hours per
+  course in a few lines, mention any unallocated hours or infeasibility it
+  reports, and ask if they want edits.
+- Use `export_plan` only when the user asks for a Markdown version or for a
+  hand-edited CSV.
+"""
+
 model = MODEL_NAME
 
 root_agent = LlmAgent(
     name="planning_agent",
     model=model,
-    instruction=INSTRUCTION,
+    instruction=INSTRUCTION + (FAST_PATH_STEPS if PLAN_FAST_PATH else LLM_CSV_STEPS),
+    before_model_callback=record_model_start,
+    after_model_callback=record_model_end,
     tools=[
-        strip_inline_data_tool,
-        sanitize_inline_data_tool,
-        current_date_tool,
-        artifact_memory_tool,
+        build_preprocess_tool(
+            strip_inline_data_tool,
+            sanitize_inline_data_tool,
+            compact_history_tool,
+            current_date_tool,
+            artifact_memory_tool,
+        ),
         export_plan_tool,
-    ],
+    ]
+    + ([generate_plan_tool] if PLAN_FAST_PATH else []),
 )
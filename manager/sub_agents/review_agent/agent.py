@@ -4,11 +4,14 @@ from google.adk.agents.llm_agent import LlmAgent
 
 from ...config import MODEL_NAME
 from ...tools.sanitize_inline_data import sanitize_inline_data_tool
+from ...tools.history_compaction import compact_history_tool
 from ...tools.strip_inline_data import strip_inline_data_tool
 from ...tools.artifact_memory import artifact_memory_tool
 from ...tools.current_date import current_date_tool
 from ...tools.auto_artifacts import auto_attach_artifacts_tool
 from ...tools.export_plan import export_plan_tool
+from ...tools.plan_validation import skip_review_if_clean, validate_plan_tool
+from ...tools.preprocess import build_preprocess_tool
 INSTRUCTION = """
 You review the study plan for issues and correct them.
 
@@ -24,15 +27,19 @@ Strict course-name rule:
   to "Systems Dynamics").
 - If you need to add or move tasks, reuse the exact course names from the CSV.
 
-Check for:
-- Days exceeding the user's daily hour limit.
-- Missing or duplicated study days.
+First call `validate_plan` with the CSV. It reports over-limit days,
+duplicated rows, tasks after an exam or before today, days off, unknown or
+missing courses and totals that do not match their tasks. Treat its findings
+as authoritative and do not re-check those items by hand. Rows it counts as
+`history_rows` are past days kept as they were studied; do not change them.
+
+Then also check for:
 - Gaps before each midterm (no prep right before the exam).
-- Tasks scheduled after a midterm for that course (unless explicitly requested).
-- Dates before today's system date (unless explicitly requested).
-- Missing courses, missing midterm days, or mislabeled dates.
-- Inconsistent totals (daily hours not matching the sum of tasks).
-- Any contradictions with user constraints (days off, weekends, etc.).
+- Missing midterm days or mislabeled dates.
+- Contradictions with constraints the user stated in the conversation (daily
+  hours, days off, weekends) that `validate_plan` could not know about.
+- Findings that the user explicitly asked for (e.g., past dates in a
+  historical schedule) are not issues.
 
 If you find issues:
 - List them clearly.
@@ -52,12 +59,17 @@ root_agent = LlmAgent(
     name="review_agent",
     model=model,
     instruction=INSTRUCTION,
+    before_model_callback=skip_review_if_clean,
     tools=[
-        strip_inline_data_tool,
-        sanitize_inline_data_tool,
-        current_date_tool,
-        artifact_memory_tool,
-        auto_attach_artifacts_tool,
+        build_preprocess_tool(
+            strip_inline_data_tool,
+            sanitize_inline_data_tool,
+            compact_history_tool,
+            current_date_tool,
+            artifact_memory_tool,
+            auto_attach_artifacts_tool,
+        ),
+        validate_plan_tool,
         export_plan_tool,
     ],
 )
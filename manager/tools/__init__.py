@@ -1,7 +1,14 @@
-from .state import show_state, reset_state, set_preferences, set_exam_dates, add_course
+from .state import (
+    show_state,
+    reset_state,
+    set_preferences,
+    set_exam_dates,
+    add_course,
+    add_material,
+)
 from .ingestion import ingest_request
 from .estimation import estimate_hours
-from .planning import build_plan
+from .planning import build_plan, replan
 from .review import review_plan
 
 __all__ = [
@@ -10,8 +17,10 @@ __all__ = [
     "set_preferences",
     "set_exam_dates",
     "add_course",
+    "add_material",
     "ingest_request",
     "estimate_hours",
     "build_plan",
+    "replan",
     "review_plan",
-]
+]
@@ -1,18 +1,28 @@
 from __future__ import annotations
 
-from io import BytesIO
-from typing import Any, Iterable
-
-try:
-    from pypdf import PdfReader
-except Exception:  # pragma: no cover
-    PdfReader = None
+from typing import Any, Dict, Optional
 
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 
+from .blobs import BlobHandle
+from .context_budget import (
+    PRIORITY_LOW,
+    add_context,
+    agent_name_of,
+    budget_for,
+    dropped_sources,
+    part_tokens,
+)
+from .digest_cache import digest_cache
+from .pdf_pool import run_pdf_job
+from .pdf_probe import probe_pdf, probe_pdf_full
+from .request_context import get_request_context
+from .uploads import UploadRegistry
+
 MAX_ATTACH_BYTES = 1_000_000
+PROBE_KIND = "pdf_probe:v1"
 
 
 class AutoAttachArtifactsTool(BaseTool):
@@ -34,69 +44,70 @@ class AutoAttachArtifactsTool(BaseTool):
     async def process_llm_request(
         self, *, tool_context: ToolContext, llm_request: Any
     ) -> None:
-        artifact_names = tool_context.list_artifacts()
+        ctx = get_request_context(tool_context, llm_request)
+        artifact_names = ctx.list_artifacts()
         if not artifact_names:
             return
 
         attached = _get_attached_set(tool_context.state.get("_artifacts_attached"))
-        to_attach = [name for name in artifact_names if name not in attached]
+        retry = dropped_sources(tool_context)
+        to_attach = [
+            name
+            for name in artifact_names
+            if name not in attached or f"{self.name}:{name}" in retry
+        ]
         if not to_attach:
             return
 
         for name in to_attach:
-            artifact = tool_context.load_artifact(name)
+            # PDFs only need size and metadata, so spilled uploads are never
+            # loaded here.
+            blob = ctx.blob(name)
+            if blob is not None and "pdf" in blob.mime.lower():
+                info = await _pdf_info(tool_context, name, blob)
+                add_context(
+                    llm_request,
+                    f"{self.name}:{name}",
+                    (
+                        f"Artifact {name} is a PDF ({_describe_pdf(info)}, "
+                        f"{blob.size} bytes). A compact summary will be used "
+                        "instead of attaching the full file."
+                    ),
+                    priority=PRIORITY_LOW,
+                )
+                attached.add(name)
+                continue
+
+            artifact = ctx.load_artifact(name)
             if artifact is None:
                 continue
             inline = getattr(artifact, "inline_data", None)
             mime = getattr(inline, "mime_type", "") if inline else ""
             data = getattr(inline, "data", None) if inline else None
 
-            if inline and "pdf" in mime.lower() and data:
-                pages = _safe_page_count(data) if PdfReader is not None else None
-                page_note = f"{pages} pages" if pages is not None else "page count unknown"
-                llm_request.contents.append(
-                    types.Content(
-                        role="user",
-                        parts=[
-                            types.Part.from_text(
-                                text=(
-                                    f"Artifact {name} is a PDF ({page_note}, "
-                                    f"{len(data)} bytes). A compact summary will be used "
-                                    "instead of attaching the full file."
-                                )
-                            )
-                        ],
-                    )
-                )
-                attached.add(name)
-                continue
-
-            if data is not None and len(data) > MAX_ATTACH_BYTES:
-                llm_request.contents.append(
-                    types.Content(
-                        role="user",
-                        parts=[
-                            types.Part.from_text(
-                                text=(
-                                    f"Artifact {name} is {mime or 'a file'} "
-                                    f"({len(data)} bytes). It is too large to attach "
-                                    "directly; use summaries or request specific sections."
-                                )
-                            )
-                        ],
-                    )
+            budget = budget_for(agent_name_of(tool_context))
+            too_many_tokens = budget > 0 and part_tokens(artifact) > budget
+            if data is not None and (len(data) > MAX_ATTACH_BYTES or too_many_tokens):
+                add_context(
+                    llm_request,
+                    f"{self.name}:{name}",
+                    (
+                        f"Artifact {name} is {mime or 'a file'} "
+                        f"({len(data)} bytes). It is too large to attach "
+                        "directly; use summaries or request specific sections."
+                    ),
+                    priority=PRIORITY_LOW,
                 )
                 attached.add(name)
                 continue
 
-            llm_request.contents.append(
-                types.Content(
-                    role="user",
-                    parts=[
-                        types.Part.from_text(text=f"Artifact {name} is:"),
-                        artifact,
-                    ],
-                )
+            # An attachment left out by the context budget is offered again
+            # once the budget or the other context could let it fit.
+            add_context(
+                llm_request,
+                f"{self.name}:{name}",
+                parts=[types.Part.from_text(text=f"Artifact {name} is:"), artifact],
+                retry=True,
             )
             attached.add(name)
 
@@ -111,12 +122,52 @@ def _get_attached_set(value: Any) -> set[str]:
     return set()
 
 
-def _safe_page_count(data: bytes) -> int | None:
-    try:
-        reader = PdfReader(BytesIO(data))
-        return len(reader.pages)
-    except Exception:
-        return None
+async def _pdf_info(
+    tool_context: ToolContext, name: str, blob: BlobHandle
+) -> Optional[Dict[str, Any]]:
+    """Page count and metadata for a PDF artifact, computed once per upload.
+
+    Reuses the probe stored in _upload_index by strip_inline_data, then the
+    shared digest cache, and only parses the bytes when neither has it. A
+    full pypdf parse runs in the PDF pool when the fast probe cannot read the
+    file.
+    """
+    registry = UploadRegistry(tool_context.state)
+    meta = registry.meta_for_name(name)
+    if meta is not None and isinstance(meta.get("pdf"), dict):
+        return meta["pdf"]
+
+    sha = blob.digest()
+    info = digest_cache.get(sha, PROBE_KIND)
+    if info is None:
+        info = probe_pdf(blob.view())
+        if info is None:
+            try:
+                info = await run_pdf_job(probe_pdf_full, blob.source)
+            except Exception:
+                info = None
+        if info is None:
+            return None
+        digest_cache.put(sha, PROBE_KIND, info)
+
+    if meta is not None:
+        meta["pdf"] = info
+        registry.touch()
+        registry.save()
+    return info
+
+
+def _describe_pdf(info: Optional[Dict[str, Any]]) -> str:
+    if not info:
+        return "page count unknown"
+    parts = [f"{info.get('pages')} pages"]
+    if info.get("title"):
+        parts.append(f'title "{info["title"]}"')
+    if info.get("author"):
+        parts.append(f"author {info['author']}")
+    if info.get("has_outline"):
+        parts.append("has bookmarks")
+    return ", ".join(parts)
 
 
 auto_attach_artifacts_tool = AutoAttachArtifactsTool()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import sys
+from io import BytesIO
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Union
+
+from ..config import CACHE_DIR, SPILL_MAX_BYTES, UPLOAD_SPILL_BYTES
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+SPILL_DIR = CACHE_DIR / "blobs"
+HASH_CHUNK_BYTES = 1024 * 1024
+
+# What PDF jobs receive: the bytes themselves, or the path of a spilled blob
+# (cheap to send to a process pool, and mapped rather than read there).
+BlobSource = Union[bytes, str]
+
+
+def sha256_hex(data: Any) -> str:
+    """sha256 of a bytes-like object, fed in chunks over a memoryview."""
+    view = memoryview(data)
+    digest = hashlib.sha256()
+    for start in range(0, len(view), HASH_CHUNK_BYTES):
+        digest.update(view[start : start + HASH_CHUNK_BYTES])
+    return digest.hexdigest()
+
+
+def spill_blob(sha: str, data: Any) -> Optional[str]:
+    """Write an upload to SPILL_DIR/<sha> once; returns the path, or None on failure.
+
+    Blocking; callers on the event loop run it in a thread. Older blobs are
+    then pruned so SPILL_DIR stays within SPILL_MAX_BYTES.
+    """
+    path = SPILL_DIR / sha
+    view = memoryview(data)
+    try:
+        if path.is_file() and path.stat().st_size == len(view):
+            touch_blob(str(path))
+            return str(path)
+        SPILL_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{sha}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            for start in range(0, len(view), HASH_CHUNK_BYTES):
+                fh.write(view[start : start + HASH_CHUNK_BYTES])
+        os.replace(tmp, path)
+    except OSError:
+        return None
+    prune_spills(keep=path.name)
+    return str(path)
+
+
+def touch_blob(path: str) -> None:
+    """Mark a spilled blob as recently used, so pruning keeps it longest."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_spills(max_bytes: int = SPILL_MAX_BYTES, keep: Optional[str] = None) -> int:
+    """Delete least recently used spilled blobs beyond `max_bytes`; 0 means no limit.
+
+    Sessions whose blob was pruned fall back to the artifact store (see
+    RequestContext.blob). Returns the number of bytes freed.
+    """
+    if max_bytes <= 0:
+        return 0
+    try:
+        entries = [
+            (entry.stat().st_mtime, entry.stat().st_size, entry.path, entry.name)
+            for entry in os.scandir(SPILL_DIR)
+            if entry.is_file() and not entry.name.endswith(".tmp")
+        ]
+    except OSError:
+        return 0
+    total = sum(size for _, size, _, _ in entries)
+    freed = 0
+    for _, size, path, name in sorted(entries):
+        if total - freed <= max_bytes:
+            break
+        if name == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            # Still mapped on platforms that forbid deleting open files.
+            continue
+        freed += size
+    return freed
+
+
+def should_spill(size: int) -> bool:
+    return UPLOAD_SPILL_BYTES > 0 and size > UPLOAD_SPILL_BYTES
+
+
+def open_blob_stream(source: Any) -> BinaryIO:
+    """Seekable stream over a blob source, for PdfReader.
+
+    Paths are memory-mapped read-only instead of read into memory.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as fh:
+            return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    return BytesIO(source)
+
+
+def blob_size(source: Any) -> int:
+    if isinstance(source, (str, Path)):
+        return os.path.getsize(source)
+    return len(source)
+
+
+def process_peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process so far, in KiB, where available.
+
+    This is a process-lifetime high-water mark; the growth across an
+    operation is the difference of two readings.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB elsewhere.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class BlobHandle:
+    """One artifact's bytes, either in memory or spilled to disk.
+
+    Spilled blobs are memory-mapped on first use; callers get views, not
+    copies.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        mime: str,
+        size: int,
+        sha: Optional[str] = None,
+        path: Optional[str] = None,
+        data: Optional[bytes] = None,
+    ) -> None:
+        self.name = name
+        self.mime = mime
+        self.size = size
+        self.sha = sha
+        self.path = path
+        self._data = data
+        self._map: Optional[mmap.mmap] = None
+
+    @property
+    def source(self) -> BlobSource:
+        if self.path is not None:
+            return self.path
+        return self._data or b""
+
+    def view(self) -> memoryview:
+        if self.path is not None:
+            if self._map is None:
+                self._map = open_blob_stream(self.path)
+            return memoryview(self._map)
+        return memoryview(self._data or b"")
+
+    def digest(self) -> str:
+        if self.sha is None:
+            self.sha = sha256_hex(self.view())
+        return self.sha
+
+    def close(self) -> None:
+        """Unmap a spilled blob; views handed out must have been released."""
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A caller still holds a view; the map goes when it does.
+                return
+            self._map = None
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .blobs import BlobSource, open_blob_stream
+
+try:
+    from pypdf import PdfReader
+except Exception:  # pragma: no cover
+    PdfReader = None
+
+MAX_OUTLINE_DEPTH = 3
+MAX_HEADING_SCAN_PAGES = 1500
+HEADING_CHARS = 300
+# Pages with more chapter headings than this in their first lines are
+# treated as a table of contents, not a chapter opening.
+MAX_HEADINGS_PER_PAGE = 2
+MAX_EXCERPT_CHARS = 1200
+CHAPTER_INDEX_KIND = "chapter_index:v1"
+
+_ROMAN = {"i": 1, "v": 5, "x": 10, "l": 50, "c": 100}
+_TITLE_NUMBER_RE = re.compile(
+    r"^\s*(?:(?:chapter|ch\.|ch(?=\s))\s*(\d+|[ivxlc]+)\b|(\d+)(?:[.:)]|\s)\s*\S)",
+    re.IGNORECASE,
+)
+_HEADING_RE = re.compile(r"\bchapter\s+(\d+|[ivxlc]+)\b", re.IGNORECASE)
+_SPEC_RE = re.compile(r"(\d+)\s*(?:-|–|—|to|through)\s*(\d+)|(\d+)", re.IGNORECASE)
+
+
+def build_chapter_index(reader: Any, scan_headings: bool = True) -> Dict[str, Any]:
+    """Map chapters to 1-based page ranges.
+
+    Uses the PDF outline when it has one. Otherwise, if `scan_headings` is
+    set, looks for "Chapter N" at the top of each page (this extracts text
+    from every scanned page, so results should be cached per upload hash).
+    """
+    num_pages = len(reader.pages)
+    starts = _outline_starts(reader)
+    source = "outline"
+    if not starts and scan_headings:
+        starts = _heading_starts(reader, num_pages)
+        source = "headings"
+    if not starts:
+        return {"source": "none", "pages": num_pages, "chapters": []}
+
+    chapters = []
+    for i, (number, title, start) in enumerate(starts):
+        next_start = starts[i + 1][2] if i + 1 < len(starts) else num_pages + 1
+        end = max(start, next_start - 1)
+        chapters.append({"chapter": number, "title": title, "start": start, "end": end})
+    return {"source": source, "pages": num_pages, "chapters": chapters}
+
+
+def build_chapter_index_from_source(source: BlobSource) -> Dict[str, Any]:
+    """Pool-friendly wrapper around `build_chapter_index` (bytes or a blob path).
+
+    IO errors opening a spilled blob propagate, so they are not cached as an
+    empty index.
+    """
+    with open_blob_stream(source) as stream:
+        try:
+            return build_chapter_index(PdfReader(stream))
+        except Exception:
+            return {"source": "none", "pages": 0, "chapters": []}
+
+
+def parse_chapter_spec(spec: Any) -> List[int]:
+    """Parse "1-4, 7", "chapters 3 to 5" or a list of numbers into chapter numbers."""
+    if isinstance(spec, (list, tuple)):
+        spec = ", ".join(str(item) for item in spec)
+    if not isinstance(spec, str):
+        return []
+    numbers: List[int] = []
+    for match in _SPEC_RE.finditer(spec):
+        if match.group(3):
+            numbers.append(int(match.group(3)))
+            continue
+        low, high = int(match.group(1)), int(match.group(2))
+        if low > high:
+            low, high = high, low
+        numbers.extend(range(low, min(high, low + 200) + 1))
+    return sorted(set(numbers))
+
+
+def select_chapters(index: Dict[str, Any], wanted: Iterable[int]) -> List[Dict[str, Any]]:
+    wanted_set = set(wanted)
+    return [c for c in index.get("chapters", []) if c.get("chapter") in wanted_set]
+
+
+def page_count(chapters: Sequence[Dict[str, Any]]) -> int:
+    return sum(c["end"] - c["start"] + 1 for c in chapters)
+
+
+def extract_chapter_text(
+    source: BlobSource,
+    ranges: Sequence[Tuple[int, int]],
+    max_chars: int,
+    scores: Optional[Dict[int, float]] = None,
+) -> List[List[Any]]:
+    """Extract [page, snippet] pairs from the given 1-based page ranges only.
+
+    The character budget is split evenly across ranges so every requested
+    chapter is represented; each page is extracted at most once. With
+    `scores` (page -> relevance), higher-scoring pages in a range are read
+    first; snippets are returned in page order either way.
+    """
+    if PdfReader is None or not ranges:
+        return []
+    with open_blob_stream(source) as stream:
+        try:
+            reader = PdfReader(stream)
+        except Exception:
+            return []
+        return _extract_ranges(reader, ranges, max_chars, scores or {})
+
+
+def _extract_ranges(
+    reader: Any,
+    ranges: Sequence[Tuple[int, int]],
+    max_chars: int,
+    scores: Dict[int, float],
+) -> List[List[Any]]:
+    share = max(1, max_chars // len(ranges))
+    snippets: List[List[Any]] = []
+    for start, end in ranges:
+        used = 0
+        pages = range(start, min(end, len(reader.pages)) + 1)
+        if scores:
+            pages = sorted(pages, key=lambda p: (-scores.get(p, 0.0), p))
+        for page in pages:
+            snippet = _clean(_safe_extract(reader, page - 1))
+            if not snippet:
+                continue
+            if used + len(snippet) > share:
+                snippet = snippet[: max(0, share - used)]
+            if snippet:
+                snippets.append([page, snippet])
+                used += len(snippet)
+            if used >= share:
+                break
+    return sorted(snippets)
+
+
+def _outline_starts(reader: Any) -> List[Tuple[Optional[int], str, int]]:
+    try:
+        outline = reader.outline
+    except Exception:
+        return []
+
+    entries: List[Tuple[int, str, int]] = []
+
+    def walk(nodes: Any, depth: int) -> None:
+        for node in nodes:
+            if isinstance(node, list):
+                if depth + 1 < MAX_OUTLINE_DEPTH:
+                    walk(node, depth + 1)
+                continue
+            try:
+                page = reader.get_destination_page_number(node)
+            except Exception:
+                continue
+            if page is None or page < 0:
+                continue
+            title = " ".join(str(getattr(node, "title", "") or "").split())
+            entries.append((depth, title, page + 1))
+
+    walk(outline or [], 0)
+    if not entries:
+        return []
+
+    numbered = [
+        (_title_number(title), title, page)
+        for _, title, page in entries
+        if _title_number(title) is not None
+    ]
+    if len(numbered) >= 2:
+        chosen = numbered
+    else:
+        chosen = [
+            (_title_number(title), title, page)
+            for depth, title, page in entries
+            if depth == 0
+        ]
+    return _dedupe_starts(chosen)
+
+
+def _heading_starts(reader: Any, num_pages: int) -> List[Tuple[Optional[int], str, int]]:
+    starts: List[Tuple[Optional[int], str, int]] = []
+    last = 0
+    for i in range(min(num_pages, MAX_HEADING_SCAN_PAGES)):
+        head = _safe_extract(reader, i)[:HEADING_CHARS]
+        matches = _HEADING_RE.findall(head)
+        if not matches or len(matches) > MAX_HEADINGS_PER_PAGE:
+            continue
+        number = _to_int(matches[0])
+        # Running headers repeat the current chapter; only a higher number
+        # opens a new one.
+        if number is None or number <= last:
+            continue
+        line = " ".join(head[head.lower().find("chapter"):].split())[:80]
+        starts.append((number, line, i + 1))
+        last = number
+    return starts
+
+
+def _dedupe_starts(
+    starts: List[Tuple[Optional[int], str, int]]
+) -> List[Tuple[Optional[int], str, int]]:
+    seen = set()
+    result = []
+    for number, title, page in sorted(starts, key=lambda s: s[2]):
+        key = number if number is not None else (title, page)
+        if key in seen:
+            continue
+        seen.add(key)
+        result.append((number, title, page))
+    return result
+
+
+def _title_number(title: str) -> Optional[int]:
+    match = _TITLE_NUMBER_RE.match(title)
+    if match is None:
+        return None
+    return _to_int(match.group(1) or match.group(2))
+
+
+def _to_int(token: str) -> Optional[int]:
+    if token.isdigit():
+        return int(token)
+    total = 0
+    prev = 0
+    for ch in reversed(token.lower()):
+        value = _ROMAN.get(ch)
+        if value is None:
+            return None
+        total = total - value if value < prev else total + value
+        prev = max(prev, value)
+    return total or None
+
+
+def _safe_extract(reader: Any, page_index: int) -> str:
+    try:
+        return reader.pages[page_index].extract_text() or ""
+    except Exception:
+        return ""
+
+
+def _clean(text: str) -> str:
+    snippet = " ".join(text.replace("\x00", " ").split())
+    if len(snippet) > MAX_EXCERPT_CHARS:
+        snippet = snippet[:MAX_EXCERPT_CHARS] + "..."
+    return snippet
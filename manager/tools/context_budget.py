@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from google.genai import types
+
+from ..config import CONTEXT_TOKEN_BUDGET, CONTEXT_TOKEN_BUDGETS
+from .model_metrics import CHARS_PER_TOKEN
+from .request_context import bound_request_context
+
+logger = logging.getLogger(__name__)
+
+# Higher is kept first. Required blocks are always sent, even over budget.
+PRIORITY_REQUIRED = 100
+PRIORITY_HIGH = 30
+PRIORITY_NORMAL = 20
+PRIORITY_LOW = 10
+
+# Session state: agent name -> what its last request kept and dropped.
+BUDGET_KEY = "_context_budget"
+# Session state: agent name -> {source: signature} of retry blocks left out,
+# where the signature is the budget and the other blocks offered with them.
+DROPS_KEY = "_context_drops"
+# Gemini bills an inline image at a flat rate, whatever its size.
+INLINE_IMAGE_TOKENS = 258
+# Inline files the model reads as text; they cost their characters, not bytes.
+TEXT_MIME_MARKERS = ("text/", "json", "csv", "xml", "yaml", "markdown")
+
+
+class ContextBlock:
+    """A piece of context a preprocessing tool wants in the request."""
+
+    __slots__ = ("source", "priority", "content", "tokens", "retry")
+
+    def __init__(
+        self,
+        source: str,
+        priority: int,
+        content: types.Content,
+        retry: bool = False,
+    ) -> None:
+        self.source = source
+        self.priority = priority
+        self.content = content
+        self.tokens = estimate_tokens(content)
+        self.retry = retry
+
+
+def add_context(
+    llm_request: Any,
+    source: str,
+    text: Optional[str] = None,
+    *,
+    parts: Optional[List[types.Part]] = None,
+    priority: int = PRIORITY_NORMAL,
+    retry: bool = False,
+) -> None:
+    """Offer a user-role block for this request.
+
+    Inside the preprocessing pipeline the block is held for packing into the
+    agent's budget. Outside the pipeline it is appended straight away.
+
+    A `retry` block that is left out is recorded under DROPS_KEY; the tool
+    should offer it again on later requests (see `dropped_sources`). It is
+    only packed again once the budget or the other blocks offered change,
+    since until then it would be left out the same way.
+    """
+    content = types.Content(
+        role="user",
+        parts=parts if parts is not None else [types.Part.from_text(text=text or "")],
+    )
+    ctx = bound_request_context(llm_request)
+    if ctx is None:
+        llm_request.contents.append(content)
+        return
+    ctx.blocks.append(ContextBlock(source, priority, content, retry))
+
+
+def estimate_tokens(content: types.Content) -> int:
+    return sum(part_tokens(part) for part in content.parts or [])
+
+
+def part_tokens(part: types.Part) -> int:
+    total = -(-len(part.text) // CHARS_PER_TOKEN) if part.text else 0
+    inline = part.inline_data
+    if inline is not None and inline.data:
+        mime = (inline.mime_type or "").lower()
+        if mime.startswith("image/"):
+            total += INLINE_IMAGE_TOKENS
+        elif any(marker in mime for marker in TEXT_MIME_MARKERS):
+            text = bytes(inline.data).decode("utf-8", errors="replace")
+            total += -(-len(text) // CHARS_PER_TOKEN)
+        else:
+            total += -(-len(inline.data) // CHARS_PER_TOKEN)
+    return total
+
+
+def agent_name_of(tool_context: Any) -> str:
+    return getattr(tool_context, "agent_name", None) or "agent"
+
+
+def dropped_sources(tool_context: Any) -> Set[str]:
+    """Sources of retry blocks this agent's budget has left out and not yet sent."""
+    drops = (tool_context.state.get(DROPS_KEY) or {}).get(agent_name_of(tool_context))
+    return set(drops) if isinstance(drops, dict) else set()
+
+
+def budget_for(agent_name: Optional[str]) -> int:
+    """Context tokens an agent's preprocessing may add; 0 means no limit."""
+    return CONTEXT_TOKEN_BUDGETS.get(agent_name or "", CONTEXT_TOKEN_BUDGET)
+
+
+def pack_blocks(
+    blocks: Sequence[ContextBlock], budget: int
+) -> Tuple[List[ContextBlock], List[ContextBlock]]:
+    """Split blocks into (kept, dropped) within `budget` tokens.
+
+    Blocks are taken by priority, then in the order they were offered; one
+    that does not fit is skipped so smaller, lower-priority ones still can.
+    Kept blocks come back in the order they were offered.
+    """
+    if budget <= 0:
+        return list(blocks), []
+    order = sorted(range(len(blocks)), key=lambda i: (-blocks[i].priority, i))
+    used = 0
+    kept: List[int] = []
+    dropped: List[int] = []
+    for i in order:
+        block = blocks[i]
+        if block.priority >= PRIORITY_REQUIRED or used + block.tokens <= budget:
+            kept.append(i)
+            used += block.tokens
+        else:
+            dropped.append(i)
+    return [blocks[i] for i in sorted(kept)], [blocks[i] for i in sorted(dropped)]
+
+
+def apply_budget(
+    tool_context: Any, llm_request: Any, blocks: Sequence[ContextBlock]
+) -> Dict[str, Any]:
+    """Append the blocks that fit the agent's budget and record the outcome."""
+    agent = agent_name_of(tool_context)
+    budget = budget_for(agent)
+    all_drops = tool_context.state.get(DROPS_KEY) or {}
+    previous = all_drops.get(agent) or {}
+    drops = dict(previous)
+    signatures = {b.source: _signature(b, blocks, budget) for b in blocks if b.retry}
+    # Left out last time with the same budget and company: it would be again.
+    held = [b for b in blocks if b.retry and drops.get(b.source) == signatures[b.source]]
+    kept, dropped = pack_blocks([b for b in blocks if b not in held], budget)
+    for block in kept:
+        llm_request.contents.append(block.content)
+        drops.pop(block.source, None)
+    for block in dropped:
+        if block.retry:
+            drops[block.source] = signatures[block.source]
+    dropped = sorted(dropped + held, key=blocks.index)
+    if drops != previous:
+        tool_context.state[DROPS_KEY] = {**all_drops, agent: drops}
+
+    report = {
+        "budget": budget,
+        "offered": sum(b.tokens for b in blocks),
+        "used": sum(b.tokens for b in kept),
+        "kept": [_describe(b) for b in kept],
+        "dropped": [_describe(b) for b in dropped],
+    }
+    if dropped:
+        logger.info(
+            "%s: context over budget (%d > %d tokens); dropped %s",
+            agent,
+            report["offered"],
+            budget,
+            ", ".join(f"{b.source} ({b.tokens})" for b in dropped),
+        )
+    if blocks:
+        reports = dict(tool_context.state.get(BUDGET_KEY) or {})
+        reports[agent] = report
+        tool_context.state[BUDGET_KEY] = reports
+    return report
+
+
+def _signature(block: ContextBlock, blocks: Sequence[ContextBlock], budget: int) -> List[Any]:
+    others = sorted([b.source, b.tokens] for b in blocks if b is not block)
+    return [budget, others]
+
+
+def _describe(block: ContextBlock) -> Dict[str, Any]:
+    return {"source": block.source, "priority": block.priority, "tokens": block.tokens}
@@ -5,7 +5,8 @@ from typing import Any
 
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
-from google.genai import types
+
+from .context_budget import PRIORITY_REQUIRED, add_context
 
 
 class CurrentDateTool(BaseTool):
@@ -31,12 +32,7 @@ class CurrentDateTool(BaseTool):
             "Use this as today's date for any relative timing."
         )
 
-        llm_request.contents.append(
-            types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=note)],
-            )
-        )
+        add_context(llm_request, self.name, note, priority=PRIORITY_REQUIRED)
 
 
 current_date_tool = CurrentDateTool()
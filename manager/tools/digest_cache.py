@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config import CACHE_DIR, DIGEST_CACHE_MAX_BYTES
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        last_used REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)",
+]
+
+
+class DigestCache:
+    """Content-addressed LRU cache for upload-derived results, stored in SQLite.
+
+    Entries are keyed by the upload's sha256 plus a kind string that encodes
+    the parameters used to produce them, so the same file uploaded in another
+    session reuses the stored result. Values must be JSON-serializable.
+    """
+
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = max_bytes <= 0
+
+    def get(self, sha: str, kind: str) -> Optional[Any]:
+        key = _make_key(sha, kind)
+        row = None
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    row = conn.execute(
+                        "SELECT value FROM entries WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        conn.execute(
+                            "UPDATE entries SET last_used = ? WHERE key = ?",
+                            (time.time(), key),
+                        )
+                except sqlite3.Error:
+                    row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def put(self, sha: str, kind: str, value: Any) -> None:
+        try:
+            payload = json.dumps(value, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    (_make_key(sha, kind), payload, size, time.time()),
+                )
+                self._evict(conn)
+            except sqlite3.Error:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        entries = 0
+        total = 0
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    entries, total = conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+                    ).fetchone()
+                except sqlite3.Error:
+                    pass
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "enabled": not self._disabled,
+            }
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._disabled:
+            return None
+        if self._conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(
+                    str(self.path), check_same_thread=False, isolation_level=None
+                )
+                conn.execute("PRAGMA journal_mode=WAL")
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+            except (OSError, sqlite3.Error):
+                # Read-only or missing cache dir: run uncached rather than fail.
+                self._disabled = True
+                return None
+            self._conn = conn
+        return self._conn
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+
+def _make_key(sha: str, kind: str) -> str:
+    return f"{sha}:{kind}"
+
+
+digest_cache = DigestCache(CACHE_DIR / "digests.sqlite3", DIGEST_CACHE_MAX_BYTES)
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss/eviction counters and current size of the shared digest cache."""
+    return digest_cache.stats()
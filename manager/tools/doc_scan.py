@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import datetime as dt
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .utils import DATE_PATTERN, date_from_match, normalize_course_code
+
+KIND_COURSE = "course"
+KIND_DATE = "date"
+KIND_RELATIVE_DATE = "relative_date"
+KIND_CHAPTERS = "chapters"
+KIND_EXAM = "exam"
+
+# (page, offset in page text, kind, normalized value). Values are course
+# codes, ISO dates, (first, last) chapter tuples, or the exam word as written.
+Mention = Tuple[int, int, str, Any]
+
+# An exam word this close before a date makes the date that exam's.
+EXAM_WINDOW_CHARS = 80
+# Upper-case prefixes that look like course codes in running text.
+_NOT_COURSES = {"PAGE", "ROOM", "UNIT", "WEEK", "PART", "STEP", "TEL", "FAX", "NO", "PP"}
+
+
+def _scan_pattern(course_prefix: str) -> "re.Pattern[str]":
+    """Course codes, exam words, chapter ranges and every DATE_PATTERN form
+    in one alternation, so each page is scanned once."""
+    return re.compile(
+        rf"""\b(?:
+          (?P<course>{course_prefix}\s?\d{{3}})\b
+        | (?P<chapters>ch(?:apters?|s?\.)\s*(?P<ch_first>\d{{1,3}})\s*
+            (?:-|–|—|to|through)\s*(?P<ch_last>\d{{1,3}}))\b
+        | (?P<exam>mid-?terms?|final\s+exams?|finals|exams?|tests?)\b
+        | {DATE_PATTERN}
+        )""",
+        re.IGNORECASE | re.VERBOSE,
+    )
+
+
+# Documents: only upper-case prefixes count, so "page 123" is not a course.
+SCAN_RE = _scan_pattern(r"(?-i:[A-Z]{2,4})")
+# User messages: any case, like utils.extract_course_codes.
+MESSAGE_SCAN_RE = _scan_pattern(r"[A-Z]{2,4}")
+
+
+def scan_pages(
+    pages: Iterable[str],
+    today: Optional[dt.date] = None,
+    first_page: int = 1,
+    pattern: "re.Pattern[str]" = SCAN_RE,
+) -> Iterator[Mention]:
+    """Yield mentions page by page, in text order; pages may be a generator."""
+    today = today or dt.date.today()
+    for page, text in enumerate(pages, start=first_page):
+        if not text:
+            continue
+        for m in pattern.finditer(text):
+            course = m.group("course")
+            if course is not None:
+                code = normalize_course_code(course)
+                if code.split(" ")[0].rstrip("0123456789") not in _NOT_COURSES:
+                    yield page, m.start(), KIND_COURSE, code
+                continue
+            if m.group("chapters") is not None:
+                first, last = int(m.group("ch_first")), int(m.group("ch_last"))
+                if first <= last:
+                    yield page, m.start(), KIND_CHAPTERS, (first, last)
+                continue
+            if m.group("exam") is not None:
+                yield page, m.start(), KIND_EXAM, " ".join(m.group("exam").lower().split())
+                continue
+            absolute, found = date_from_match(m, today)
+            if found is not None:
+                kind = KIND_DATE if absolute else KIND_RELATIVE_DATE
+                yield page, m.start(), kind, found.isoformat()
+
+
+def scan_message(text: str, today: Optional[dt.date] = None) -> List[Mention]:
+    """Mentions in a short user message (course codes in any case)."""
+    return list(scan_pages([text], today, pattern=MESSAGE_SCAN_RE))
+
+
+def course_dates(mentions: Iterable[Mention]) -> Dict[str, str]:
+    """Pair course codes with the date that follows them.
+
+    "CS 101 on Nov 2 and MA 201 on Nov 10" gives each course its own date;
+    codes listed together before one date share it; trailing codes with no
+    date of their own get the last date seen.
+    """
+    pairs: Dict[str, str] = {}
+    pending: List[str] = []
+    last_date: Optional[str] = None
+    for _, _, kind, value in mentions:
+        if kind == KIND_COURSE:
+            if value not in pending:
+                pending.append(value)
+        elif kind in (KIND_DATE, KIND_RELATIVE_DATE):
+            last_date = value
+            for code in pending:
+                pairs.setdefault(code, value)
+            pending = []
+    if last_date is not None:
+        for code in pending:
+            pairs.setdefault(code, last_date)
+    return pairs
+
+
+def exam_dates(mentions: Iterable[Mention]) -> List[Dict[str, Any]]:
+    """Dates that follow an exam word on the same page, with their course.
+
+    The course is the nearest course code before the exam word on that
+    page, if any. Returns [{"course", "exam", "date", "page"}] in text order.
+    """
+    found: List[Dict[str, Any]] = []
+    course: Optional[str] = None
+    exam: Optional[Tuple[int, int, str]] = None
+    page_seen = None
+    for page, offset, kind, value in mentions:
+        if page != page_seen:
+            page_seen, course, exam = page, None, None
+        if kind == KIND_COURSE:
+            course = value
+        elif kind == KIND_EXAM:
+            exam = (page, offset, value)
+        elif kind == KIND_DATE and exam is not None and offset - exam[1] <= EXAM_WINDOW_CHARS:
+            found.append({"course": course, "exam": exam[2], "date": value, "page": page})
+            exam = None
+    return found
+
+
+def summarize_mentions(mentions: Iterable[Mention]) -> Dict[str, Any]:
+    """Course codes by frequency, exam dates and chapter ranges of a document."""
+    counts: Dict[str, int] = {}
+    chapters: List[Tuple[int, int]] = []
+    kept: List[Mention] = []
+    for mention in mentions:
+        kept.append(mention)
+        _, _, kind, value = mention
+        if kind == KIND_COURSE:
+            counts[value] = counts.get(value, 0) + 1
+        elif kind == KIND_CHAPTERS and value not in chapters:
+            chapters.append(value)
+    return {
+        "courses": sorted(counts, key=lambda code: (-counts[code], code)),
+        "exam_dates": exam_dates(kept),
+        "chapter_ranges": chapters,
+    }
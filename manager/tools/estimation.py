@@ -1,18 +1,35 @@
 from typing import Any, Dict
 
-from .state import STATE
+from .session_store import snapshot
+from .state import _update_course, mark_plan_changed
+
+HOURS_PER_MATERIAL = 2.0
+# Used when a material has a real page count (e.g. from scan_chapters).
+HOURS_PER_PAGE = 0.1
 
 
 def estimate_hours() -> Dict[str, Any]:
     summary = {}
     total_hours = 0.0
 
-    for code, course in STATE["courses"].items():
-        materials = course.get("materials", [])
-        hours = max(1.0, len(materials) * 2.0)
-        hours = round(hours, 2)
-        course["estimated_hours"] = hours
+    for code, course in snapshot().courses.items():
+        materials = course.materials
+        hours = 0.0
+        pages = 0
+        for material in materials:
+            material_pages = material.get("pages")
+            if isinstance(material_pages, (int, float)) and material_pages > 0:
+                hours += material_pages * HOURS_PER_PAGE
+                pages += int(material_pages)
+            else:
+                hours += HOURS_PER_MATERIAL
+        hours = round(max(1.0, hours), 2)
+        if course.estimated_hours != hours:
+            _update_course(code, estimated_hours=hours)
+            mark_plan_changed(courses=[code])
         summary[code] = {"estimated_hours": hours, "materials": len(materials)}
+        if pages:
+            summary[code]["pages"] = pages
         total_hours += hours
 
-    return {"ok": True, "total_hours": round(total_hours, 2), "courses": summary}
+    return {"ok": True, "total_hours": round(total_hours, 2), "courses": summary}
@@ -1,12 +1,128 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable, Dict, Optional
 
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 
+from .session_store import DEFAULT_SESSION, session_id_of
+from .uploads import bump_uploads_version
+
+# Session state: format -> {"sha", "path", "artifact", "bytes"} of the last export.
+EXPORT_KEY = "_last_export"
+EXPORT_STEM = "study_plan"
+WRITE_CHUNK_CHARS = 64 * 1024
+HASH_PREFIX_CHARS = 16
+
+
+class HashingWriter:
+    """Text sink that encodes, hashes and writes UTF-8 as it goes."""
+
+    def __init__(self, fh: BinaryIO) -> None:
+        self._fh = fh
+        self._hash = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self._hash.update(data)
+        self._fh.write(data)
+        self.bytes += len(data)
+        return len(text)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def session_output_dir(session_id: Optional[str]) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id or DEFAULT_SESSION).strip(".")
+    return Path.cwd() / "outputs" / (safe or DEFAULT_SESSION)
+
+
+def write_export(
+    directory: Path, ext: str, emit: Callable[[HashingWriter], Any]
+) -> Dict[str, Any]:
+    """Stream `emit`'s output to directory/study_plan_<hash>.<ext>.
+
+    Rows go to a temporary file in the same directory while being hashed,
+    then the file is renamed into place, so readers never see a partial
+    export and identical content always lands on the same path. Blocking;
+    run it off the event loop.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{EXPORT_STEM}-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            sink = HashingWriter(fh)
+            emit(sink)
+        sha = sink.hexdigest()
+        path = directory / f"{EXPORT_STEM}_{sha[:HASH_PREFIX_CHARS]}.{ext}"
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return {"sha": sha, "path": str(path), "bytes": sink.bytes}
+
+
+def _emit_text(content: str) -> Callable[[HashingWriter], None]:
+    def emit(sink: HashingWriter) -> None:
+        for start in range(0, len(content), WRITE_CHUNK_CHARS):
+            sink.write(content[start : start + WRITE_CHUNK_CHARS])
+
+    return emit
+
+
+def _forget_previous(previous: Optional[Dict[str, Any]], current_path: str) -> None:
+    if not previous or previous.get("path") == current_path:
+        return
+    try:
+        os.unlink(previous["path"])
+    except OSError:
+        pass
+
+
+def save_export(
+    tool_context: ToolContext,
+    ext: str,
+    mime: str,
+    written: Dict[str, Any],
+    data: Optional[bytes] = None,
+) -> Dict[str, Any]:
+    """Record an export and save it as an artifact unless its content is unchanged.
+
+    Without `data` the artifact is read back from the written file.
+    """
+    filename = f"{EXPORT_STEM}.{ext}"
+    exports = dict(tool_context.state.get(EXPORT_KEY) or {})
+    previous = exports.get(ext)
+    unchanged = bool(previous) and previous.get("sha") == written["sha"]
+    if not unchanged:
+        if data is None:
+            data = Path(written["path"]).read_bytes()
+        tool_context.save_artifact(filename, types.Part.from_bytes(data=data, mime_type=mime))
+        bump_uploads_version(tool_context.state)
+        _forget_previous(previous, written["path"])
+        exports[ext] = {**written, "artifact": filename}
+        tool_context.state[EXPORT_KEY] = exports
+
+    return {
+        "ok": True,
+        "path": written["path"],
+        "artifact": filename,
+        "format": ext,
+        "unchanged": unchanged,
+    }
+
 
 class ExportPlanTool(BaseTool):
     def __init__(self):
@@ -47,19 +163,9 @@ class ExportPlanTool(BaseTool):
             ext = "md"
             mime = "text/markdown"
 
-        output_dir = Path.cwd() / "outputs"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        filename = f"study_plan.{ext}"
-        path = output_dir / filename
-        path.write_text(content, encoding="utf-8")
-
-        artifact_part = types.Part.from_bytes(
-            data=content.encode("utf-8"),
-            mime_type=mime,
-        )
-        tool_context.save_artifact(filename, artifact_part)
-
-        return {"ok": True, "path": str(path), "artifact": filename, "format": ext}
+        output_dir = session_output_dir(session_id_of(tool_context))
+        written = await asyncio.to_thread(write_export, output_dir, ext, _emit_text(content))
+        return save_export(tool_context, ext, mime, written, content.encode("utf-8"))
 
 
 export_plan_tool = ExportPlanTool()
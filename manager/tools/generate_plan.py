@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from .estimation import estimate_hours
+from .export_plan import save_export, session_output_dir, write_export
+from .planning import replan
+from .session_store import bind_session, get_state, session_id_of
+from .state import _update_course, mark_plan_changed, set_preferences
+from .study_plan import StudyPlan
+from .utils import normalize_course_code, parse_date_str
+
+PREVIEW_ROWS = 5
+FOCUS_STUDY = "Study"
+FOCUS_FINAL = "Final review"
+
+
+class GeneratePlanTool(BaseTool):
+    """Builds the study plan and exports its CSV without the model writing it."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            name="generate_plan",
+            description=(
+                "Build the day-by-day study plan from confirmed courses, exam dates "
+                "and preferences, and export it as CSV. Returns a short summary."
+            ),
+        )
+
+    def _get_declaration(self) -> types.FunctionDeclaration | None:
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "courses": types.Schema(
+                        type=types.Type.ARRAY,
+                        description="Courses to plan; omit to use the ones already recorded.",
+                        items=types.Schema(
+                            type=types.Type.OBJECT,
+                            properties={
+                                "code": types.Schema(type=types.Type.STRING),
+                                "exam_date": types.Schema(
+                                    type=types.Type.STRING,
+                                    description="YYYY-MM-DD",
+                                ),
+                                "hours": types.Schema(
+                                    type=types.Type.NUMBER,
+                                    description="Total study hours; omit to estimate.",
+                                ),
+                            },
+                            required=["code"],
+                        ),
+                    ),
+                    "daily_max_hours": types.Schema(type=types.Type.NUMBER),
+                    "days_off": types.Schema(
+                        type=types.Type.ARRAY,
+                        items=types.Schema(type=types.Type.STRING),
+                        description="Weekday names, e.g. sunday",
+                    ),
+                    "start_date": types.Schema(
+                        type=types.Type.STRING,
+                        description="YYYY-MM-DD; defaults to today",
+                    ),
+                    "mode": types.Schema(
+                        type=types.Type.STRING,
+                        description='"optimal" (default) or "greedy"',
+                    ),
+                },
+            ),
+        )
+
+    async def run_async(
+        self, *, args: dict[str, Any], tool_context: ToolContext
+    ) -> Any:
+        bind_session(session_id_of(tool_context))
+        applied = _apply_inputs(args)
+        if not applied["ok"]:
+            return applied
+
+        result = replan(mode=args.get("mode") or "optimal")
+        if not result["ok"]:
+            return result
+        plan = get_state().study_plan
+        if not plan:
+            return {"ok": False, "message": "Nothing to schedule: all hours are already planned."}
+
+        written = await asyncio.to_thread(
+            write_export,
+            session_output_dir(session_id_of(tool_context)),
+            "csv",
+            lambda sink: plan.write_csv(sink, focus=focus_labels(plan)),
+        )
+        exported = save_export(tool_context, "csv", "text/csv", written)
+
+        days = list(plan.days())
+        summary: Dict[str, Any] = {
+            "ok": True,
+            "path": exported["path"],
+            "artifact": exported["artifact"],
+            "unchanged": exported["unchanged"],
+            "days": len(days),
+            "tasks": sum(len(day.tasks) for day in days),
+            "first_date": days[0].date,
+            "last_date": days[-1].date,
+            "courses": {
+                code: {"exam_date": c.exam_date, "hours": c.estimated_hours}
+                for code, c in get_state().courses.items()
+            },
+            "preview": [day.to_dict() for day in days[:PREVIEW_ROWS]],
+        }
+        for key in ("peak_hours", "unallocated_hours", "message"):
+            if key in result:
+                summary[key] = result[key]
+        return summary
+
+
+def _apply_inputs(args: Dict[str, Any]) -> Dict[str, Any]:
+    prefs = {
+        key: args[key]
+        for key in ("daily_max_hours", "days_off", "start_date")
+        if args.get(key) is not None
+    }
+    if prefs:
+        result = set_preferences(**prefs)
+        if not result["ok"]:
+            return result
+
+    given_hours: Dict[str, float] = {}
+    for entry in args.get("courses") or []:
+        code = normalize_course_code(str(entry.get("code") or ""))
+        if not code:
+            continue
+        changes: Dict[str, Any] = {}
+        if entry.get("exam_date"):
+            parsed = parse_date_str(str(entry["exam_date"]))
+            if parsed is None:
+                return {"ok": False, "message": f"Could not parse the exam date for {code}."}
+            changes["exam_date"] = parsed.isoformat()
+        course = get_state().courses.get(code)
+        if course is None or any(getattr(course, k) != v for k, v in changes.items()):
+            _update_course(code, **changes)
+            mark_plan_changed(courses=[code])
+        if entry.get("hours"):
+            given_hours[code] = round(float(entry["hours"]), 2)
+
+    courses = get_state().courses
+    if any(code not in given_hours and not c.estimated_hours for code, c in courses.items()):
+        # estimate_hours() sizes every course; keep hours that were already set.
+        known = {code: c.estimated_hours for code, c in courses.items() if c.estimated_hours}
+        estimate_hours()
+        given_hours = {**known, **given_hours}
+    for code, hours in given_hours.items():
+        if get_state().courses[code].estimated_hours != hours:
+            _update_course(code, estimated_hours=hours)
+            mark_plan_changed(courses=[code])
+    return {"ok": True}
+
+
+def focus_labels(plan: StudyPlan) -> Any:
+    """Focus column: the last study day of a course before its exam is its final review."""
+    last_offset: Dict[int, int] = {}
+    for offset, course_id in zip(plan.day_offsets, plan.course_ids):
+        last_offset[course_id] = offset
+    last_dates = {
+        plan.courses[course_id]: plan.date_at(offset)
+        for course_id, offset in last_offset.items()
+        if course_id < len(plan.courses)
+    }
+
+    def focus(date: str, course: str) -> str:
+        return FOCUS_FINAL if last_dates.get(course) == date else FOCUS_STUDY
+
+    return focus
+
+
+generate_plan_tool = GeneratePlanTool()
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from ..config import HISTORY_KEEP_TURNS
+
+logger = logging.getLogger(__name__)
+
+# Session state: agent name -> what compaction did to its last request.
+COMPACTION_KEY = "_history_compaction"
+SUMMARY_LINE_CHARS = 160
+SUMMARY_MAX_CHARS = 2000
+SUMMARY_HEADER = "Summary of the earlier conversation (older turns compacted):"
+
+# Notes the preprocessing tools inject; only the latest of each kind (per
+# artifact, for artifact notes) is worth keeping.
+_NOTE_RES = (
+    re.compile(r"System date \(today\):"),
+    re.compile(r"Session uploads \(cached for this session\):"),
+    re.compile(r"Note: \d+ uploaded file\(s\) were saved"),
+    re.compile(r"Artifact (\S+) (?:summary:|facts |is a PDF|is .+ too large to attach)"),
+)
+# A plan CSV: a header naming Date and Course, then rows of 3+ columns. The
+# second form is a CSV inside a repr'd dict, as ADK relays another agent's
+# tool calls ("[planning_agent] called tool `export_plan` with parameters:").
+_CSV_RES = (
+    re.compile(
+        r"^[ \t]*\"?date\"?[ \t]*,[^\n]*\bcourse\b[^\n]*\n"
+        r"(?:[^\n,]*,[^\n,]*,[^\n]*(?:\n|$))+",
+        re.IGNORECASE | re.MULTILINE,
+    ),
+    re.compile(
+        r"\bdate\"?,(?:(?!\\n)[^'\n])*\bcourse\b(?:(?!\\n)[^'\n])*"
+        r"(?:\\n(?:(?!\\n)[^',\n])*,(?:(?!\\n)[^',\n])*,(?:(?!\\n)[^'\n])*)+",
+        re.IGNORECASE,
+    ),
+)
+
+
+class CompactHistoryTool(BaseTool):
+    """Shrinks the conversation history sent with each request.
+
+    Runs after the upload-stripping stages and before any context is added
+    for this request: repeated injected notes are deduplicated, every plan
+    CSV but the latest is replaced by a placeholder, and turns older than
+    HISTORY_KEEP_TURNS are folded into one short summary.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(
+            name="compact_history",
+            description="Compacts repeated notes, old plans and old turns in the request.",
+        )
+
+    def _get_declaration(self) -> None:
+        return None
+
+    async def process_llm_request(
+        self, *, tool_context: ToolContext, llm_request: Any
+    ) -> None:
+        contents = getattr(llm_request, "contents", None)
+        if not contents:
+            return
+        report = compact_contents(contents, HISTORY_KEEP_TURNS)
+        if not report["saved_bytes"]:
+            return
+        agent = getattr(tool_context, "agent_name", None) or "agent"
+        logger.info(
+            "%s: history compacted from %d to %d bytes",
+            agent,
+            report["before_bytes"],
+            report["after_bytes"],
+        )
+        reports = dict(tool_context.state.get(COMPACTION_KEY) or {})
+        reports[agent] = report
+        tool_context.state[COMPACTION_KEY] = reports
+
+
+def compact_contents(contents: List[types.Content], keep_turns: int) -> Dict[str, Any]:
+    """Compact `contents` in place and report what changed.
+
+    keep_turns <= 0 keeps every turn (notes and plans are still compacted).
+    """
+    before = contents_bytes(contents)
+    notes = _dedupe_notes(contents)
+    plans = _collapse_plans(contents)
+    turns = _summarize_old_turns(contents, keep_turns) if keep_turns > 0 else 0
+    contents[:] = [c for c in contents if c.parts]
+    after = contents_bytes(contents)
+    return {
+        "before_bytes": before,
+        "after_bytes": after,
+        "saved_bytes": before - after,
+        "notes_removed": notes,
+        "plans_collapsed": plans,
+        "turns_summarized": turns,
+    }
+
+
+def contents_bytes(contents: List[types.Content]) -> int:
+    """Approximate request size: text, tool call/response JSON and inline bytes."""
+    return sum(_part_bytes(part) for content in contents for part in content.parts or [])
+
+
+def _part_bytes(part: types.Part) -> int:
+    size = len(part.text.encode("utf-8")) if part.text else 0
+    if part.function_call is not None:
+        size += len(json.dumps(part.function_call.args or {}, default=str))
+    if part.function_response is not None:
+        size += len(json.dumps(part.function_response.response or {}, default=str))
+    if part.inline_data is not None and part.inline_data.data:
+        size += len(part.inline_data.data)
+    return size
+
+
+def _note_key(text: str) -> Optional[Tuple[int, str]]:
+    for index, pattern in enumerate(_NOTE_RES):
+        match = pattern.match(text)
+        if match is not None:
+            return index, match.group(1) if match.groups() else ""
+    return None
+
+
+def _dedupe_notes(contents: List[types.Content]) -> int:
+    """Drop every injected note but the last of its kind."""
+    seen = set()
+    removed = 0
+    for content in reversed(contents):
+        if content.role != "user" or not content.parts:
+            continue
+        kept = []
+        for part in reversed(content.parts):
+            key = _note_key(part.text) if part.text else None
+            if key is not None and key in seen:
+                removed += 1
+                continue
+            if key is not None:
+                seen.add(key)
+            kept.append(part)
+        content.parts = kept[::-1]
+    return removed
+
+
+def _collapse_plans(contents: List[types.Content]) -> int:
+    """Replace every plan CSV but the latest, in text and tool-call arguments."""
+    # (content, part, args key or None) for each string holding a plan CSV.
+    holders: List[Tuple[int, int, Optional[str]]] = []
+    for ci, content in enumerate(contents):
+        for pi, part in enumerate(content.parts or []):
+            if part.text and _plan_matches(part.text):
+                holders.append((ci, pi, None))
+            call = part.function_call
+            for key, value in (call.args or {}).items() if call is not None else ():
+                if isinstance(value, str) and _plan_matches(value):
+                    holders.append((ci, pi, key))
+
+    collapsed = 0
+    latest_kept = False
+    for ci, pi, key in reversed(holders):
+        part = contents[ci].parts[pi]
+        text = part.text if key is None else part.function_call.args[key]
+        matches = _plan_matches(text)
+        if not latest_kept:
+            matches, latest_kept = matches[:-1], True
+        for match in reversed(matches):
+            text = text[: match.start()] + _plan_placeholder(match) + text[match.end() :]
+        collapsed += len(matches)
+        if key is None:
+            part.text = text
+        else:
+            part.function_call.args = {**part.function_call.args, key: text}
+    return collapsed
+
+
+def _plan_matches(text: str) -> List["re.Match[str]"]:
+    matches = sorted(
+        (m for pattern in _CSV_RES for m in pattern.finditer(text)), key=lambda m: m.start()
+    )
+    kept: List["re.Match[str]"] = []
+    for match in matches:
+        if not kept or match.start() >= kept[-1].end():
+            kept.append(match)
+    return kept
+
+
+def _plan_placeholder(match: "re.Match[str]") -> str:
+    plan = match.group(0).rstrip("\n")
+    rows = plan.count("\n") or plan.count("\\n")
+    end = "\n" if match.group(0).endswith("\n") else ""
+    return f"[Study plan CSV ({rows} rows) omitted; superseded by a later version.]{end}"
+
+
+def _summarize_old_turns(contents: List[types.Content], keep_turns: int) -> int:
+    """Fold everything before the last `keep_turns` user turns into one summary."""
+    starts = [i for i, content in enumerate(contents) if _starts_turn(content)]
+    if len(starts) <= keep_turns:
+        return 0
+    cut = starts[-keep_turns]
+    old = contents[:cut]
+    lines: List[str] = []
+    total = len(SUMMARY_HEADER)
+    # Newest first, so the budget goes to the most recent of the old turns.
+    for line in reversed([line for content in old for line in _summary_lines(content)]):
+        if total + len(line) + 1 > SUMMARY_MAX_CHARS:
+            lines.append("- ...")
+            break
+        lines.append(line)
+        total += len(line) + 1
+    summary = types.Content(
+        role="user",
+        parts=[types.Part.from_text(text="\n".join([SUMMARY_HEADER] + lines[::-1]))],
+    )
+    contents[:cut] = [summary]
+    return len(starts) - keep_turns
+
+
+def _starts_turn(content: types.Content) -> bool:
+    """A user message, as opposed to a tool response, relayed reply or note."""
+    parts = content.parts or []
+    return (
+        content.role == "user"
+        and any(part.text and _note_key(part.text) is None for part in parts)
+        and not any(part.function_response is not None for part in parts)
+        and not (parts[0].text or "").startswith("For context:")
+    )
+
+
+def _summary_lines(content: types.Content) -> List[str]:
+    speaker = "user" if content.role == "user" else "assistant"
+    lines = []
+    for part in content.parts or []:
+        who = speaker
+        if part.text:
+            text = part.text
+            if text == "For context:" or _note_key(text) is not None:
+                continue
+        elif part.function_call is not None:
+            text = f"called {part.function_call.name}"
+        elif part.function_response is not None:
+            who = "tool"
+            text = f"{part.function_response.name} returned " + json.dumps(
+                part.function_response.response or {}, default=str
+            )
+        else:
+            continue
+        text = " ".join(text.split())
+        if len(text) > SUMMARY_LINE_CHARS:
+            text = text[:SUMMARY_LINE_CHARS] + "..."
+        lines.append(f"- {who}: {text}")
+    return lines
+
+
+compact_history_tool = CompactHistoryTool()
@@ -1,11 +1,29 @@
+import asyncio
+import datetime as dt
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
-from .state import STATE, _ensure_course
+from .blobs import open_blob_stream, sha256_hex
+from .digest_cache import digest_cache
+from .doc_scan import scan_pages, summarize_mentions
+from .pdf_pool import run_pdf_job
+from .session_store import get_state
+from .state import _update_course, mark_plan_changed
 from .utils import extract_course_codes, extract_file_paths, resolve_path
 
+try:
+    from pypdf import PdfReader
+except Exception:  # pragma: no cover
+    PdfReader = None
 
-def ingest_request(request: str) -> Dict[str, Any]:
+# Syllabi and exam overviews give their dates early; textbooks are not read
+# past this many pages.
+DOC_SCAN_MAX_PAGES = 20
+DOC_SCAN_KIND = f"doc_scan:v1:{DOC_SCAN_MAX_PAGES}"
+
+
+async def ingest_request(request: str) -> Dict[str, Any]:
     paths = extract_file_paths(request)
     if not paths:
         return {
@@ -16,6 +34,7 @@ def ingest_request(request: str) -> Dict[str, Any]:
     search_dirs = _default_search_dirs()
     ingested: List[str] = []
     missing: List[str] = []
+    detected: Dict[str, Any] = {}
 
     for candidate in paths:
         resolved = resolve_path(candidate, search_dirs)
@@ -25,22 +44,99 @@ def ingest_request(request: str) -> Dict[str, Any]:
             missing.append(candidate)
             continue
 
-        code = _guess_course_code(candidate)
-        course = _ensure_course(code)
-        course["materials"].append({"path": path_str})
+        facts = await _scan_document(resolved) if resolved is not None else None
+        code = _guess_course_code(candidate, facts)
+        course = _update_course(code)
+        material: Dict[str, Any] = {"path": path_str}
+        if facts:
+            exam = _exam_date_for(course.code, facts)
+            if exam and not course.exam_date:
+                course = _update_course(course.code, exam_date=exam)
+            if facts["chapter_ranges"]:
+                material["coverage"] = [list(r) for r in facts["chapter_ranges"]]
+            detected[path_str] = {
+                "course": course.code,
+                "exam_date": exam,
+                "chapter_ranges": material.get("coverage", []),
+            }
+        course = _update_course(course.code, materials=course.materials + (material,))
+        mark_plan_changed(courses=[course.code])
         ingested.append(path_str)
 
     result: Dict[str, Any] = {"ok": True, "ingested": ingested, "missing": missing}
+    if detected:
+        result["detected"] = detected
     if missing:
         result["message"] = "Some files were not found. Provide full paths for missing files."
     return result
 
 
-def _guess_course_code(text: str) -> str:
+def _guess_course_code(text: str, facts: Optional[Dict[str, Any]] = None) -> str:
     codes = extract_course_codes(text)
     if codes:
         return codes[0]
-    return f"COURSE-{len(STATE['courses']) + 1}"
+    if facts and facts["courses"]:
+        return facts["courses"][0]
+    return f"COURSE-{len(get_state().courses) + 1}"
+
+
+async def _scan_document(path: Path) -> Optional[Dict[str, Any]]:
+    """Course codes, exam dates and chapter ranges from a PDF's first pages.
+
+    The parse runs in the shared PDF pool, under its timeout, and is cached
+    per content hash and day (relative dates depend on today). Timeouts and
+    read failures are not cached.
+    """
+    if PdfReader is None or path.suffix.lower() != ".pdf":
+        return None
+    try:
+        sha = await asyncio.to_thread(_file_sha, path)
+    except (OSError, ValueError):
+        return None
+    today = dt.date.today()
+    kind = f"{DOC_SCAN_KIND}:{today.isoformat()}"
+    facts = digest_cache.get(sha, kind)
+    if facts is None:
+        try:
+            facts = await run_pdf_job(_scan_pdf, str(path), today)
+        except Exception:
+            return None
+        digest_cache.put(sha, kind, facts)
+    return facts or None
+
+
+def _file_sha(path: Path) -> str:
+    with open_blob_stream(str(path)) as stream:
+        return sha256_hex(stream)
+
+
+def _scan_pdf(path: str, today: dt.date) -> Dict[str, Any]:
+    """Pool job: summarize the first pages; {} when pypdf cannot read the file."""
+    with open_blob_stream(path) as stream:
+        try:
+            reader = PdfReader(stream)
+        except Exception:
+            return {}
+        return summarize_mentions(scan_pages(_page_texts(reader), today))
+
+
+def _page_texts(reader: Any) -> Iterator[str]:
+    for page in islice(reader.pages, DOC_SCAN_MAX_PAGES):
+        try:
+            yield page.extract_text() or ""
+        except Exception:
+            yield ""
+
+
+def _exam_date_for(code: str, facts: Dict[str, Any]) -> Optional[str]:
+    """First exam date tied to this course, else the document's first untied one."""
+    untied = None
+    for found in facts["exam_dates"]:
+        if found["course"] == code:
+            return found["date"]
+        if found["course"] is None and untied is None:
+            untied = found["date"]
+    return untied
 
 
 def _default_search_dirs() -> List[Path]:
@@ -50,4 +146,4 @@ def _default_search_dirs() -> List[Path]:
         home / "Downloads",
         home / "Documents",
     ]
-    return [c for c in candidates if c.exists()]
+    return [c for c in candidates if c.exists()]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Mapping
+
+from .utils import COURSE_CODE_RE
+
+# Term weights for ranking pages. Dates and course codes are pseudo-terms:
+# a syllabus page that names a course and lists dates is usually the one
+# that carries the midterm details.
+KEYWORD_WEIGHTS: Dict[str, float] = {
+    "midterm": 3.0,
+    "exam": 2.0,
+    "final": 1.0,
+    "schedule": 2.0,
+    "syllabus": 1.5,
+    "overview": 1.0,
+    "chapter": 1.0,
+    "week": 1.0,
+    "grading": 1.0,
+    "assessment": 1.5,
+}
+DATE_TERM = "<date>"
+COURSE_TERM = "<course>"
+DATE_WEIGHT = 2.5
+COURSE_WEIGHT = 2.0
+KEYWORD_INDEX_KIND = "keyword_index:v1"
+
+_TERM_RE = re.compile("|".join(re.escape(k) for k in KEYWORD_WEIGHTS))
+_DATE_RE = re.compile(
+    r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d{1,2}\b"
+    r"|\b\d{4}-\d{2}-\d{2}\b"
+    r"|\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b",
+    re.IGNORECASE,
+)
+# Density is hits per 1000 characters, with short pages floored so a single
+# hit on a near-empty page does not dominate.
+_MIN_DENSITY_CHARS = 400
+
+
+def page_terms(text: str) -> Dict[str, int]:
+    """Count keyword, date and course-code occurrences on one page."""
+    counts: Dict[str, int] = {}
+    for match in _TERM_RE.finditer(text.lower()):
+        term = match.group(0)
+        counts[term] = counts.get(term, 0) + 1
+    dates = len(_DATE_RE.findall(text))
+    if dates:
+        counts[DATE_TERM] = dates
+    # COURSE_CODE_RE is case-insensitive; only upper-case prefixes count
+    # here so phrases like "page 123" are not mistaken for course codes.
+    courses = sum(1 for m in COURSE_CODE_RE.finditer(text) if m.group(1)[:2].isupper())
+    if courses:
+        counts[COURSE_TERM] = courses
+    return counts
+
+
+def new_index() -> Dict[str, Any]:
+    """Empty inverted index: term -> [[page, freq], ...] plus page lengths.
+
+    Lists rather than int-keyed dicts so the index round-trips through JSON.
+    """
+    return {"terms": {}, "lengths": []}
+
+
+def add_page(index: Dict[str, Any], page: int, text: str, counts: Mapping[str, int]) -> None:
+    index["lengths"].append([page, len(text)])
+    for term, freq in counts.items():
+        index["terms"].setdefault(term, []).append([page, freq])
+
+
+def term_weight(term: str) -> float:
+    if term == DATE_TERM:
+        return DATE_WEIGHT
+    if term == COURSE_TERM:
+        return COURSE_WEIGHT
+    return KEYWORD_WEIGHTS.get(term, 0.0)
+
+
+def page_scores(index: Mapping[str, Any]) -> Dict[int, float]:
+    """Weighted keyword density per page (only pages with at least one hit)."""
+    lengths = {page: length for page, length in index.get("lengths", [])}
+    weighted: Dict[int, float] = {}
+    for term, postings in index.get("terms", {}).items():
+        weight = term_weight(term)
+        for page, freq in postings:
+            weighted[page] = weighted.get(page, 0.0) + weight * freq
+    return {
+        page: hits * 1000.0 / max(lengths.get(page, 0), _MIN_DENSITY_CHARS)
+        for page, hits in weighted.items()
+    }
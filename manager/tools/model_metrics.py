@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import time
+from typing import Any, Optional
+
+# Session state: agent name -> totals over its model calls.
+METRICS_KEY = "_model_metrics"
+# Rough size of a Gemini token, used when the response carries no usage data.
+CHARS_PER_TOKEN = 4
+
+_call_started: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "model_call_started", default=None
+)
+
+
+def record_model_start(callback_context: Any, llm_request: Any) -> None:
+    """before_model_callback: note when the model call starts."""
+    _call_started.set(time.perf_counter())
+    return None
+
+
+def record_model_end(callback_context: Any, llm_response: Any) -> None:
+    """after_model_callback: add the call's latency and token use to session state.
+
+    Token counts come from the response's usage metadata when the model
+    layer provides it, and are otherwise estimated from the characters the
+    model produced (text and function-call arguments).
+    """
+    if getattr(llm_response, "partial", False):
+        return None
+    started = _call_started.get()
+    latency_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+    _call_started.set(None)
+
+    output_chars = _output_chars(getattr(llm_response, "content", None))
+    usage = getattr(llm_response, "usage_metadata", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+
+    metrics = dict(callback_context.state.get(METRICS_KEY) or {})
+    agent = getattr(callback_context, "agent_name", None) or "agent"
+    totals = dict(metrics.get(agent) or {})
+    totals["calls"] = totals.get("calls", 0) + 1
+    totals["latency_ms"] = round(totals.get("latency_ms", 0.0) + latency_ms, 1)
+    totals["output_chars"] = totals.get("output_chars", 0) + output_chars
+    totals["output_tokens"] = totals.get("output_tokens", 0) + (
+        output_tokens if output_tokens is not None else -(-output_chars // CHARS_PER_TOKEN)
+    )
+    if prompt_tokens is not None:
+        totals["prompt_tokens"] = totals.get("prompt_tokens", 0) + prompt_tokens
+    totals["estimated"] = output_tokens is None
+    totals["last_latency_ms"] = round(latency_ms, 1)
+    metrics[agent] = totals
+    callback_context.state[METRICS_KEY] = metrics
+    return None
+
+
+def _output_chars(content: Any) -> int:
+    total = 0
+    for part in getattr(content, "parts", None) or []:
+        if getattr(part, "text", None):
+            total += len(part.text)
+        call = getattr(part, "function_call", None)
+        if call is not None:
+            total += len(call.name or "") + len(json.dumps(call.args or {}, default=str))
+    return total
@@ -1,30 +1,34 @@
 from __future__ import annotations
 
-from io import BytesIO
-from typing import Any, List
+import asyncio
+import datetime as dt
+from typing import Any, Dict, List, Optional
 
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
-from google.genai import types
+
+from .blobs import BlobSource, blob_size, open_blob_stream
+from .chapter_index import build_chapter_index
+from .context_budget import PRIORITY_HIGH, PRIORITY_NORMAL, add_context, dropped_sources
+from .digest_cache import digest_cache
+from .keyword_index import (
+    KEYWORD_INDEX_KIND,
+    KEYWORD_WEIGHTS,
+    add_page,
+    new_index,
+    page_scores,
+    page_terms,
+)
+from .pdf_pool import run_pdf_job
+from .request_context import get_request_context
+from .syllabus_facts import FACTS_KIND, extract_facts, prefill_state, render_facts
+from .uploads import bump_uploads_version
 
 try:
     from pypdf import PdfReader
 except Exception:  # pragma: no cover
     PdfReader = None
 
-KEYWORDS = [
-    "midterm",
-    "exam",
-    "final",
-    "schedule",
-    "syllabus",
-    "overview",
-    "chapter",
-    "week",
-    "grading",
-    "assessment",
-]
-
 FIRST_PAGES = 5
 MAX_SCAN_PAGES = 200
 MAX_EXCERPT_CHARS = 1200
@@ -33,7 +37,23 @@ LARGE_PAGE_THRESHOLD = 200
 LARGE_BYTES_THRESHOLD = 10_000_000
 LARGE_FIRST_PAGES = 8
 LARGE_MAX_TOTAL_CHARS = 4000
+MAX_CHAPTER_LIST_CHARS = 1500
+# Small PDFs stop scanning once this much candidate text has been collected;
+# the budget is then filled from the best-ranked candidates.
+MAX_CANDIDATE_CHARS = 4 * MAX_TOTAL_CHARS
+# Ranking bonus for the opening pages, which usually name the course.
+FIRST_PAGE_BONUS = 2.0
 SUMMARY_KEY = "_artifact_summaries"
+# Digest outcomes that say nothing about the file itself; retried next turn.
+TRANSIENT_STATUSES = ("timeout", "error")
+# Cache kind for stored digests; includes every parameter that shapes the
+# output so changing a limit never serves a stale digest.
+DIGEST_KIND = (
+    f"pdf_digest:v3:{FIRST_PAGES}:{MAX_SCAN_PAGES}:{MAX_EXCERPT_CHARS}:"
+    f"{MAX_TOTAL_CHARS}:{LARGE_PAGE_THRESHOLD}:{LARGE_BYTES_THRESHOLD}:"
+    f"{LARGE_FIRST_PAGES}:{LARGE_MAX_TOTAL_CHARS}:{MAX_CANDIDATE_CHARS}:"
+    f"{FIRST_PAGE_BONUS}:{sorted(KEYWORD_WEIGHTS.items())}"
+)
 
 
 class PdfExtractTool(BaseTool):
@@ -54,7 +74,8 @@ class PdfExtractTool(BaseTool):
         if PdfReader is None:
             return
 
-        artifact_names = tool_context.list_artifacts()
+        ctx = get_request_context(tool_context, llm_request)
+        artifact_names = ctx.list_artifacts()
         if not artifact_names:
             return
 
@@ -62,57 +83,144 @@ class PdfExtractTool(BaseTool):
         if not isinstance(summaries, dict):
             summaries = {}
 
+        # Digests the budget left out earlier are offered again from their
+        # stored text; the budget decides whether they fit this time.
+        retry = dropped_sources(tool_context)
+        for name in artifact_names:
+            source = f"{self.name}:{name}"
+            if source in retry and name in summaries:
+                digest = summaries[name]
+                add_context(
+                    llm_request,
+                    source,
+                    digest,
+                    priority=_digest_priority(name, digest),
+                    retry=True,
+                )
+
+        records: Dict[str, Dict[str, Any]] = {}
+        shas: Dict[str, str] = {}
+        pending: List[tuple[str, str, BlobSource]] = []
         for name in artifact_names:
             if name in summaries:
                 continue
 
-            part = tool_context.load_artifact(name)
-            if part is None:
+            blob = ctx.blob(name)
+            if blob is None or "pdf" not in blob.mime.lower():
                 continue
 
-            inline = getattr(part, "inline_data", None)
-            if inline is None:
+            sha = blob.digest()
+            shas[name] = sha
+            record = digest_cache.get(sha, DIGEST_KIND)
+            if record is None:
+                pending.append((name, sha, blob.source))
+            else:
+                records[name] = record
+
+        # Digest cache misses concurrently off the event loop. Spilled uploads
+        # are passed by path, so a process pool does not pickle their bytes.
+        results = await asyncio.gather(
+            *(run_pdf_job(_build_pdf_digest, source) for _, _, source in pending),
+            return_exceptions=True,
+        )
+        # Timeouts and pool or IO failures are reported for this turn only:
+        # they are neither cached nor kept as the artifact's summary.
+        for (name, sha, _), result in zip(pending, results):
+            if isinstance(result, asyncio.TimeoutError):
+                records[name] = {"status": "timeout"}
                 continue
-            mime = getattr(inline, "mime_type", "") or ""
-            if "pdf" not in mime.lower():
+            if isinstance(result, BaseException):
+                records[name] = {"status": "error"}
                 continue
-            data = getattr(inline, "data", None)
-            if not data:
+            index = result.pop("keyword_index", None)
+            if index is not None:
+                digest_cache.put(sha, KEYWORD_INDEX_KIND, index)
+            records[name] = result
+            digest_cache.put(sha, DIGEST_KIND, result)
+
+        # Write back in listing order so summaries and request contents are
+        # deterministic regardless of which job finished first.
+        changed = False
+        for name in artifact_names:
+            record = records.get(name)
+            if record is None:
                 continue
-
-            digest = _build_pdf_digest(name, data)
+            # A recognised syllabus is recorded in planner state and sent as
+            # its facts; anything else as page snippets.
+            facts = _syllabus_facts(shas[name], record) if record.get("status") == "ok" else {}
+            if not prefill_state(name, facts):
+                facts = None
+            digest = _render_digest(name, record, facts)
             if not digest:
                 continue
 
-            summaries[name] = digest
-            llm_request.contents.append(
-                types.Content(
-                    role="user",
-                    parts=[types.Part.from_text(text=digest)],
-                )
+            transient = record.get("status") in TRANSIENT_STATUSES
+            if not transient and summaries.get(name) != digest:
+                summaries[name] = digest
+                changed = True
+            add_context(
+                llm_request,
+                f"{self.name}:{name}",
+                digest,
+                priority=_digest_priority(name, digest),
+                retry=True,
             )
 
-        if summaries:
+        if changed:
             tool_context.state[SUMMARY_KEY] = summaries
+            bump_uploads_version(tool_context.state)
 
 
-def _build_pdf_digest(name: str, data: bytes) -> str:
-    try:
-        reader = PdfReader(BytesIO(data))
-    except Exception:
-        return (
-            f"Artifact {name} is a PDF, but text extraction failed. "
-            "It may be scanned; please provide a text-based version or key dates."
-        )
+def _digest_priority(name: str, digest: str) -> int:
+    """Facts and failure notices are short and cannot be recovered from
+    elsewhere; snippet digests are the first to give way."""
+    if digest.startswith(f"Artifact {name} summary:"):
+        return PRIORITY_NORMAL
+    return PRIORITY_HIGH
+
+
+def _syllabus_facts(sha: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Facts for a digest, cached per upload; relative dates make them per-day."""
+    today = dt.date.today()
+    kind = f"{FACTS_KIND}:{today.isoformat()}:{DIGEST_KIND}"
+    facts = digest_cache.get(sha, kind)
+    if facts is None:
+        facts = extract_facts(record, today)
+        digest_cache.put(sha, kind, facts)
+    return facts
+
+
+def _build_pdf_digest(source: BlobSource) -> Dict[str, Any]:
+    """Parse a PDF into a name-independent digest record (cacheable as JSON).
+
+    IO errors opening a spilled blob propagate to the caller; only what the
+    parser itself concludes is returned (and cached).
+    """
+    with open_blob_stream(source) as stream:
+        try:
+            reader = PdfReader(stream)
+        except Exception:
+            return {"status": "unreadable"}
+        return _digest_reader(reader, blob_size(source))
 
+
+def _digest_reader(reader: PdfReader, size_bytes: int) -> Dict[str, Any]:
     num_pages = len(reader.pages)
-    size_bytes = len(data)
     is_large = num_pages > LARGE_PAGE_THRESHOLD or size_bytes > LARGE_BYTES_THRESHOLD
 
+    # Each page is extracted at most once: pages are indexed and snippeted in
+    # the same pass, and small PDFs stop scanning once enough candidate text
+    # has been collected. The budget then goes to the best-ranked pages.
+    chapters: List[Dict[str, Any]] = []
     if is_large:
+        # The outline is cheap to read; heading detection is left to
+        # scan_chapters, which caches its (full-scan) index per upload.
+        chapters = build_chapter_index(reader, scan_headings=False)["chapters"]
         pages_to_check = list(range(min(LARGE_FIRST_PAGES, num_pages)))
         extra = []
-        if num_pages > LARGE_FIRST_PAGES:
+        if chapters:
+            extra.extend(c["start"] - 1 for c in chapters)
+        elif num_pages > LARGE_FIRST_PAGES:
             extra.append(num_pages // 2)
             extra.append(num_pages - 1)
             extra.append(num_pages // 4)
@@ -121,41 +229,35 @@ def _build_pdf_digest(name: str, data: bytes) -> str:
                 pages_to_check.append(idx)
         pages_to_check = sorted(set(pages_to_check))
     else:
-        pages_to_check = list(range(min(FIRST_PAGES, num_pages)))
-        scan_limit = min(num_pages, MAX_SCAN_PAGES)
-        for i in range(scan_limit):
-            if i in pages_to_check:
-                continue
-            text = _safe_extract(reader, i)
-            if not text:
-                continue
-            if _has_keyword(text):
-                pages_to_check.append(i)
+        pages_to_check = list(range(min(num_pages, MAX_SCAN_PAGES)))
 
-        pages_to_check = sorted(set(pages_to_check))[:MAX_SCAN_PAGES]
-
-    snippets: List[str] = []
-    total = 0
-    max_total = LARGE_MAX_TOTAL_CHARS if is_large else MAX_TOTAL_CHARS
+    index = new_index()
+    candidates: Dict[int, str] = {}
+    candidate_chars = 0
     for i in pages_to_check:
         text = _safe_extract(reader, i)
         if not text:
             continue
-        snippet = text.strip().replace("\x00", " ")
-        snippet = " ".join(snippet.split())
-        if len(snippet) > MAX_EXCERPT_CHARS:
-            snippet = snippet[:MAX_EXCERPT_CHARS] + "..."
-        entry = f"[Page {i+1}] {snippet}"
-        if total + len(entry) > max_total:
+        counts = page_terms(text)
+        add_page(index, i + 1, text, counts)
+        if not is_large and i >= FIRST_PAGES and not counts:
+            continue
+        snippet = _clean_snippet(text)
+        if not snippet:
+            continue
+        candidates[i + 1] = snippet
+        candidate_chars += len(snippet)
+        if not is_large and candidate_chars >= MAX_CANDIDATE_CHARS:
             break
-        snippets.append(entry)
-        total += len(entry)
 
-    if not snippets:
-        return (
-            f"Artifact {name} is a PDF with {num_pages} pages. "
-            "Text extraction returned no usable content."
-        )
+    snippets = _select_snippets(
+        candidates,
+        page_scores(index),
+        LARGE_MAX_TOTAL_CHARS if is_large else MAX_TOTAL_CHARS,
+    )
+
+    if not snippets and not chapters:
+        return {"status": "empty", "pages": num_pages}
 
     sampled_note = ""
     if is_large:
@@ -163,10 +265,91 @@ def _build_pdf_digest(name: str, data: bytes) -> str:
     elif num_pages > MAX_SCAN_PAGES:
         sampled_note = f" (sampled first {MAX_SCAN_PAGES} pages)"
 
-    return (
-        f"Artifact {name} summary: {num_pages} pages{sampled_note}.\n"
-        + "\n".join(snippets)
-    )
+    return {
+        "status": "ok",
+        "pages": num_pages,
+        "sampled_note": sampled_note,
+        "snippets": snippets,
+        "chapters": chapters,
+        "keyword_index": index,
+    }
+
+
+def _select_snippets(
+    candidates: Dict[int, str], scores: Dict[int, float], max_total: int
+) -> List[List[Any]]:
+    def rank(page: int) -> tuple:
+        score = scores.get(page, 0.0)
+        if page <= FIRST_PAGES:
+            score += FIRST_PAGE_BONUS
+        # Page 1 always goes first; it identifies the document.
+        return (page != 1, -score, page)
+
+    chosen: List[List[Any]] = []
+    total = 0
+    for page in sorted(candidates, key=rank):
+        snippet = candidates[page]
+        entry_len = len(f"[Page {page}] ") + len(snippet)
+        if total + entry_len > max_total:
+            continue
+        chosen.append([page, snippet])
+        total += entry_len
+    return sorted(chosen)
+
+
+def _render_digest(
+    name: str, record: Dict[str, Any], facts: Optional[Dict[str, Any]] = None
+) -> str:
+    status = record.get("status")
+    if status == "timeout":
+        return (
+            f"Artifact {name} is a PDF, but text extraction timed out. "
+            "Ask the user for the key dates and coverage, or to upload a smaller excerpt."
+        )
+    if status == "error":
+        return (
+            f"Artifact {name} is a PDF, but reading it failed this time. "
+            "It will be retried on the next turn."
+        )
+    if status == "unreadable":
+        return (
+            f"Artifact {name} is a PDF, but text extraction failed. "
+            "It may be scanned; please provide a text-based version or key dates."
+        )
+    num_pages = record.get("pages", 0)
+    if status != "ok":
+        return (
+            f"Artifact {name} is a PDF with {num_pages} pages. "
+            "Text extraction returned no usable content."
+        )
+    chapters = record.get("chapters") or []
+    if facts:
+        lines = [render_facts(name, record, facts)]
+        if chapters:
+            lines.append(_chapter_list(chapters))
+        return "\n".join(lines)
+    lines = [f"Artifact {name} summary: {num_pages} pages{record.get('sampled_note', '')}."]
+    if chapters:
+        lines.append(_chapter_list(chapters))
+    lines.extend(f"[Page {page}] {snippet}" for page, snippet in record["snippets"])
+    return "\n".join(lines)
+
+
+def _chapter_list(chapters: List[Dict[str, Any]]) -> str:
+    text = "Chapters (from PDF outline; use scan_chapters to read specific ones): "
+    entries = [f"{c['title']} (pp. {c['start']}-{c['end']})" for c in chapters]
+    joined = "; ".join(entries)
+    if len(joined) > MAX_CHAPTER_LIST_CHARS:
+        joined = joined[:MAX_CHAPTER_LIST_CHARS].rsplit(";", 1)[0] + "; ..."
+    return text + joined
+
+
+def _clean_snippet(text: str) -> str:
+    snippet = text.strip().replace("\x00", " ")
+    snippet = " ".join(snippet.split())
+    if len(snippet) > MAX_EXCERPT_CHARS:
+        snippet = snippet[:MAX_EXCERPT_CHARS] + "..."
+    return snippet
 
 
 def _safe_extract(reader: PdfReader, page_index: int) -> str:
@@ -176,9 +359,4 @@ def _safe_extract(reader: PdfReader, page_index: int) -> str:
         return ""
 
 
-def _has_keyword(text: str) -> bool:
-    lower = text.lower()
-    return any(k in lower for k in KEYWORDS)
-
-
-pdf_extract_tool = PdfExtractTool()
+pdf_extract_tool = PdfExtractTool()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from ..config import PDF_EXECUTOR, PDF_TIMEOUT_SECONDS, PDF_WORKERS
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> Executor:
+    """Return the shared, bounded executor used for pypdf work.
+
+    PDF_EXECUTOR="process" uses a process pool (true parallelism, but jobs and
+    their arguments must be picklable); anything else uses a thread pool.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = max(1, PDF_WORKERS)
+            if PDF_EXECUTOR == "process":
+                _executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="pdf"
+                )
+        return _executor
+
+
+async def run_pdf_job(
+    fn: Callable[..., Any], *args: Any, timeout: Optional[float] = PDF_TIMEOUT_SECONDS
+) -> Any:
+    """Run a blocking PDF job off the event loop.
+
+    Raises asyncio.TimeoutError when the job exceeds `timeout` seconds. Jobs
+    still queued are cancelled; a job already running cannot be interrupted
+    and finishes in the background with its result discarded.
+    """
+    global _executor
+    loop = asyncio.get_running_loop()
+    try:
+        future = loop.run_in_executor(get_executor(), fn, *args)
+        return await asyncio.wait_for(future, timeout=timeout if timeout else None)
+    except BrokenProcessPool:
+        # A crashed worker poisons the pool; drop it so the next job gets a new one.
+        with _executor_lock:
+            _executor = None
+        raise
@@ -0,0 +1,453 @@
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .blobs import BlobSource, open_blob_stream
+
+try:
+    from pypdf import PdfReader
+except Exception:  # pragma: no cover
+    PdfReader = None
+
+# Only the tail of the file is searched for startxref; the spec requires it
+# within the last 1024 bytes, with some slack for trailing garbage.
+TAIL_BYTES = 4096
+MAX_PREV_XREFS = 32
+MAX_STRING_CHARS = 200
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_XREF_RE = re.compile(rb"\s*xref\s*")
+_SUBSECTION_RE = re.compile(rb"(\d+)\s+(\d+)[ \t]*\r?\n?")
+_TRAILER_RE = re.compile(rb"\s*trailer\s*")
+_OBJ_HEADER_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b")
+_WS_RE = re.compile(rb"(?:\s|%[^\r\n]*)*")
+_NAME_RE = re.compile(rb"/([^\s/<>\[\]()%{}]*)")
+_NUMBER_RE = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)")
+_REF_RE = re.compile(rb"(\d+)\s+(\d+)\s+R\b")
+_KEYWORD_RE = re.compile(rb"(true|false|null)\b")
+_HEX_RE = re.compile(rb"<([0-9A-Fa-f\s]*)>")
+_REF_ARRAY_RE = re.compile(rb"\[(?:\s*\d+\s+\d+\s+R)+\s*\]")
+_STREAM_RE = re.compile(rb"\s*stream\r?\n")
+
+_ESCAPES = {
+    ord("n"): b"\n",
+    ord("r"): b"\r",
+    ord("t"): b"\t",
+    ord("b"): b"\b",
+    ord("f"): b"\f",
+}
+
+# PDFDocEncoding differs from Latin-1 only in 0x80-0xA0.
+_PDFDOC_TABLE = {
+    0x80 + i: ch
+    for i, ch in enumerate(
+        "\u2022\u2020\u2021\u2026\u2014\u2013\u0192\u2044\u2039\u203a\u2212"
+        "\u2030\u201e\u201c\u201d\u2018\u2019\u201a\u2122\ufb01\ufb02\u0141"
+        "\u0152\u0160\u0178\u017d\u0131\u0142\u0153\u0161\u017e"
+    )
+}
+_PDFDOC_TABLE[0xA0] = "\u20ac"
+
+
+class _Ref(tuple):
+    """An indirect reference (object number, generation)."""
+
+
+class _ProbeError(Exception):
+    pass
+
+
+def probe_pdf(data: bytes) -> Optional[Dict[str, Any]]:
+    """Read page count and basic metadata from the trailer, xref and page tree.
+
+    Works over a memoryview of `data` and touches only the handful of objects
+    it needs, so it never builds a full document model. Classic xref tables,
+    Flate-compressed xref streams and object streams are supported. Returns
+    None for anything else (other filters, broken offsets, encrypted files);
+    callers should then fall back to `probe_pdf_full`.
+    """
+    view = memoryview(data)
+    try:
+        return _Probe(view).run()
+    except (
+        _ProbeError,
+        ValueError,
+        IndexError,
+        KeyError,
+        TypeError,
+        OverflowError,
+        RecursionError,
+        zlib.error,
+    ):
+        return None
+    finally:
+        view.release()
+
+
+def probe_pdf_full(source: BlobSource) -> Optional[Dict[str, Any]]:
+    """Same result as `probe_pdf`, computed with pypdf (slow, full parse)."""
+    if PdfReader is None:
+        return None
+    try:
+        with open_blob_stream(source) as stream:
+            reader = PdfReader(stream)
+            info = reader.metadata or {}
+            return {
+                "pages": len(reader.pages),
+                "title": _clean_text(info.get("/Title")),
+                "author": _clean_text(info.get("/Author")),
+                "has_outline": bool(reader.outline),
+            }
+    except Exception:
+        return None
+
+
+class _Probe:
+    def __init__(self, view: memoryview) -> None:
+        self.view = view
+        self.trailers: list[Dict[bytes, Any]] = []
+        # Each section resolves an object number to (type, a, b) or None:
+        # type 1 entries are (1, offset, gen) and type 2 entries are
+        # (2, object stream, index). Entries are decoded only when looked up.
+        self.sections: list[Callable[[int], Optional[Tuple[int, int, int]]]] = []
+        self.object_streams: Dict[int, Tuple[bytes, Dict[int, int]]] = {}
+
+    def run(self) -> Dict[str, Any]:
+        self._read_xref_chain(self._find_startxref())
+        trailer = self.trailers[0]
+        if b"Encrypt" in trailer:
+            # Strings are encrypted; pypdf decrypts them (probe_pdf_full).
+            raise _ProbeError("encrypted")
+        root = self._resolve(trailer.get(b"Root"))
+        if not isinstance(root, dict):
+            raise _ProbeError("missing /Root")
+        pages = self._resolve(root.get(b"Pages"))
+        if not isinstance(pages, dict):
+            raise _ProbeError("missing /Pages")
+        count = self._resolve(pages.get(b"Count"))
+        if not isinstance(count, int) or count < 0:
+            raise _ProbeError("bad /Count")
+
+        info = self._resolve(trailer.get(b"Info"))
+        if not isinstance(info, dict):
+            info = {}
+        outlines = self._resolve(root.get(b"Outlines"))
+        has_outline = isinstance(outlines, dict) and (
+            b"First" in outlines or bool(self._resolve(outlines.get(b"Count")))
+        )
+        return {
+            "pages": count,
+            "title": _decode_text(self._resolve(info.get(b"Title"))),
+            "author": _decode_text(self._resolve(info.get(b"Author"))),
+            "has_outline": has_outline,
+        }
+
+    def _find_startxref(self) -> int:
+        start = max(0, len(self.view) - TAIL_BYTES)
+        last = None
+        for match in _STARTXREF_RE.finditer(self.view, start):
+            last = match
+        if last is None:
+            raise _ProbeError("no startxref")
+        return int(last.group(1))
+
+    def _read_xref_chain(self, offset: int) -> None:
+        seen = set()
+        while offset not in seen and len(seen) < MAX_PREV_XREFS:
+            seen.add(offset)
+            if _XREF_RE.match(self.view, offset) is not None:
+                trailer = self._read_xref_table(offset)
+                hybrid = trailer.get(b"XRefStm")
+                if isinstance(hybrid, int):
+                    self._read_xref_stream(hybrid)
+            else:
+                trailer = self._read_xref_stream(offset)
+            self.trailers.append(trailer)
+            prev = trailer.get(b"Prev")
+            if not isinstance(prev, int):
+                return
+            offset = prev
+
+    def _read_xref_table(self, offset: int) -> Dict[bytes, Any]:
+        view = self.view
+        pos = _XREF_RE.match(view, offset).end()
+        subsections = []
+        while True:
+            sub = _SUBSECTION_RE.match(view, pos)
+            if sub is None:
+                break
+            first, count = int(sub.group(1)), int(sub.group(2))
+            subsections.append((first, count, sub.end()))
+            pos = sub.end() + 20 * count
+
+        def section(number: int) -> Optional[Tuple[int, int, int]]:
+            for first, count, start in subsections:
+                if first <= number < first + count:
+                    entry = bytes(view[start + 20 * (number - first):][:18])
+                    if entry[17:18] != b"n":
+                        return (0, 0, 0)
+                    return (1, int(entry[:10]), int(entry[11:16]))
+            return None
+
+        trailer_match = _TRAILER_RE.match(self.view, pos)
+        if trailer_match is None:
+            raise _ProbeError("no trailer")
+        trailer, _ = _parse(self.view, trailer_match.end())
+        if not isinstance(trailer, dict):
+            raise _ProbeError("bad trailer")
+        self.sections.append(section)
+        return trailer
+
+    def _read_xref_stream(self, offset: int) -> Dict[bytes, Any]:
+        header = _OBJ_HEADER_RE.match(self.view, offset)
+        if header is None:
+            raise _ProbeError("bad xref offset")
+        stream_dict, data = _read_stream(self.view, header.end())
+        if stream_dict.get(b"Type") != b"XRef":
+            raise _ProbeError("not an xref stream")
+        widths = stream_dict.get(b"W")
+        if not isinstance(widths, list) or len(widths) != 3:
+            raise _ProbeError("bad /W")
+        size = stream_dict.get(b"Size", 0)
+        index = stream_dict.get(b"Index") or [0, size]
+        row = sum(widths)
+        if row == 0:
+            raise _ProbeError("empty /W")
+        ranges = []
+        base = 0
+        for first, count in zip(index[::2], index[1::2]):
+            ranges.append((first, count, base))
+            base += count * row
+        if base > len(data):
+            raise _ProbeError("short xref stream")
+
+        def section(number: int) -> Optional[Tuple[int, int, int]]:
+            for first, count, start in ranges:
+                if first <= number < first + count:
+                    pos = start + row * (number - first)
+                    fields = []
+                    for width in widths:
+                        fields.append(int.from_bytes(data[pos:pos + width], "big"))
+                        pos += width
+                    if widths[0] == 0:
+                        fields[0] = 1
+                    return (fields[0], fields[1], fields[2])
+            return None
+
+        self.sections.append(section)
+        return stream_dict
+
+    def _entry(self, number: int) -> Optional[Tuple[int, int, int]]:
+        # Newest section first, so incremental updates win.
+        for section in self.sections:
+            entry = section(number)
+            if entry is not None:
+                return entry
+        return None
+
+    def _resolve(self, value: Any, depth: int = 0) -> Any:
+        while isinstance(value, _Ref) and depth < 8:
+            value = self._load_object(value[0])
+            depth += 1
+        return value
+
+    def _load_object(self, number: int) -> Any:
+        entry = self._entry(number)
+        if entry is None or entry[0] == 0:
+            return None
+        if entry[0] == 2:
+            data, offsets = self._object_stream(entry[1])
+            if number not in offsets:
+                raise _ProbeError("object missing from object stream")
+            return _parse(data, offsets[number])[0]
+        header = _OBJ_HEADER_RE.match(self.view, entry[1])
+        if header is None or int(header.group(1)) != number:
+            raise _ProbeError("bad object offset")
+        return _parse(self.view, header.end())[0]
+
+    def _object_stream(self, number: int) -> Tuple[bytes, Dict[int, int]]:
+        cached = self.object_streams.get(number)
+        if cached is not None:
+            return cached
+        entry = self._entry(number)
+        if entry is None or entry[0] != 1:
+            raise _ProbeError("bad object stream")
+        header = _OBJ_HEADER_RE.match(self.view, entry[1])
+        if header is None:
+            raise _ProbeError("bad object stream offset")
+        stream_dict, data = _read_stream(self.view, header.end(), self._resolve)
+        first = stream_dict.get(b"First")
+        count = stream_dict.get(b"N")
+        if not isinstance(first, int) or not isinstance(count, int):
+            raise _ProbeError("bad object stream dict")
+        pairs = [int(tok) for tok in data[:first].split()[: 2 * count]]
+        offsets = {pairs[i]: first + pairs[i + 1] for i in range(0, len(pairs) - 1, 2)}
+        self.object_streams[number] = (data, offsets)
+        return data, offsets
+
+
+def _read_stream(
+    buf: Any, pos: int, resolve: Any = None
+) -> Tuple[Dict[bytes, Any], bytes]:
+    stream_dict, pos = _parse(buf, pos)
+    if not isinstance(stream_dict, dict):
+        raise _ProbeError("stream without dict")
+    match = _STREAM_RE.match(buf, pos)
+    if match is None:
+        raise _ProbeError("missing stream keyword")
+    length = stream_dict.get(b"Length")
+    if resolve is not None:
+        length = resolve(length)
+    if not isinstance(length, int):
+        raise _ProbeError("bad /Length")
+    raw = bytes(buf[match.end():match.end() + length])
+    filters = stream_dict.get(b"Filter")
+    if isinstance(filters, list):
+        filters = filters[0] if len(filters) == 1 else filters
+    if filters is None:
+        data = raw
+    elif filters == b"FlateDecode":
+        data = zlib.decompress(raw)
+    else:
+        raise _ProbeError("unsupported filter")
+    params = stream_dict.get(b"DecodeParms")
+    if isinstance(params, list):
+        params = params[0] if params else None
+    if isinstance(params, dict) and params.get(b"Predictor", 1) >= 10:
+        data = _png_unpredict(data, params.get(b"Columns", 1))
+    return stream_dict, data
+
+
+def _png_unpredict(data: bytes, columns: int) -> bytes:
+    # Xref streams use PNG predictors with one byte per sample.
+    stride = columns + 1
+    out = bytearray()
+    prev = bytearray(columns)
+    for start in range(0, len(data) - columns, stride):
+        kind = data[start]
+        row = bytearray(data[start + 1:start + stride])
+        if kind == 2:
+            for i in range(columns):
+                row[i] = (row[i] + prev[i]) & 0xFF
+        elif kind == 1:
+            for i in range(1, columns):
+                row[i] = (row[i] + row[i - 1]) & 0xFF
+        elif kind != 0:
+            raise _ProbeError("unsupported PNG predictor")
+        out += row
+        prev = row
+    return bytes(out)
+
+
+def _parse(buf: Any, pos: int) -> Tuple[Any, int]:
+    pos = _WS_RE.match(buf, pos).end()
+    head = bytes(buf[pos:pos + 2])
+    if head == b"<<":
+        result: Dict[bytes, Any] = {}
+        pos += 2
+        while True:
+            pos = _WS_RE.match(buf, pos).end()
+            if bytes(buf[pos:pos + 2]) == b">>":
+                return result, pos + 2
+            name = _NAME_RE.match(buf, pos)
+            if name is None:
+                raise _ProbeError("bad dict key")
+            value, pos = _parse(buf, name.end())
+            result[bytes(name.group(1))] = value
+    if head[:1] == b"[":
+        refs = _REF_ARRAY_RE.match(buf, pos)
+        if refs is not None:
+            # Fast path for long reference arrays such as /Kids.
+            items = [
+                _Ref((int(num), int(gen)))
+                for num, gen in _REF_RE.findall(refs.group(0))
+            ]
+            return items, refs.end()
+        items = []
+        pos += 1
+        while True:
+            pos = _WS_RE.match(buf, pos).end()
+            if bytes(buf[pos:pos + 1]) == b"]":
+                return items, pos + 1
+            item, pos = _parse(buf, pos)
+            items.append(item)
+    if head[:1] == b"/":
+        name = _NAME_RE.match(buf, pos)
+        return bytes(name.group(1)), name.end()
+    if head[:1] == b"(":
+        return _parse_literal(buf, pos + 1)
+    if head[:1] == b"<":
+        match = _HEX_RE.match(buf, pos)
+        if match is None:
+            raise _ProbeError("bad hex string")
+        digits = re.sub(rb"\s", b"", match.group(1))
+        if len(digits) % 2:
+            digits += b"0"
+        return bytes.fromhex(digits.decode("ascii")), match.end()
+    ref = _REF_RE.match(buf, pos)
+    if ref is not None:
+        return _Ref((int(ref.group(1)), int(ref.group(2)))), ref.end()
+    number = _NUMBER_RE.match(buf, pos)
+    if number is not None:
+        raw = number.group(0)
+        value = float(raw) if b"." in raw else int(raw)
+        return value, number.end()
+    keyword = _KEYWORD_RE.match(buf, pos)
+    if keyword is not None:
+        word = keyword.group(1)
+        return {b"true": True, b"false": False}.get(word), keyword.end()
+    raise _ProbeError("unexpected token")
+
+
+def _parse_literal(buf: Any, pos: int) -> Tuple[bytes, int]:
+    out = bytearray()
+    depth = 1
+    while pos < len(buf):
+        ch = buf[pos]
+        pos += 1
+        if ch == 0x5C:  # backslash
+            nxt = buf[pos]
+            pos += 1
+            if nxt in _ESCAPES:
+                out += _ESCAPES[nxt]
+            elif 0x30 <= nxt <= 0x37:
+                digits = bytes([nxt])
+                while len(digits) < 3 and 0x30 <= buf[pos] <= 0x37:
+                    digits += bytes([buf[pos]])
+                    pos += 1
+                out.append(int(digits, 8) & 0xFF)
+            elif nxt in (0x0A, 0x0D):
+                if nxt == 0x0D and buf[pos] == 0x0A:
+                    pos += 1
+            else:
+                out.append(nxt)
+            continue
+        if ch == 0x28:
+            depth += 1
+        elif ch == 0x29:
+            depth -= 1
+            if depth == 0:
+                return bytes(out), pos
+        out.append(ch)
+    raise _ProbeError("unterminated string")
+
+
+def _decode_text(value: Any) -> Optional[str]:
+    if not isinstance(value, bytes):
+        return None
+    if value.startswith(b"\xfe\xff"):
+        text = value[2:].decode("utf-16-be", errors="replace")
+    elif value.startswith(b"\xef\xbb\xbf"):
+        text = value[3:].decode("utf-8", errors="replace")
+    else:
+        text = value.decode("latin-1").translate(_PDFDOC_TABLE)
+    return _clean_text(text)
+
+
+def _clean_text(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    text = " ".join(value.replace("\x00", " ").split())
+    return text[:MAX_STRING_CHARS] or None
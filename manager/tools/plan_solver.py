@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .utils import WEEKDAYS
+
+
+def solve_plan(
+    specs: Sequence[Tuple[str, dt.date, float]],
+    start_date: dt.date,
+    days_off: set[str],
+    daily_max: float,
+) -> Dict[str, Any]:
+    """Schedule every course's hours before its exam, or prove it cannot be done.
+
+    Allocation is a flow problem over (day, course) cells: each course can
+    use any study day before its exam, and each day holds at most
+    `daily_max`. Because every course's window starts on the same day, the
+    windows are nested and the flow is decided by prefix sums: a plan exists
+    iff, for every exam date, the hours due by then fit in the study days
+    before it. The smallest daily peak that works is the largest
+    hours-due / study-days ratio over those prefixes; the plan never goes
+    above it, and within each day hours are split in proportion to what each
+    course still needs.
+
+    Works in integer hundredths of an hour, so every allocated hour is
+    accounted for exactly. Returns {"ok": True, "plan", "peak_hours"} or
+    {"ok": False, "infeasible": {...}} naming the exam date whose courses
+    cannot fit, with required and available hours.
+    """
+    cap = int(daily_max * 100 + 1e-9)
+    courses = [
+        (code, exam, int(round(hours * 100))) for code, exam, hours in specs if hours > 0
+    ]
+    if not courses:
+        return {"ok": True, "plan": [], "peak_hours": 0.0}
+
+    last_exam = max(exam for _, exam, _ in courses)
+    horizon = max((last_exam - start_date).days, 1)
+    off_weekdays = {i for i, name in enumerate(WEEKDAYS) if name in days_off}
+    first_weekday = start_date.weekday()
+    is_study = [(first_weekday + i) % 7 not in off_weekdays for i in range(horizon)]
+    study_before = [0] * (horizon + 1)
+    for i, studying in enumerate(is_study):
+        study_before[i + 1] = study_before[i] + studying
+
+    # Course indices in deadline order, and the distinct deadlines as groups.
+    offsets = [min(max((exam - start_date).days, 0), horizon) for _, exam, _ in courses]
+    order = sorted(range(len(courses)), key=lambda k: (offsets[k], k))
+    deadlines = sorted(set(offsets))
+    group_of = {offset: g for g, offset in enumerate(deadlines)}
+
+    # Feasibility and the lowest daily peak, from the prefix condition.
+    level = 0
+    worst = None
+    due = 0
+    position = 0
+    for offset in deadlines:
+        while position < len(order) and offsets[order[position]] == offset:
+            due += courses[order[position]][2]
+            position += 1
+        days = study_before[offset]
+        shortfall = due - cap * days
+        if shortfall > 0 and (worst is None or shortfall > worst[0]):
+            worst = (shortfall, offset, due, days)
+        if days:
+            level = max(level, -(-due // days))
+    if worst is not None:
+        _, offset, due, days = worst
+        return {
+            "ok": False,
+            "infeasible": {
+                "deadline": (start_date + dt.timedelta(days=offset)).isoformat(),
+                "courses": [courses[k][0] for k in order if offsets[k] <= offset],
+                "required_hours": due / 100,
+                "available_hours": cap * days / 100,
+                "study_days": days,
+                "daily_max_hours": daily_max,
+            },
+        }
+
+    remaining = [cents for _, _, cents in courses]
+    plan: List[Dict[str, Any]] = []
+    for i in range(horizon):
+        if not is_study[i]:
+            continue
+        active = [k for k in order if offsets[k] > i and remaining[k] > 0]
+        if not active:
+            continue
+        alloc = _allocate_day(i, active, offsets, remaining, study_before, level, group_of)
+        tasks = []
+        total = 0
+        for k in sorted(alloc):
+            cents = alloc[k]
+            if cents <= 0:
+                continue
+            remaining[k] -= cents
+            total += cents
+            tasks.append({"course": courses[k][0], "hours": cents / 100})
+        if tasks:
+            day = start_date + dt.timedelta(days=i)
+            plan.append({"date": day.isoformat(), "tasks": tasks, "total_hours": total / 100})
+
+    return {"ok": True, "plan": plan, "peak_hours": level / 100}
+
+
+def _allocate_day(
+    day: int,
+    active: List[int],
+    offsets: List[int],
+    remaining: List[int],
+    study_before: List[int],
+    level: int,
+    group_of: Dict[int, int],
+) -> Dict[int, int]:
+    """One day's cents per course: proportional, then fixed up to stay feasible.
+
+    For each deadline d, whatever is due by d after today must still fit in
+    `level` x (study days left before d - 1), which sets a minimum for today.
+    Minimums are topped up earliest-deadline first, then anything above
+    `level` is trimmed latest-deadline first without breaking a minimum.
+    """
+    alloc: Dict[int, int] = {}
+    for k in active:
+        days_left = study_before[offsets[k]] - study_before[day]
+        alloc[k] = min(remaining[k], -(-remaining[k] // days_left))
+
+    # Per deadline group (active is in deadline order): minimum for today.
+    groups = sorted({group_of[offsets[k]] for k in active})
+    members: Dict[int, List[int]] = {g: [] for g in groups}
+    for k in active:
+        members[group_of[offsets[k]]].append(k)
+    prefix: List[int] = []
+    need: Dict[int, int] = {}
+    due = 0
+    for g in groups:
+        prefix.extend(members[g])
+        due += sum(remaining[k] for k in members[g])
+        offset = offsets[members[g][0]]
+        days_left = study_before[offset] - study_before[day]
+        need[g] = max(0, due - level * (days_left - 1))
+        deficit = need[g] - sum(alloc[k] for k in prefix)
+        for k in prefix:
+            if deficit <= 0:
+                break
+            extra = min(deficit, remaining[k] - alloc[k])
+            alloc[k] += extra
+            deficit -= extra
+
+    excess = sum(alloc.values()) - level
+    if excess > 0:
+        slack = {}
+        running = 0
+        for g in groups:
+            running += sum(alloc[k] for k in members[g])
+            slack[g] = running - need[g]
+        for k in reversed(active):
+            if excess <= 0:
+                break
+            g = group_of[offsets[k]]
+            cut = min([excess, alloc[k]] + [slack[h] for h in groups if h >= g])
+            if cut <= 0:
+                continue
+            alloc[k] -= cut
+            excess -= cut
+            for h in groups:
+                if h >= g:
+                    slack[h] -= cut
+    return alloc
@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import datetime as dt
+import hashlib
+import io
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from google.adk.models import LlmResponse
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from .export_plan import EXPORT_KEY
+from .generate_plan import focus_labels
+from .session_store import bind_session, get_state, session_id_of
+from .utils import WEEKDAYS, normalize_course_code
+
+HOURS_TOLERANCE = 0.01
+# Session state: invocation id the review shortcut last ran for.
+REVIEW_CHECK_KEY = "_review_checked_invocation"
+# A review request that also asks for changes still goes to the model.
+EDIT_REQUEST_RE = re.compile(
+    r"\b(add|move|change|remove|delete|drop|swap|shift|reschedul\w*|instead|"
+    r"edit|update|fix|more|less|fewer|extend|shorten|replace|rename)\b",
+    re.IGNORECASE,
+)
+
+
+class PlanRow:
+    __slots__ = ("line", "date", "course", "focus", "hours", "total")
+
+    def __init__(
+        self,
+        line: int,
+        date: dt.date,
+        course: str,
+        focus: str,
+        hours: float,
+        total: Optional[float],
+    ) -> None:
+        self.line = line
+        self.date = date
+        self.course = course
+        self.focus = focus
+        self.hours = hours
+        self.total = total
+
+
+class PlanTable:
+    """A plan CSV parsed once: rows plus date and course indexes."""
+
+    def __init__(self) -> None:
+        self.rows: List[PlanRow] = []
+        self.by_date: Dict[dt.date, List[int]] = {}
+        self.by_course: Dict[str, List[int]] = {}
+        self.findings: List[Dict[str, Any]] = []
+
+    @classmethod
+    def parse(cls, text: str) -> "PlanTable":
+        """Parse Date, Course, [Focus], Hours[, Total] columns, in any order.
+
+        Rows that cannot be read become `bad_row` findings instead of errors.
+        """
+        table = cls()
+        reader = csv.reader(io.StringIO(text))
+        header = next(reader, None)
+        columns = _columns(header or [])
+        if columns is None:
+            table.findings.append(
+                _finding("bad_header", "CSV needs Date, Course and Hours columns.", line=1)
+            )
+            return table
+
+        width = max(columns.values()) + 1
+        for line, record in enumerate(reader, start=2):
+            if not any(cell.strip() for cell in record):
+                continue
+            record = record + [""] * (width - len(record))
+            try:
+                date = dt.date.fromisoformat(record[columns["date"]].strip())
+                hours = float(record[columns["hours"]].strip())
+                total_cell = record[columns["total"]].strip() if "total" in columns else ""
+                total = float(total_cell) if total_cell else None
+            except ValueError:
+                table.findings.append(
+                    _finding("bad_row", "Row has an unreadable date or hours.", line=line)
+                )
+                continue
+            course = normalize_course_code(record[columns["course"]])
+            focus = record[columns["focus"]].strip() if "focus" in columns else ""
+            index = len(table.rows)
+            table.rows.append(PlanRow(line, date, course, focus, hours, total))
+            table.by_date.setdefault(date, []).append(index)
+            table.by_course.setdefault(course, []).append(index)
+        return table
+
+
+class PlanRules:
+    """What a plan is checked against. Unknown limits are not checked.
+
+    `history` holds (date, course) pairs of past days the planner kept as
+    they were studied (see planning.replan); matching rows are counted, not
+    checked.
+    """
+
+    def __init__(
+        self,
+        exam_dates: Optional[Dict[str, dt.date]] = None,
+        daily_max_hours: Optional[float] = None,
+        days_off: Optional[Set[str]] = None,
+        today: Optional[dt.date] = None,
+        history: Optional[Set[Tuple[dt.date, str]]] = None,
+    ) -> None:
+        self.exam_dates = exam_dates or {}
+        self.daily_max_hours = daily_max_hours
+        self.days_off = days_off or set()
+        self.today = today
+        self.history = history or set()
+
+
+def rules_from_state(today: Optional[dt.date] = None) -> PlanRules:
+    state = get_state()
+    prefs = state.preferences
+    exam_dates: Dict[str, dt.date] = {}
+    for code, course in state.courses.items():
+        exam = _parse_iso(course.exam_date)
+        if exam is not None:
+            exam_dates[normalize_course_code(code)] = exam
+    today = today or dt.datetime.now().astimezone().date()
+    history = {
+        (dt.date.fromisoformat(day.date), normalize_course_code(course))
+        for day in state.study_plan.days(until=today.isoformat())
+        for course, _ in day.tasks
+    }
+    return PlanRules(
+        exam_dates=exam_dates,
+        daily_max_hours=float(prefs.daily_max_hours),
+        days_off={d.strip().lower() for d in prefs.days_off},
+        today=today,
+        history=history,
+    )
+
+
+def _parse_iso(value: Optional[str]) -> Optional[dt.date]:
+    """Unparseable dates count as unknown, so they are not checked."""
+    if not value:
+        return None
+    try:
+        return dt.date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def validate_table(table: PlanTable, rules: PlanRules) -> Dict[str, Any]:
+    """Run every check over the table in one pass over rows and one over days.
+
+    Returns {"ok", "clean", "rows", "days", "history_rows", "findings",
+    "counts", "courses_without_exam_date"}; each finding is a dict with
+    "check", "message" and, where they apply, "line", "date" and "course".
+    Rows in `rules.history` are past days kept as studied: they count
+    towards "history_rows" and are left out of every check.
+    """
+    findings = list(table.findings)
+    seen: Set[tuple] = set()
+    checked: Dict[dt.date, List[PlanRow]] = {}
+    history_rows = 0
+    for row in table.rows:
+        if (row.date, row.course) in rules.history:
+            history_rows += 1
+            continue
+        checked.setdefault(row.date, []).append(row)
+        key = (row.date, row.course, row.focus.lower())
+        if key in seen:
+            findings.append(
+                _finding("duplicate_row", "Same course and focus twice on one day.", row=row)
+            )
+        seen.add(key)
+        if row.hours <= 0:
+            findings.append(_finding("bad_hours", "Task has no study hours.", row=row))
+        exam = rules.exam_dates.get(row.course)
+        if rules.exam_dates and exam is None:
+            findings.append(
+                _finding("unknown_course", "Course is not one of the planned courses.", row=row)
+            )
+        elif exam is not None and row.date > exam:
+            findings.append(
+                _finding(
+                    "after_exam",
+                    f"Task is after the exam on {exam.isoformat()}.",
+                    row=row,
+                )
+            )
+        if rules.today is not None and row.date < rules.today:
+            findings.append(_finding("past_date", "Task is scheduled before today.", row=row))
+
+    for date, rows in checked.items():
+        total = round(sum(row.hours for row in rows), 2)
+        if rules.daily_max_hours is not None and total > rules.daily_max_hours + HOURS_TOLERANCE:
+            findings.append(
+                _finding(
+                    "over_daily_max",
+                    f"{total}h planned, limit is {rules.daily_max_hours}h.",
+                    line=rows[0].line,
+                    date=date,
+                )
+            )
+        declared = {row.total for row in rows if row.total is not None}
+        if any(abs(value - total) > HOURS_TOLERANCE for value in declared):
+            findings.append(
+                _finding(
+                    "total_mismatch",
+                    f"Listed total {sorted(declared)} does not match task sum {total}h.",
+                    line=rows[0].line,
+                    date=date,
+                )
+            )
+        if WEEKDAYS[date.weekday()] in rules.days_off:
+            findings.append(
+                _finding(
+                    "day_off",
+                    f"{WEEKDAYS[date.weekday()].title()} is a day off.",
+                    line=rows[0].line,
+                    date=date,
+                )
+            )
+
+    for course in sorted(rules.exam_dates):
+        if course not in table.by_course:
+            findings.append(
+                _finding("missing_course", "Course has no study tasks.", course=course)
+            )
+
+    counts: Dict[str, int] = {}
+    for finding in findings:
+        counts[finding["check"]] = counts.get(finding["check"], 0) + 1
+    return {
+        "ok": True,
+        "clean": not findings,
+        "rows": len(table.rows),
+        "days": len(table.by_date),
+        "history_rows": history_rows,
+        "findings": findings,
+        "counts": counts,
+        "courses_without_exam_date": sorted(
+            course for course in table.by_course if course not in rules.exam_dates
+        ),
+    }
+
+
+def validate_plan_csv(text: str, rules: Optional[PlanRules] = None) -> Dict[str, Any]:
+    return validate_table(PlanTable.parse(text), rules or rules_from_state())
+
+
+def state_plan_csv() -> str:
+    """The session's plan as CSV, byte for byte as generate_plan exports it."""
+    plan = get_state().study_plan
+    out = io.StringIO()
+    plan.write_csv(out, focus=focus_labels(plan))
+    return out.getvalue()
+
+
+def last_export_csv(state: Any) -> Optional[str]:
+    """Text of the session's last CSV export, if it is still on disk."""
+    exports = state.get(EXPORT_KEY)
+    record = exports.get("csv") if isinstance(exports, dict) else None
+    if not isinstance(record, dict) or not record.get("path"):
+        return None
+    try:
+        with open(record["path"], encoding="utf-8") as fh:
+            return fh.read()
+    except OSError:
+        return None
+
+
+def _columns(header: List[str]) -> Optional[Dict[str, int]]:
+    columns: Dict[str, int] = {}
+    for i, name in enumerate(header):
+        key = name.strip().lower()
+        if "total" in key:
+            columns.setdefault("total", i)
+        elif key.startswith("date") or key == "day":
+            columns.setdefault("date", i)
+        elif key.startswith("course"):
+            columns.setdefault("course", i)
+        elif key.startswith("focus") or key in ("topic", "task"):
+            columns.setdefault("focus", i)
+        elif "hour" in key:
+            columns.setdefault("hours", i)
+    if not {"date", "course", "hours"} <= columns.keys():
+        return None
+    return columns
+
+
+def _finding(
+    check: str,
+    message: str,
+    row: Optional[PlanRow] = None,
+    line: Optional[int] = None,
+    date: Optional[dt.date] = None,
+    course: Optional[str] = None,
+) -> Dict[str, Any]:
+    if row is not None:
+        line, date, course = row.line, row.date, row.course
+    finding: Dict[str, Any] = {"check": check, "message": message}
+    if line is not None:
+        finding["line"] = line
+    if date is not None:
+        finding["date"] = date.isoformat()
+    if course is not None:
+        finding["course"] = course
+    return finding
+
+
+class ValidatePlanTool(BaseTool):
+    def __init__(self) -> None:
+        super().__init__(
+            name="validate_plan",
+            description=(
+                "Check a CSV study plan for over-limit days, duplicates, tasks after "
+                "exams or before today, missing courses and total mismatches."
+            ),
+        )
+
+    def _get_declaration(self) -> types.FunctionDeclaration | None:
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "content": types.Schema(
+                        type=types.Type.STRING,
+                        description="CSV plan to check; defaults to the last exported plan.",
+                    ),
+                },
+            ),
+        )
+
+    async def run_async(
+        self, *, args: dict[str, Any], tool_context: ToolContext
+    ) -> Any:
+        bind_session(session_id_of(tool_context))
+        text = args.get("content")
+        if not text:
+            text = await asyncio.to_thread(last_export_csv, tool_context.state)
+        if not text:
+            if not get_state().study_plan:
+                return {"ok": False, "message": "No plan found. Build or export a plan first."}
+            text = state_plan_csv()
+        return validate_plan_csv(text)
+
+
+validate_plan_tool = ValidatePlanTool()
+
+
+def skip_review_if_clean(callback_context: Any, llm_request: Any) -> Optional[LlmResponse]:
+    """before_model_callback: answer a plain review request without the model.
+
+    Only the first model call of an invocation is considered, and only when
+    the user did not ask for changes, the last exported CSV is the current
+    plan in state (same sha256), that plan passes every check and every
+    course in it has a known exam date.
+    """
+    state = callback_context.state
+    invocation_id = callback_context.invocation_id
+    if state.get(REVIEW_CHECK_KEY) == invocation_id:
+        return None
+    state[REVIEW_CHECK_KEY] = invocation_id
+
+    user_text = _content_text(callback_context.user_content)
+    if EDIT_REQUEST_RE.search(user_text):
+        return None
+    exports = state.get(EXPORT_KEY)
+    record = exports.get("csv") if isinstance(exports, dict) else None
+    if not isinstance(record, dict) or not record.get("sha"):
+        return None
+    bind_session(session_id_of(callback_context))
+    if not get_state().study_plan:
+        return None
+    text = state_plan_csv()
+    # An export from an older plan, or one the model wrote by hand, is left
+    # to the model.
+    if hashlib.sha256(text.encode("utf-8")).hexdigest() != record["sha"]:
+        return None
+    result = validate_plan_csv(text)
+    if not result["clean"] or result["courses_without_exam_date"] or not result["rows"]:
+        return None
+
+    path = record["path"]
+    message = (
+        "Hi! I checked your plan.\n\n"
+        f"No issues found: {result['rows']} tasks over {result['days']} days, "
+        "all within your daily limit, on study days, after today and before "
+        f"each exam. The exported CSV is unchanged at {path}.\n\n"
+        "Would you like any edits?"
+    )
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part.from_text(text=message)])
+    )
+
+
+def _content_text(content: Any) -> str:
+    parts = getattr(content, "parts", None) or []
+    return " ".join(part.text for part in parts if getattr(part, "text", None))
@@ -1,65 +1,207 @@
 import datetime as dt
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from .state import STATE
+from .plan_solver import solve_plan
+from .session_store import get_state
+from .state import _clean_changes
+from .study_plan import StudyPlan
+from .utils import WEEKDAYS
 
-WEEKDAYS = [
-    "monday",
-    "tuesday",
-    "wednesday",
-    "thursday",
-    "friday",
-    "saturday",
-    "sunday",
-]
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None
 
+# (course code, exam date, estimated hours), in course order.
+CourseSpec = Tuple[str, dt.date, float]
+# allocate_plan arguments: (specs, start_date, days_off, daily_max).
+PlanProfile = Tuple[Sequence[CourseSpec], dt.date, set, float]
 
-def build_plan() -> Dict[str, Any]:
-    courses = STATE["courses"]
-    prefs = STATE["preferences"]
+# Profiles are allocated in blocks so the days x courses matrices of one
+# block stay small.
+BATCH_BLOCK_PROFILES = 2048
+
+
+def build_plan(mode: str = "greedy") -> Dict[str, Any]:
+    """Build the session's study plan.
+
+    mode="greedy" spreads hours proportionally day by day and may leave some
+    unallocated when daily limits bite near clustered exams; mode="optimal"
+    always fits every course before its exam, or reports why it cannot.
+    """
+    inputs = _plan_inputs(mode)
+    if not inputs["ok"]:
+        return inputs
+    result = _schedule(mode, inputs["specs"], inputs["start_date"], inputs)
+    if result["ok"]:
+        state = get_state()
+        state.commit(study_plan=StudyPlan.from_rows(result.pop("plan")))
+        state.plan_changes = _clean_changes()
+        result["days"] = len(state.study_plan)
+    return result
+
+
+def replan(mode: str = "greedy", today: Optional[dt.date] = None) -> Dict[str, Any]:
+    """Update the study plan after input changes, keeping days already past.
+
+    Days before today are kept as they are; every later row is dropped and
+    the hours still left per course are re-planned from today, or from the
+    start date if that is later. With no changes recorded since the last
+    build nothing is recomputed.
+    """
+    state = get_state()
+    old_plan = state.study_plan
+    if not old_plan:
+        return build_plan(mode)
+    changes = state.plan_changes
+    if not changes["courses"] and not changes["preferences"]:
+        return {"ok": True, "days": len(old_plan), "unchanged": True}
+
+    inputs = _plan_inputs(mode)
+    if not inputs["ok"]:
+        return inputs
+    today = today or dt.date.today()
+    # Past rows are history; a start date moved later must not keep the
+    # rows between today and the new start.
+    kept = list(old_plan.days(until=today.isoformat()))
+    done: Dict[str, float] = {}
+    for day in kept:
+        for course, hours in day.tasks:
+            done[course] = done.get(course, 0.0) + hours
+    specs = []
+    for code, exam, hours in inputs["specs"]:
+        left = round(hours - done.get(code, 0.0), 2)
+        if left > 0:
+            specs.append((code, exam, left))
+
+    result = _schedule(mode, specs, max(today, inputs["start_date"]), inputs)
+    if not result["ok"]:
+        return result
+    new_plan = StudyPlan.from_rows(kept + result.pop("plan"))
+    state.commit(study_plan=new_plan)
+    state.plan_changes = _clean_changes()
+    result.update(
+        days=len(new_plan), kept_days=len(kept), changed_courses=changes["courses"]
+    )
+    return result
+
+
+def _plan_inputs(mode: str) -> Dict[str, Any]:
+    if mode not in ("greedy", "optimal"):
+        return {"ok": False, "message": 'mode must be "greedy" or "optimal".'}
+
+    state = get_state()
+    courses = state.courses
+    prefs = state.preferences
 
     if not courses:
         return {"ok": False, "message": "No courses found. Ingest materials first."}
 
-    missing_dates = [c for c in courses.values() if not c.get("exam_date")]
+    missing_dates = [c for c in courses.values() if not c.exam_date]
     if missing_dates:
         return {"ok": False, "message": "Missing exam dates for one or more courses."}
 
-    missing_hours = [c for c in courses.values() if not c.get("estimated_hours")]
+    missing_hours = [c for c in courses.values() if not c.estimated_hours]
     if missing_hours:
         return {"ok": False, "message": "Missing estimated hours. Run estimation first."}
 
-    start_date = _resolve_start_date(prefs.get("start_date"))
-    last_exam = max(dt.date.fromisoformat(c["exam_date"]) for c in courses.values())
+    return {
+        "ok": True,
+        "specs": [
+            (code, dt.date.fromisoformat(c.exam_date), float(c.estimated_hours))
+            for code, c in courses.items()
+        ],
+        "start_date": _resolve_start_date(prefs.start_date),
+        "days_off": {d.strip().lower() for d in prefs.days_off},
+        "daily_max": float(prefs.daily_max_hours),
+    }
+
+
+def _schedule(
+    mode: str, specs: List[CourseSpec], start_date: dt.date, inputs: Dict[str, Any]
+) -> Dict[str, Any]:
+    days_off = inputs["days_off"]
+    daily_max = inputs["daily_max"]
+    if mode == "optimal":
+        solved = solve_plan(specs, start_date, days_off, daily_max)
+        if not solved["ok"]:
+            details = solved["infeasible"]
+            return {
+                "ok": False,
+                "message": (
+                    f"Cannot fit {details['required_hours']}h due by "
+                    f"{details['deadline']} into {details['available_hours']}h available."
+                ),
+                "infeasible": details,
+            }
+        return {
+            "ok": True,
+            "plan": solved["plan"],
+            "mode": mode,
+            "peak_hours": solved["peak_hours"],
+        }
+
+    plan = allocate_plan(specs, start_date, days_off, daily_max)
+    result: Dict[str, Any] = {"ok": True, "plan": plan}
+    unallocated = _unallocated_hours(specs, plan)
+    if unallocated:
+        result["unallocated_hours"] = unallocated
+        result["message"] = 'Some hours did not fit; try mode="optimal".'
+    return result
+
+
+def allocate_plan(
+    specs: Sequence[CourseSpec],
+    start_date: dt.date,
+    days_off: set[str],
+    daily_max: float,
+) -> List[Dict[str, Any]]:
+    """Spread each course's hours over the study days before its exam.
+
+    Each day, every course still due gets remaining / study-days-left, scaled
+    down together when the sum exceeds `daily_max`. Study days left before
+    an exam come from a prefix count over the horizon, so the whole plan is
+    O(days x courses).
+    """
+    if not specs:
+        return []
+    last_exam = max(exam for _, exam, _ in specs)
     end_date = last_exam - dt.timedelta(days=1)
     if end_date < start_date:
         end_date = start_date
+    horizon = (end_date - start_date).days + 1
 
-    days_off = {d.strip().lower() for d in prefs.get("days_off", [])}
-    daily_max = float(prefs.get("daily_max_hours", 3.0))
+    # study_before[i]: study days in [start_date, start_date + i).
+    off_weekdays = {i for i, name in enumerate(WEEKDAYS) if name in days_off}
+    first_weekday = start_date.weekday()
+    is_study = [(first_weekday + i) % 7 not in off_weekdays for i in range(horizon)]
+    study_before = [0] * (horizon + 1)
+    for i, studying in enumerate(is_study):
+        study_before[i + 1] = study_before[i] + studying
 
-    remaining = {code: float(c["estimated_hours"]) for code, c in courses.items()}
+    # Exams are at most one day past the horizon; clamp anything earlier.
+    exam_offsets = [
+        min(max((exam - start_date).days, 0), horizon) for _, exam, _ in specs
+    ]
+    remaining = [hours for _, _, hours in specs]
 
     plan: List[Dict[str, Any]] = []
-    for day in _date_range(start_date, end_date):
-        if WEEKDAYS[day.weekday()] in days_off:
+    for i in range(horizon):
+        if not is_study[i]:
             continue
 
         active = [
-            code
-            for code, course in courses.items()
-            if dt.date.fromisoformat(course["exam_date"]) > day and remaining[code] > 0
+            k for k in range(len(specs)) if exam_offsets[k] > i and remaining[k] > 0
         ]
         if not active:
             continue
 
-        targets: Dict[str, float] = {}
+        targets: List[Tuple[int, float]] = []
         total_target = 0.0
-        for code in active:
-            exam_date = dt.date.fromisoformat(courses[code]["exam_date"])
-            days_left = _remaining_days(day, exam_date, days_off)
-            target = remaining[code] / max(days_left, 1)
-            targets[code] = target
+        for k in active:
+            days_left = max(study_before[exam_offsets[k]] - study_before[i], 1)
+            target = remaining[k] / days_left
+            targets.append((k, target))
             total_target += target
 
         scale = 1.0
@@ -67,18 +209,176 @@ def build_plan() -> Dict[str, Any]:
             scale = daily_max / total_target
 
         tasks = []
-        for code, target in targets.items():
+        for k, target in targets:
             hours = round(target * scale, 2)
             if hours <= 0:
                 continue
-            remaining[code] = round(remaining[code] - hours, 2)
-            tasks.append({"course": code, "hours": hours})
+            remaining[k] = round(remaining[k] - hours, 2)
+            tasks.append({"course": specs[k][0], "hours": hours})
 
         total_hours = round(sum(t["hours"] for t in tasks), 2)
+        day = start_date + dt.timedelta(days=i)
         plan.append({"date": day.isoformat(), "tasks": tasks, "total_hours": total_hours})
 
-    STATE["study_plan"] = plan
-    return {"ok": True, "days": len(plan)}
+    return plan
+
+
+def allocate_plans(
+    profiles: Sequence[PlanProfile], engine: Optional[str] = None
+) -> List[List[Dict[str, Any]]]:
+    """Plan many profiles at once (batch re-planning).
+
+    engine="numpy" runs the vectorized engine, "python" runs `allocate_plan`
+    per profile; the default picks NumPy when it is installed. Both engines
+    produce the same plans.
+    """
+    if engine is None:
+        engine = "numpy" if np is not None else "python"
+    if engine == "numpy" and np is not None:
+        plans: List[List[Dict[str, Any]]] = []
+        for start in range(0, len(profiles), BATCH_BLOCK_PROFILES):
+            plans.extend(_allocate_block_numpy(profiles[start : start + BATCH_BLOCK_PROFILES]))
+        return plans
+    return [allocate_plan(*profile) for profile in profiles]
+
+
+def _allocate_block_numpy(profiles: Sequence[PlanProfile]) -> List[List[Dict[str, Any]]]:
+    """`allocate_plan` for a block of profiles, as profiles x days x courses arrays.
+
+    Profiles are padded to the longest horizon and the most courses; padded
+    days are never study days and padded courses have no hours. Days are
+    still stepped in order (each day's allocation depends on the last), but
+    every step is one array operation across all profiles and courses.
+    """
+    count = len(profiles)
+    horizons = []
+    for specs, start_date, _, _ in profiles:
+        if not specs:
+            horizons.append(0)
+            continue
+        end_date = max(exam for _, exam, _ in specs) - dt.timedelta(days=1)
+        horizons.append(max((end_date - start_date).days, 0) + 1)
+    n_days = max(horizons, default=0)
+    n_courses = max((len(specs) for specs, _, _, _ in profiles), default=0)
+    if n_days == 0 or n_courses == 0:
+        return [[] for _ in profiles]
+
+    day_index = np.arange(n_days)
+    is_study = np.zeros((count, n_days), dtype=bool)
+    exam_offsets = np.zeros((count, n_courses), dtype=np.int64)
+    remaining = np.zeros((count, n_courses))
+    daily_max = np.empty(count)
+    for p, (specs, start_date, days_off, cap) in enumerate(profiles):
+        off_weekdays = [i for i, name in enumerate(WEEKDAYS) if name in days_off]
+        weekdays = (start_date.weekday() + day_index) % 7
+        is_study[p] = (day_index < horizons[p]) & ~np.isin(weekdays, off_weekdays)
+        for k, (_, exam, hours) in enumerate(specs):
+            exam_offsets[p, k] = min(max((exam - start_date).days, 0), horizons[p])
+            remaining[p, k] = hours
+        daily_max[p] = cap
+
+    # study_before[p, i]: study days in the first i days of profile p, and
+    # days_left[p, i, k]: study days from day i up to course k's exam.
+    study_before = np.zeros((count, n_days + 1), dtype=np.int64)
+    np.cumsum(is_study, axis=1, out=study_before[:, 1:])
+    before_exam = np.take_along_axis(study_before, exam_offsets, axis=1)
+    days_left = np.maximum(before_exam[:, None, :] - study_before[:, :n_days, None], 1)
+    due = exam_offsets[:, None, :] > day_index[None, :, None]
+
+    hours_out = np.zeros((count, n_days, n_courses))
+    has_row = np.zeros((count, n_days), dtype=bool)
+    for i in range(n_days):
+        active = due[:, i, :] & (remaining > 0) & is_study[:, i, None]
+        has_row[:, i] = active.any(axis=1)
+        targets = np.where(active, remaining / days_left[:, i, :], 0.0)
+        # Summed course by course, like allocate_plan, so totals match to
+        # the last bit (ndarray.sum switches to pairwise summation).
+        total = np.zeros(count)
+        for k in range(n_courses):
+            total += targets[:, k]
+        scale = np.where(total > daily_max, daily_max / np.where(total > 0, total, 1.0), 1.0)
+        hours = _round_cents(targets * scale[:, None])
+        hours = np.where(hours > 0, hours, 0.0)
+        remaining = np.where(hours > 0, _round_cents(remaining - hours), remaining)
+        hours_out[:, i, :] = hours
+
+    # Row totals are summed course by course like the hours above; adding
+    # the zero hours of idle courses does not change a float sum.
+    row_totals = np.zeros((count, n_days))
+    for k in range(n_courses):
+        row_totals += hours_out[:, :, k]
+    row_totals = _round_cents(row_totals)
+
+    # Rows are built from nested lists: one bulk conversion is far cheaper
+    # than indexing the arrays element by element.
+    plans: List[List[Dict[str, Any]]] = []
+    row_days = has_row.tolist()
+    all_totals = row_totals.tolist()
+    iso_days: Dict[dt.date, List[str]] = {}
+    for p, (specs, start_date, _, _) in enumerate(profiles):
+        if start_date not in iso_days:
+            iso_days[start_date] = [
+                (start_date + dt.timedelta(days=i)).isoformat() for i in range(n_days)
+            ]
+        dates = iso_days[start_date]
+        codes = [code for code, _, _ in specs]
+        day_hours = hours_out[p, :, : len(specs)].tolist()
+        totals = all_totals[p]
+        plan = []
+        for i, has in enumerate(row_days[p]):
+            if not has:
+                continue
+            tasks = [
+                {"course": code, "hours": hours}
+                for code, hours in zip(codes, day_hours[i])
+                if hours > 0
+            ]
+            plan.append({"date": dates[i], "tasks": tasks, "total_hours": totals[i]})
+        plans.append(plan)
+    return plans
+
+
+def _unallocated_hours(
+    specs: Sequence[CourseSpec], plan: List[Dict[str, Any]]
+) -> Dict[str, float]:
+    planned: Dict[str, float] = {}
+    for day in plan:
+        for task in day["tasks"]:
+            planned[task["course"]] = planned.get(task["course"], 0.0) + task["hours"]
+    missing = {}
+    for code, _, hours in specs:
+        left = round(hours - planned.get(code, 0.0), 2)
+        if left > 0:
+            missing[code] = left
+    return missing
+
+
+def _round_cents(values: Any) -> Any:
+    """Element-wise round(x, 2) with Python's semantics.
+
+    np.round rounds the product x * 100, which can land exactly on .5 when x
+    itself is just below or above it; those ties are settled by the sign of
+    the product's rounding error, recovered exactly with error-free sums
+    (x * 100 = x * 64 + x * 32 + x * 4, each term exact).
+    """
+    scaled = values * 100.0
+    rounded = np.rint(scaled)
+    floor = np.floor(scaled)
+    tie = scaled - floor == 0.5
+    if tie.any():
+        a, b, c = values * 64.0, values * 32.0, values * 4.0
+        s1, e1 = _two_sum(a, b)
+        s2, e2 = _two_sum(s1, c)
+        error = (s2 - scaled) + e2 + e1
+        rounded = np.where(tie & (error > 0), floor + 1.0, rounded)
+        rounded = np.where(tie & (error < 0), floor, rounded)
+    return rounded / 100.0
+
+
+def _two_sum(a: Any, b: Any) -> Tuple[Any, Any]:
+    total = a + b
+    b_virtual = total - a
+    return total, (a - (total - b_virtual)) + (b - b_virtual)
 
 
 def _resolve_start_date(value: Any) -> dt.date:
@@ -88,22 +388,3 @@ def _resolve_start_date(value: Any) -> dt.date:
         except Exception:
             pass
     return dt.date.today()
-
-
-def _date_range(start: dt.date, end: dt.date) -> List[dt.date]:
-    days = []
-    cur = start
-    while cur <= end:
-        days.append(cur)
-        cur += dt.timedelta(days=1)
-    return days
-
-
-def _remaining_days(start: dt.date, end: dt.date, days_off: set[str]) -> int:
-    count = 0
-    cur = start
-    while cur < end:
-        if WEEKDAYS[cur.weekday()] not in days_off:
-            count += 1
-        cur += dt.timedelta(days=1)
-    return max(count, 1)
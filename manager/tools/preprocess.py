@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Sequence
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from .context_budget import agent_name_of, apply_budget
+from .digest_cache import cache_stats
+from .request_context import (
+    RequestContext,
+    bind_request_context,
+    release_request_context,
+)
+from .session_store import bind_session, session_id_of
+
+logger = logging.getLogger(__name__)
+
+
+class PreprocessPipelineTool(BaseTool):
+    """Runs preprocessing tools in order over one shared request context.
+
+    Stages see the same artifact listing and blobs, so each is fetched once
+    per LLM request instead of once per tool. The context they offer is
+    packed into the agent's token budget after the last stage. It also binds
+    the ADK session id, so planner state used later in this agent run is
+    that session's.
+    """
+
+    def __init__(self, stages: Sequence[BaseTool]) -> None:
+        super().__init__(
+            name="preprocess",
+            description="Runs request preprocessing tools as a single stage.",
+        )
+        self.stages = list(stages)
+
+    def _get_declaration(self) -> None:
+        return None
+
+    async def process_llm_request(
+        self, *, tool_context: ToolContext, llm_request: Any
+    ) -> None:
+        bind_session(session_id_of(tool_context))
+        ctx = RequestContext(tool_context)
+        bind_request_context(llm_request, ctx)
+        try:
+            for stage in self.stages:
+                await stage.process_llm_request(
+                    tool_context=tool_context, llm_request=llm_request
+                )
+            apply_budget(tool_context, llm_request, ctx.blocks)
+            if logger.isEnabledFor(logging.DEBUG):
+                # cache_stats() counts the cache's rows, so only when asked.
+                logger.debug("%s: digest cache %s", agent_name_of(tool_context), cache_stats())
+        finally:
+            release_request_context(llm_request)
+            ctx.close()
+
+
+def build_preprocess_tool(*stages: BaseTool) -> PreprocessPipelineTool:
+    return PreprocessPipelineTool(stages)
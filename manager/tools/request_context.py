@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from .blobs import BlobHandle, touch_blob
+from .uploads import UploadRegistry
+
+if TYPE_CHECKING:
+    from .context_budget import ContextBlock
+
+# Contexts bound by the preprocessing pipeline, keyed by id(llm_request). An
+# entry only lives while the pipeline holds a reference to the request.
+_ACTIVE: Dict[int, "RequestContext"] = {}
+
+
+class RequestContext:
+    """Per-LLM-request memo shared by the preprocessing tools.
+
+    The artifact listing and each artifact blob are fetched at most once per
+    request, however many tools ask for them.
+    """
+
+    def __init__(self, tool_context: ToolContext) -> None:
+        self._tool_context = tool_context
+        self._names: Optional[List[str]] = None
+        self._parts: Dict[str, Optional[types.Part]] = {}
+        self._blobs: Dict[str, Optional[BlobHandle]] = {}
+        # Set once inline_data parts have been stripped (and empty ones
+        # dropped), so later stages can skip walking the contents again.
+        self.inline_data_stripped = False
+        # Context offered by the stages (see context_budget.add_context),
+        # packed into the agent's budget once every stage has run.
+        self.blocks: List["ContextBlock"] = []
+
+    def list_artifacts(self) -> List[str]:
+        if self._names is None:
+            try:
+                self._names = list(self._tool_context.list_artifacts())
+            except Exception:
+                self._names = []
+        return list(self._names)
+
+    def load_artifact(self, name: str) -> Optional[types.Part]:
+        if name not in self._parts:
+            try:
+                self._parts[name] = self._tool_context.load_artifact(name)
+            except Exception:
+                self._parts[name] = None
+        return self._parts[name]
+
+    def blob(self, name: str) -> Optional[BlobHandle]:
+        """Handle on an artifact's inline bytes, or None if it has none.
+
+        Uploads that strip_inline_data spilled to disk are mapped from there
+        without loading the artifact at all.
+        """
+        if name in self._blobs:
+            return self._blobs[name]
+        registry = UploadRegistry(self._tool_context.state)
+        meta = registry.meta_for_name(name) or {}
+        path = meta.get("blob")
+        handle = None
+        if path and os.path.isfile(path):
+            touch_blob(path)
+            handle = BlobHandle(
+                name,
+                meta.get("mime") or "",
+                os.path.getsize(path),
+                sha=registry.sha_for_name(name),
+                path=path,
+            )
+        else:
+            part = self.load_artifact(name)
+            inline = getattr(part, "inline_data", None) if part is not None else None
+            data = getattr(inline, "data", None) if inline is not None else None
+            if data:
+                handle = BlobHandle(
+                    name,
+                    getattr(inline, "mime_type", "") or "",
+                    len(data),
+                    sha=registry.sha_for_name(name),
+                    data=data,
+                )
+        self._blobs[name] = handle
+        return handle
+
+    def close(self) -> None:
+        """Release the memory maps of spilled blobs opened for this request."""
+        for handle in self._blobs.values():
+            if handle is not None:
+                handle.close()
+
+    def record_saved(self, name: str, part: types.Part) -> None:
+        if self._names is not None and name not in self._names:
+            self._names.append(name)
+        self._parts[name] = part
+
+
+def get_request_context(tool_context: ToolContext, llm_request: Any) -> RequestContext:
+    """Return the pipeline's context for this request, or a private one.
+
+    Tools used outside the pipeline still work; they just do not share.
+    """
+    ctx = _ACTIVE.get(id(llm_request))
+    if ctx is None:
+        ctx = RequestContext(tool_context)
+    return ctx
+
+
+def bound_request_context(llm_request: Any) -> Optional[RequestContext]:
+    """The pipeline's context for this request, or None outside the pipeline."""
+    return _ACTIVE.get(id(llm_request))
+
+
+def bind_request_context(llm_request: Any, ctx: RequestContext) -> None:
+    _ACTIVE[id(llm_request)] = ctx
+
+
+def release_request_context(llm_request: Any) -> None:
+    _ACTIVE.pop(id(llm_request), None)
@@ -1,21 +1,19 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Optional
 
-from .state import STATE
+from .plan_validation import state_plan_csv, validate_plan_csv
+from .session_store import get_state
 
 
-def review_plan() -> Dict[str, Any]:
-    plan = STATE.get("study_plan") or []
-    prefs = STATE.get("preferences", {})
-    daily_max = float(prefs.get("daily_max_hours", 3.0))
+def review_plan(csv_text: Optional[str] = None) -> Dict[str, Any]:
+    """Validate a CSV plan, or the session's built plan when none is given."""
+    if csv_text is None:
+        if not get_state().study_plan:
+            return {"ok": False, "message": "No plan found. Build a plan first."}
+        csv_text = state_plan_csv()
 
-    if not plan:
-        return {"ok": False, "message": "No plan found. Build a plan first."}
-
-    warnings: List[str] = []
-    for day in plan:
-        if day.get("total_hours", 0) > daily_max + 1e-6:
-            warnings.append(
-                f"{day.get('date')} exceeds daily max ({day.get('total_hours')}h > {daily_max}h)"
-            )
-
-    return {"ok": True, "warnings": warnings}
+    result = validate_plan_csv(csv_text)
+    result["warnings"] = [
+        f"{finding.get('date', '')} {finding['message']}".strip()
+        for finding in result["findings"]
+    ]
+    return result
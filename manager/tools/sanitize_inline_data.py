@@ -5,6 +5,8 @@ from typing import Any
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
 
+from .request_context import get_request_context
+
 
 class SanitizeInlineDataTool(BaseTool):
     """Remove empty inline_data parts to avoid INVALID_ARGUMENT errors."""
@@ -25,6 +27,9 @@ class SanitizeInlineDataTool(BaseTool):
         contents = getattr(llm_request, "contents", None)
         if not contents:
             return
+        # strip_inline_data already removed every inline_data part this request.
+        if get_request_context(tool_context, llm_request).inline_data_stripped:
+            return
 
         for content in contents:
             parts = getattr(content, "parts", None)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from typing import Any
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from .chapter_index import (
+    CHAPTER_INDEX_KIND,
+    build_chapter_index_from_source,
+    extract_chapter_text,
+    page_count,
+    parse_chapter_spec,
+    select_chapters,
+)
+from .digest_cache import digest_cache
+from .keyword_index import KEYWORD_INDEX_KIND, page_scores
+from .pdf_extract import MAX_TOTAL_CHARS
+from .pdf_pool import run_pdf_job
+from .request_context import RequestContext
+from .session_store import bind_session, session_id_of
+from .state import add_material
+
+
+class ScanChaptersTool(BaseTool):
+    """Reads only the requested chapters of an uploaded textbook PDF."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            name="scan_chapters",
+            description=(
+                "Extracts text and page counts for specific chapters of an "
+                "uploaded PDF, using its outline or chapter headings."
+            ),
+        )
+
+    def _get_declaration(self) -> types.FunctionDeclaration | None:
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "artifact": types.Schema(
+                        type=types.Type.STRING,
+                        description="Uploaded PDF filename, e.g. upload_abcd.pdf.",
+                    ),
+                    "chapters": types.Schema(
+                        type=types.Type.STRING,
+                        description='Chapters to read, e.g. "1-4, 7". Empty lists them.',
+                    ),
+                    "course": types.Schema(
+                        type=types.Type.STRING,
+                        description="Optional course code to record the page count for.",
+                    ),
+                },
+                required=["artifact"],
+            ),
+        )
+
+    async def run_async(
+        self, *, args: dict[str, Any], tool_context: ToolContext
+    ) -> Any:
+        ctx = RequestContext(tool_context)
+        try:
+            return await self._scan(args, tool_context, ctx)
+        finally:
+            ctx.close()
+
+    async def _scan(
+        self, args: dict[str, Any], tool_context: ToolContext, ctx: RequestContext
+    ) -> Any:
+        name = args.get("artifact") or ""
+        blob = ctx.blob(name) if name else None
+        if blob is None or "pdf" not in blob.mime.lower():
+            return {"ok": False, "message": f"No uploaded PDF named {name!r}."}
+
+        sha = blob.digest()
+        index = digest_cache.get(sha, CHAPTER_INDEX_KIND)
+        if index is None:
+            try:
+                index = await run_pdf_job(build_chapter_index_from_source, blob.source)
+            except Exception:
+                return {"ok": False, "message": "Reading the PDF timed out or failed."}
+            digest_cache.put(sha, CHAPTER_INDEX_KIND, index)
+
+        available = index["chapters"]
+        if not available:
+            return {
+                "ok": False,
+                "message": "No outline or chapter headings found in this PDF.",
+                "pages": index.get("pages"),
+            }
+
+        wanted = parse_chapter_spec(args.get("chapters"))
+        if not wanted:
+            return {"ok": True, "artifact": name, "chapters": available}
+        selected = select_chapters(index, wanted)
+        if not selected:
+            return {
+                "ok": False,
+                "message": f"Chapters {args.get('chapters')} not found.",
+                "chapters": available,
+            }
+
+        # Reuse the keyword index from the digest pass, when there is one, so
+        # each chapter's share of the budget goes to its most relevant pages.
+        keyword_index = digest_cache.get(sha, KEYWORD_INDEX_KIND)
+        try:
+            snippets = await run_pdf_job(
+                extract_chapter_text,
+                blob.source,
+                [(c["start"], c["end"]) for c in selected],
+                MAX_TOTAL_CHARS,
+                page_scores(keyword_index) if keyword_index else None,
+            )
+        except Exception:
+            snippets = []
+
+        pages = page_count(selected)
+        result: dict[str, Any] = {
+            "ok": True,
+            "artifact": name,
+            "chapters": selected,
+            "pages_covered": pages,
+            "excerpt": "\n".join(f"[Page {page}] {text}" for page, text in snippets),
+        }
+        course = args.get("course")
+        if course:
+            bind_session(session_id_of(tool_context))
+            add_material(
+                course,
+                name,
+                pages=pages,
+                chapters=[c["chapter"] for c in selected],
+            )
+            result["course"] = course
+        return result
+
+
+scan_chapters_tool = ScanChaptersTool()
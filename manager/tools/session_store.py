@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from ..config import MAX_SESSIONS, SESSION_TTL_SECONDS
+from .study_plan import PlanDay, StudyPlan  # noqa: F401
+
+DEFAULT_SESSION = "default"
+
+_current_session: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "planner_session", default=DEFAULT_SESSION
+)
+
+
+class Course:
+    """Immutable course record; `replace` returns an updated copy.
+
+    Materials are a tuple of dicts that are never modified after they are
+    added, so versions of a course share them; `to_dict` hands out copies.
+    """
+
+    __slots__ = ("code", "name", "materials", "exam_date", "estimated_hours")
+
+    def __init__(
+        self,
+        code: str,
+        name: str = "",
+        materials: Tuple[Dict[str, Any], ...] = (),
+        exam_date: Optional[str] = None,
+        estimated_hours: Optional[float] = None,
+    ) -> None:
+        self.code = code
+        self.name = name
+        self.materials = materials
+        self.exam_date = exam_date
+        self.estimated_hours = estimated_hours
+
+    def replace(self, **changes: Any) -> "Course":
+        fields = {name: getattr(self, name) for name in _COURSE_FIELDS}
+        fields.update(changes)
+        return Course(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A fresh dict the caller may modify; shared materials are copied."""
+        return {
+            "code": self.code,
+            "name": self.name,
+            "materials": [_copy_plain(m) for m in self.materials],
+            "exam_date": self.exam_date,
+            "estimated_hours": self.estimated_hours,
+        }
+
+
+_COURSE_FIELDS = ("code", "name", "materials", "exam_date", "estimated_hours")
+
+
+def _copy_plain(value: Any) -> Any:
+    """Copy JSON-shaped data (dicts, lists, tuples of scalars)."""
+    if isinstance(value, dict):
+        return {key: _copy_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy_plain(item) for item in value]
+    return value
+
+
+class Preferences:
+    """Immutable planning preferences; `replace` returns an updated copy."""
+
+    __slots__ = ("daily_max_hours", "days_off", "start_date")
+
+    def __init__(
+        self,
+        daily_max_hours: float = 3.0,
+        days_off: Tuple[str, ...] = (),
+        start_date: Optional[str] = None,
+    ) -> None:
+        self.daily_max_hours = daily_max_hours
+        self.days_off = days_off
+        self.start_date = start_date
+
+    def replace(self, **changes: Any) -> "Preferences":
+        fields = {
+            "daily_max_hours": self.daily_max_hours,
+            "days_off": self.days_off,
+            "start_date": self.start_date,
+        }
+        fields.update(changes)
+        return Preferences(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "daily_max_hours": self.daily_max_hours,
+            "days_off": list(self.days_off),
+            "start_date": self.start_date,
+        }
+
+
+class StateSnapshot:
+    """One immutable version of a session's courses, preferences and plan.
+
+    Writers never change a snapshot; they commit a new one that shares every
+    course they did not touch, so taking a snapshot is a reference copy.
+    """
+
+    __slots__ = ("version", "courses", "preferences", "study_plan")
+
+    def __init__(
+        self,
+        version: int = 0,
+        courses: Optional[Mapping[str, Course]] = None,
+        preferences: Optional[Preferences] = None,
+        study_plan: Optional[StudyPlan] = None,
+    ) -> None:
+        self.version = version
+        if not isinstance(courses, MappingProxyType):
+            courses = MappingProxyType(courses or {})
+        self.courses: Mapping[str, Course] = courses
+        self.preferences = preferences or Preferences()
+        self.study_plan = study_plan if study_plan is not None else StudyPlan()
+
+    # Tool-facing renderings are built per call: tool results are handed to
+    # ADK and the caller, so nothing shared with the snapshot may leak out.
+    def courses_dict(self) -> Dict[str, Any]:
+        return {code: c.to_dict() for code, c in self.courses.items()}
+
+    def plan_rows(self) -> List[Dict[str, Any]]:
+        return self.study_plan.to_rows()
+
+
+class SessionState:
+    """Planner state for one ADK session.
+
+    `snapshot` is the current StateSnapshot; `commit` replaces it. Plan
+    bookkeeping (inputs changed since the last build) lives alongside.
+    """
+
+    __slots__ = ("snapshot", "plan_changes", "last_used")
+
+    def __init__(self) -> None:
+        self.snapshot = StateSnapshot()
+        # Inputs changed since the plan was built; planning.replan() consumes it.
+        self.plan_changes: Dict[str, Any] = {"courses": [], "preferences": False}
+        self.last_used = time.monotonic()
+
+    @property
+    def courses(self) -> Mapping[str, Course]:
+        return self.snapshot.courses
+
+    @property
+    def preferences(self) -> Preferences:
+        return self.snapshot.preferences
+
+    @property
+    def study_plan(self) -> StudyPlan:
+        return self.snapshot.study_plan
+
+    def commit(
+        self,
+        courses: Optional[Dict[str, Course]] = None,
+        preferences: Optional[Preferences] = None,
+        study_plan: Optional[StudyPlan] = None,
+    ) -> StateSnapshot:
+        """Publish a new version; omitted parts are shared with the current one."""
+        old = self.snapshot
+        new = StateSnapshot(
+            old.version + 1,
+            courses if courses is not None else old.courses,
+            preferences or old.preferences,
+            study_plan if study_plan is not None else old.study_plan,
+        )
+        self.snapshot = new
+        return new
+
+    def put_course(self, course: Course) -> StateSnapshot:
+        """Publish a version with `course` added or replaced."""
+        courses = dict(self.snapshot.courses)
+        courses[course.code] = course
+        return self.commit(courses=courses)
+
+
+class SessionStore:
+    """Session id -> SessionState, evicted by idle time and count.
+
+    Sessions never share a lock: lookups are single dict operations, and
+    eviction only runs when the store grows past `max_sessions` or a sweep
+    is due, so concurrent sessions do not contend on each other.
+    """
+
+    def __init__(self, ttl_seconds: float, max_sessions: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max(1, max_sessions)
+        self._sessions: Dict[str, SessionState] = {}
+        self._next_sweep = time.monotonic() + self._sweep_interval()
+
+    def get(self, session_id: str) -> SessionState:
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions.setdefault(session_id, SessionState())
+        now = time.monotonic()
+        state.last_used = now
+        if len(self._sessions) > self.max_sessions or now >= self._next_sweep:
+            self._evict(now, keep=session_id)
+        return state
+
+    def drop(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _sweep_interval(self) -> float:
+        return max(self.ttl_seconds / 4, 1.0) if self.ttl_seconds > 0 else float("inf")
+
+    def _evict(self, now: float, keep: str) -> None:
+        self._next_sweep = now + self._sweep_interval()
+        entries = list(self._sessions.items())
+        if self.ttl_seconds > 0:
+            cutoff = now - self.ttl_seconds
+            for session_id, state in entries:
+                if session_id != keep and state.last_used < cutoff:
+                    self._sessions.pop(session_id, None)
+        overflow = len(self._sessions) - self.max_sessions
+        if overflow > 0:
+            # Trim to 90% so a full store is not re-sorted on every new session.
+            overflow += self.max_sessions // 10
+            idle_first = sorted(
+                (item for item in self._sessions.items() if item[0] != keep),
+                key=lambda item: item[1].last_used,
+            )
+            for session_id, _ in idle_first[:overflow]:
+                self._sessions.pop(session_id, None)
+
+
+_store = SessionStore(SESSION_TTL_SECONDS, MAX_SESSIONS)
+
+
+def get_state() -> SessionState:
+    """State of the session bound to the current task (see `bind_session`)."""
+    return _store.get(_current_session.get())
+
+
+def snapshot() -> StateSnapshot:
+    """Current immutable version of this session's state."""
+    return get_state().snapshot
+
+
+def current_session_id() -> str:
+    return _current_session.get()
+
+
+def bind_session(session_id: Optional[str]) -> contextvars.Token:
+    """Make `session_id` current for this task and anything it awaits."""
+    return _current_session.set(session_id or DEFAULT_SESSION)
+
+
+@contextmanager
+def session_scope(session_id: Optional[str]) -> Iterator[SessionState]:
+    token = bind_session(session_id)
+    try:
+        yield get_state()
+    finally:
+        _current_session.reset(token)
+
+
+def session_id_of(context: Any) -> Optional[str]:
+    """Session id of an ADK tool or callback context, if it exposes one."""
+    invocation = getattr(context, "_invocation_context", None)
+    session = getattr(invocation, "session", None)
+    return getattr(session, "id", None)
+
+
+def session_events_of(context: Any) -> Optional[List[Any]]:
+    """Events of the ADK session behind a tool or callback context, if any."""
+    invocation = getattr(context, "_invocation_context", None)
+    events = getattr(getattr(invocation, "session", None), "events", None)
+    return events if isinstance(events, list) else None
+
+
+def drop_session(session_id: str) -> None:
+    _store.drop(session_id)
@@ -1,42 +1,63 @@
-import copy
 from typing import Any, Dict, List, Optional
 
-from .utils import extract_course_codes, normalize_course_code, parse_date_str
+from .session_store import Course, Preferences, SessionState, StateSnapshot, get_state
+from .study_plan import StudyPlan
+from .doc_scan import KIND_COURSE, course_dates, scan_message
+from .utils import normalize_course_code, parse_date_str
 
-DEFAULT_PREFERENCES: Dict[str, Any] = {
-    "daily_max_hours": 3.0,
-    "days_off": [],
-    "start_date": None,
-}
+DEFAULT_PREFERENCES: Dict[str, Any] = Preferences().to_dict()
 
-STATE: Dict[str, Any] = {
-    "courses": {},
-    "preferences": copy.deepcopy(DEFAULT_PREFERENCES),
-    "study_plan": [],
-}
 
+def _clean_changes() -> Dict[str, Any]:
+    return {"courses": [], "preferences": False}
 
-def _ensure_course(code: str) -> Dict[str, Any]:
+
+def mark_plan_changed(
+    courses: Optional[List[str]] = None, preferences: bool = False
+) -> None:
+    changes = get_state().plan_changes
+    if courses:
+        changes["courses"] = sorted(set(changes["courses"]) | set(courses))
+    if preferences:
+        changes["preferences"] = True
+
+
+def _update_course(code: str, **changes: Any) -> Course:
+    """Add or update a course, publishing a new state version."""
     code = normalize_course_code(code)
-    if code not in STATE["courses"]:
-        STATE["courses"][code] = {
-            "code": code,
-            "name": "",
-            "materials": [],
-            "exam_date": None,
-            "estimated_hours": None,
-        }
-    return STATE["courses"][code]
+    state = get_state()
+    course = state.courses.get(code)
+    if course is None:
+        course = Course(code, **changes)
+    elif changes:
+        course = course.replace(**changes)
+    else:
+        return course
+    state.put_course(course)
+    return course
+
+
+def _state_dict(state: SessionState) -> Dict[str, Any]:
+    snap: StateSnapshot = state.snapshot
+    return {
+        "courses": snap.courses_dict(),
+        "preferences": snap.preferences.to_dict(),
+        "study_plan": snap.plan_rows(),
+        "plan_changes": {
+            "courses": list(state.plan_changes["courses"]),
+            "preferences": state.plan_changes["preferences"],
+        },
+    }
 
 
 def show_state() -> Dict[str, Any]:
-    return copy.deepcopy(STATE)
+    return _state_dict(get_state())
 
 
 def reset_state() -> Dict[str, Any]:
-    STATE["courses"].clear()
-    STATE["preferences"] = copy.deepcopy(DEFAULT_PREFERENCES)
-    STATE["study_plan"] = []
+    state = get_state()
+    state.commit(courses={}, preferences=Preferences(), study_plan=StudyPlan())
+    state.plan_changes = _clean_changes()
     return show_state()
 
 
@@ -45,47 +66,76 @@ def set_preferences(
     days_off: Optional[List[str]] = None,
     start_date: Optional[str] = None,
 ) -> Dict[str, Any]:
-    prefs = STATE["preferences"]
-
+    state = get_state()
+    changes: Dict[str, Any] = {}
     if daily_max_hours is not None:
-        prefs["daily_max_hours"] = float(daily_max_hours)
+        changes["daily_max_hours"] = float(daily_max_hours)
     if days_off is not None:
-        prefs["days_off"] = [d.strip().lower() for d in days_off if d.strip()]
+        changes["days_off"] = tuple(d.strip().lower() for d in days_off if d.strip())
     if start_date:
         parsed = parse_date_str(start_date)
         if parsed is None:
             return {"ok": False, "message": "Could not parse start_date."}
-        prefs["start_date"] = parsed.isoformat()
+        changes["start_date"] = parsed.isoformat()
 
-    return {"ok": True, "preferences": copy.deepcopy(prefs)}
+    if changes:
+        state.commit(preferences=state.preferences.replace(**changes))
+        mark_plan_changed(preferences=True)
+    return {"ok": True, "preferences": state.preferences.to_dict()}
 
 
 def set_exam_dates(request: str) -> Dict[str, Any]:
-    date = parse_date_str(request)
-    if date is None:
-        return {"ok": False, "message": "Could not parse a date from that request."}
-
-    codes = extract_course_codes(request)
-    if not codes:
-        codes = list(STATE["courses"].keys())
+    mentions = scan_message(request)
+    dates = course_dates(mentions)
+    if not dates:
+        date = parse_date_str(request)
+        if date is None:
+            return {"ok": False, "message": "Could not parse a date from that request."}
+        codes = list(dict.fromkeys(v for _, _, kind, v in mentions if kind == KIND_COURSE))
         if not codes:
-            return {"ok": False, "message": "No courses found in state. Add materials first."}
+            codes = list(get_state().courses.keys())
+            if not codes:
+                return {"ok": False, "message": "No courses found in state. Add materials first."}
+        dates = {code: date.isoformat() for code in codes}
 
-    for code in codes:
-        course = _ensure_course(code)
-        course["exam_date"] = date.isoformat()
+    for code, date_iso in dates.items():
+        _update_course(code, exam_date=date_iso)
+    mark_plan_changed(courses=[normalize_course_code(code) for code in dates])
 
     return {
         "ok": True,
-        "exam_date": date.isoformat(),
-        "courses_updated": codes,
+        "exam_date": next(iter(dates.values())),
+        "exam_dates": dates,
+        "courses_updated": list(dates),
     }
 
 
+def add_material(
+    course_code: str,
+    path: str,
+    pages: Optional[int] = None,
+    chapters: Optional[List[int]] = None,
+) -> Dict[str, Any]:
+    if not course_code or not path:
+        return {"ok": False, "message": "course_code and path are required"}
+    course = _update_course(course_code)
+    material: Dict[str, Any] = {"path": path}
+    if pages is not None:
+        material["pages"] = int(pages)
+    if chapters:
+        material["chapters"] = sorted(set(chapters))
+    course = _update_course(
+        course.code,
+        materials=tuple(m for m in course.materials if m.get("path") != path) + (material,),
+    )
+    mark_plan_changed(courses=[course.code])
+    return {"ok": True, "course": course.to_dict()}
+
+
 def add_course(course_code: str, course_name: Optional[str] = None) -> Dict[str, Any]:
     if not course_code:
         return {"ok": False, "message": "course_code is required"}
-    course = _ensure_course(course_code)
-    if course_name:
-        course["name"] = course_name
-    return {"ok": True, "course": copy.deepcopy(course)}
+    changes = {"name": course_name} if course_name else {}
+    course = _update_course(course_code, **changes)
+    mark_plan_changed(courses=[course.code])
+    return {"ok": True, "course": course.to_dict()}
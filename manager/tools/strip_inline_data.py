@@ -1,15 +1,55 @@
 from __future__ import annotations
 
-import hashlib
-from typing import Any, List
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
 
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
-from google.genai import types
+
+from .blobs import process_peak_rss_kb, sha256_hex, should_spill, spill_blob
+from .context_budget import PRIORITY_REQUIRED, add_context
+from .pdf_probe import probe_pdf
+from .request_context import get_request_context
+from .session_store import session_events_of
+from .uploads import UploadRegistry, part_key
 
 _MAX_NOTE_NAMES = 3
 
 
+def _rss_growth(before: Optional[int]) -> Optional[int]:
+    """How far handling one upload raised the process's peak RSS, in KiB.
+
+    0 means the upload fit under an earlier peak, not that it used no memory.
+    """
+    after = process_peak_rss_kb()
+    if before is None or after is None:
+        return None
+    return after - before
+
+
+def _inline_parts(tool_context: Any, contents: List[Any]) -> List[Tuple[Optional[str], Any]]:
+    """(part_key or None, part) for every inline part to consider saving.
+
+    Taken from the session's events, where a part keeps its (event id,
+    index) across turns; without a session, from the request with no key.
+    """
+    events = session_events_of(tool_context)
+    if events is None:
+        return [
+            (None, part)
+            for content in contents
+            for part in getattr(content, "parts", None) or []
+            if getattr(part, "inline_data", None) is not None
+        ]
+    found = []
+    for event in events:
+        content = getattr(event, "content", None)
+        for index, part in enumerate(getattr(content, "parts", None) or []):
+            if getattr(part, "inline_data", None) is not None:
+                found.append((part_key(event.id, index), part))
+    return found
+
+
 def _guess_extension(mime: str) -> str:
     if not mime:
         return ""
@@ -31,20 +71,16 @@ def _guess_extension(mime: str) -> str:
     return ""
 
 
-def _init_upload_state(tool_context: ToolContext) -> tuple[dict, list]:
-    upload_index = tool_context.state.get("_upload_index")
-    if not isinstance(upload_index, dict):
-        upload_index = {}
-    upload_order = tool_context.state.get("_upload_order")
-    if not isinstance(upload_order, list):
-        upload_order = []
-    return upload_index, upload_order
-
-
 class StripInlineDataTool(BaseTool):
     """Strip inline_data parts to avoid large or invalid requests.
 
     Also persists uploads to session artifacts so they can be reused later.
+    Empty inline_data parts are dropped in the same pass, which lets
+    sanitize_inline_data skip its own walk inside the preprocessing pipeline.
+    Parts handled on an earlier turn are recognised by their place in the
+    session history without reading their bytes; a new part whose sha256
+    was already saved is not saved again. Large uploads are also spilled to
+    disk so later tools can map them instead of holding more copies.
     """
 
     def __init__(self) -> None:
@@ -66,72 +102,87 @@ class StripInlineDataTool(BaseTool):
         if not contents:
             return
 
-        upload_index, upload_order = _init_upload_state(tool_context)
+        ctx = get_request_context(tool_context, llm_request)
+        registry = UploadRegistry(tool_context.state)
 
         removed = 0
         saved = 0
         failed = 0
         saved_names: List[str] = []
+        upload_stats: List[Dict[str, Any]] = []
 
-        for content in contents:
-            parts = getattr(content, "parts", None)
-            if not parts:
+        for key, part in _inline_parts(tool_context, contents):
+            inline = part.inline_data
+            data = getattr(inline, "data", None)
+            mime = getattr(inline, "mime_type", "") or ""
+            if not data or (key is not None and registry.sha_for_part(key)):
+                continue
+
+            rss_before = process_peak_rss_kb()
+            # Hashing, probing and spilling are blocking; keep them off the
+            # event loop.
+            sha = await asyncio.to_thread(sha256_hex, data)
+            if sha in registry:
+                if key is not None:
+                    registry.remember(key, sha)
+                continue
+
+            ext = _guess_extension(mime)
+            filename = registry.unique_name(f"upload_{sha[:12]}", ext)
+
+            try:
+                tool_context.save_artifact(filename=filename, artifact=part)
+            except Exception:
+                failed += 1
                 continue
-            kept = []
-            for part in parts:
-                inline = getattr(part, "inline_data", None)
-                if inline is None:
-                    kept.append(part)
-                    continue
-
-                removed += 1
-                data = getattr(inline, "data", None)
-                mime = getattr(inline, "mime_type", "") or ""
-                if not data:
-                    continue
-
-                sha = hashlib.sha256(data).hexdigest()
-                if sha in upload_index:
-                    continue
-
-                ext = _guess_extension(mime)
-                filename = f"upload_{sha[:12]}{ext}"
-
-                if any(meta.get("name") == filename for meta in upload_index.values()):
-                    suffix = 1
-                    base = filename[:-len(ext)] if ext else filename
-                    while any(
-                        meta.get("name") == f"{base}_{suffix}{ext}"
-                        for meta in upload_index.values()
-                    ):
-                        suffix += 1
-                    filename = f"{base}_{suffix}{ext}"
-
-                try:
-                    tool_context.save_artifact(filename=filename, artifact=part)
-                except Exception:
-                    failed += 1
-                    continue
-
-                upload_index[sha] = {
+            ctx.record_saved(filename, part)
+
+            meta = {
+                "name": filename,
+                "mime": mime,
+                "bytes": len(data),
+                "sha": sha,
+            }
+            if "pdf" in mime.lower():
+                # Cheap trailer/page-tree probe; auto_attach falls back
+                # to a full parse when this returns None.
+                pdf_info = await asyncio.to_thread(probe_pdf, data)
+                if pdf_info is not None:
+                    meta["pdf"] = pdf_info
+            if should_spill(len(data)):
+                path = await asyncio.to_thread(spill_blob, sha, data)
+                if path is not None:
+                    meta["blob"] = path
+            registry.add(sha, meta)
+            if key is not None:
+                registry.remember(key, sha)
+            saved += 1
+            saved_names.append(filename)
+            upload_stats.append(
+                {
                     "name": filename,
-                    "mime": mime,
                     "bytes": len(data),
-                    "sha": sha,
+                    "spilled": "blob" in meta,
+                    "peak_rss_growth_kb": _rss_growth(rss_before),
                 }
-                if sha not in upload_order:
-                    upload_order.append(sha)
-                saved += 1
-                saved_names.append(filename)
+            )
 
-            content.parts = kept
+        for content in contents:
+            parts = getattr(content, "parts", None)
+            if not parts:
+                continue
+            kept = [part for part in parts if getattr(part, "inline_data", None) is None]
+            if len(kept) != len(parts):
+                removed += len(parts) - len(kept)
+                content.parts = kept
+        ctx.inline_data_stripped = True
+        registry.save()
 
         if removed:
-            tool_context.state["_upload_index"] = upload_index
-            tool_context.state["_upload_order"] = upload_order
             tool_context.state["_last_upload_saved"] = saved
             if saved_names:
                 tool_context.state["_last_upload_names"] = saved_names
+                tool_context.state["_last_upload_stats"] = upload_stats
 
             note = (
                 f"Note: {removed} uploaded file(s) were saved to this session "
@@ -147,13 +198,8 @@ class StripInlineDataTool(BaseTool):
                     preview += ", ..."
                 note += f" Saved: {preview}."
 
-            llm_request.contents.append(
-                types.Content(
-                    role="user",
-                    parts=[types.Part.from_text(text=note)],
-                )
-            )
+            add_context(llm_request, self.name, note, priority=PRIORITY_REQUIRED)
             tool_context.state["_inline_data_stripped_last"] = removed
 
 
-strip_inline_data_tool = StripInlineDataTool()
+strip_inline_data_tool = StripInlineDataTool()
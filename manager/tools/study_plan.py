@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import sys
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+CSV_HEADER = ("Date", "Course", "Focus", "Hours")
+# Course id of the placeholder entry that keeps a day with no tasks.
+NO_COURSE = 0xFFFF
+
+
+class PlanDay:
+    """One study day: ISO date, (course, hours) tasks and the day's total."""
+
+    __slots__ = ("date", "tasks", "total_hours")
+
+    def __init__(
+        self, date: str, tasks: Tuple[Tuple[str, float], ...], total_hours: float
+    ) -> None:
+        self.date = date
+        self.tasks = tasks
+        self.total_hours = total_hours
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "PlanDay":
+        return cls(
+            row["date"],
+            tuple((t["course"], t["hours"]) for t in row["tasks"]),
+            row["total_hours"],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "date": self.date,
+            "tasks": [{"course": c, "hours": h} for c, h in self.tasks],
+            "total_hours": self.total_hours,
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PlanDay):
+            return NotImplemented
+        return (self.date, self.tasks, self.total_hours) == (
+            other.date,
+            other.tasks,
+            other.total_hours,
+        )
+
+    def __repr__(self) -> str:
+        return f"PlanDay({self.date!r}, {self.tasks!r}, {self.total_hours!r})"
+
+
+class StudyPlan:
+    """Columnar study plan: one entry per (day, course) task.
+
+    Parallel arrays hold the day offset from `start` ('H'), an index into
+    the interned course codes ('H') and the hours ('f'). Hours are stored as
+    float32 and read back rounded to hundredths, which restores the exact
+    values the planners produce. A plan is never modified after it is built,
+    so it can be shared between readers without copying.
+    """
+
+    __slots__ = ("start", "courses", "day_offsets", "course_ids", "hours", "_day_count")
+
+    def __init__(
+        self,
+        start: Optional[dt.date] = None,
+        courses: Tuple[str, ...] = (),
+        day_offsets: Optional[array] = None,
+        course_ids: Optional[array] = None,
+        hours: Optional[array] = None,
+        day_count: int = 0,
+    ) -> None:
+        self.start = start
+        self.courses = courses
+        self.day_offsets = day_offsets if day_offsets is not None else array("H")
+        self.course_ids = course_ids if course_ids is not None else array("H")
+        self.hours = hours if hours is not None else array("f")
+        self._day_count = day_count
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "StudyPlan":
+        """Build from planner rows (dicts) or PlanDay objects, in date order."""
+        start: Optional[dt.date] = None
+        index: Dict[str, int] = {}
+        day_offsets = array("H")
+        course_ids = array("H")
+        hours = array("f")
+        day_count = 0
+        for row in rows:
+            day = row if isinstance(row, PlanDay) else PlanDay.from_row(row)
+            date = dt.date.fromisoformat(day.date)
+            if start is None:
+                start = date
+            offset = (date - start).days
+            day_count += 1
+            if not day.tasks:
+                day_offsets.append(offset)
+                course_ids.append(NO_COURSE)
+                hours.append(0.0)
+                continue
+            for course, task_hours in day.tasks:
+                course_id = index.get(course)
+                if course_id is None:
+                    course_id = index[course] = len(index)
+                day_offsets.append(offset)
+                course_ids.append(course_id)
+                hours.append(task_hours)
+        courses = tuple(sys.intern(code) for code in index)
+        return cls(start, courses, day_offsets, course_ids, hours, day_count)
+
+    def __len__(self) -> int:
+        """Number of study days."""
+        return self._day_count
+
+    def __bool__(self) -> bool:
+        return len(self.day_offsets) > 0
+
+    def __iter__(self) -> Iterator[PlanDay]:
+        return self.days()
+
+    def date_at(self, offset: int) -> str:
+        """ISO date of a day offset."""
+        return (self.start + dt.timedelta(days=offset)).isoformat()
+
+    def days(self, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[PlanDay]:
+        """Rows as PlanDay objects, optionally limited to since <= date < until."""
+        if self.start is None:
+            return
+        courses = self.courses
+        offsets = self.day_offsets
+        ids = self.course_ids
+        hours = self.hours
+        n = len(offsets)
+        i = 0
+        while i < n:
+            offset = offsets[i]
+            tasks = []
+            while i < n and offsets[i] == offset:
+                if ids[i] != NO_COURSE:
+                    tasks.append((courses[ids[i]], round(hours[i], 2)))
+                i += 1
+            date = self.date_at(offset)
+            if since is not None and date < since:
+                continue
+            if until is not None and date >= until:
+                break
+            total = round(sum(h for _, h in tasks), 2)
+            yield PlanDay(date, tuple(tasks), total)
+
+    def columns(self) -> Dict[str, Any]:
+        """Read-only views of the underlying arrays."""
+        return {
+            "start": self.start,
+            "courses": self.courses,
+            "day_offsets": memoryview(self.day_offsets).toreadonly(),
+            "course_ids": memoryview(self.course_ids).toreadonly(),
+            "hours": memoryview(self.hours).toreadonly(),
+        }
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        return [day.to_dict() for day in self.days()]
+
+    def write_csv(
+        self, out: TextIO, focus: Optional[Callable[[str, str], str]] = None
+    ) -> int:
+        """Write Date,Course,Focus,Hours rows straight from the arrays.
+
+        `focus(date, course)` fills the Focus column. Returns rows written.
+        """
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(CSV_HEADER)
+        if self.start is None:
+            return 0
+        rows = 0
+        dates: Dict[int, str] = {}
+        for offset, course_id, hours in zip(self.day_offsets, self.course_ids, self.hours):
+            if course_id == NO_COURSE:
+                continue
+            date = dates.get(offset)
+            if date is None:
+                date = dates[offset] = self.date_at(offset)
+            course = self.courses[course_id]
+            writer.writerow(
+                (date, course, focus(date, course) if focus else "", f"{round(hours, 2):g}")
+            )
+            rows += 1
+        return rows
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from .doc_scan import KIND_CHAPTERS, KIND_COURSE, Mention, exam_dates, scan_pages
+from .session_store import get_state
+from .state import _update_course, mark_plan_changed
+
+FACTS_KIND = "syllabus_facts:v1"
+MAX_EXAMS = 4
+MAX_COVERAGE = 6
+MAX_TITLE_WORDS = 8
+
+# Title-cased words right after a course code: "STAT 230 - Intro to Probability".
+_TITLE_RE = re.compile(
+    r"\s*[-:–—|]?\s*((?:[A-Z][\w&'’/-]*|and|of|for|to|in|the|&)"
+    r"(?:\s+(?:[A-Z][\w&'’/-]*|and|of|for|to|in|the|&|I{1,3}|IV)){0,%d})" % (MAX_TITLE_WORDS - 1)
+)
+# Snippets are whitespace-collapsed, so a title runs into the next line;
+# these words start the usual next lines of a course header.
+_TITLE_STOP = {
+    "Fall", "Winter", "Spring", "Summer", "Autumn", "Semester", "Term", "Session",
+    "Syllabus", "Course", "Outline", "Instructor", "Professor", "Lecturer", "Section",
+    "Lecture", "Lectures", "Office", "Room", "Department", "Faculty", "University",
+}
+_CODE_RE = re.compile(r"[A-Za-z]{2,4}\s?\d{3}")
+_TEXTBOOK_RE = re.compile(
+    r"\b(?:required\s+)?(?:text\s*books?|texts?|course\s+text|readings?)\s*[:\-–—]\s*"
+    r"(?P<title>[^;•]{5,160}?)(?=\s*(?:;|•|\.\s|\bISBN\b|$))",
+    re.IGNORECASE,
+)
+_ISBN_RE = re.compile(r"\bISBN(?:-1[03])?:?\s*([0-9Xx][0-9Xx -]{8,16}[0-9Xx])")
+_MIDTERM_RE = re.compile(r"mid-?term", re.IGNORECASE)
+
+
+def extract_facts(record: Dict[str, Any], today: Optional[dt.date] = None) -> Dict[str, Any]:
+    """Course, exams, chapter coverage and textbook from a PDF digest record.
+
+    Every fact carries the 1-based page it was read from. Only what is
+    found is included, so an empty dict means nothing was recognised.
+    """
+    snippets: Sequence[Sequence[Any]] = record.get("snippets") or []
+    mentions: List[Mention] = []
+    for page, text in snippets:
+        mentions.extend(scan_pages([text], today, first_page=page))
+
+    facts: Dict[str, Any] = {}
+    course = _course_fact(mentions, snippets)
+    if course:
+        facts["course"] = course
+
+    exams = exam_dates(mentions)
+    if course:
+        exams = [e for e in exams if e["course"] in (None, course["code"])]
+    exams.sort(key=lambda e: not _MIDTERM_RE.search(e["exam"]))
+    if exams:
+        facts["exams"] = [
+            {"exam": e["exam"], "date": e["date"], "page": e["page"]} for e in exams[:MAX_EXAMS]
+        ]
+
+    coverage = []
+    for page, _, kind, value in mentions:
+        if kind != KIND_CHAPTERS:
+            continue
+        entry = {"chapters": list(value), "page": page}
+        if entry not in coverage:
+            coverage.append(entry)
+    if coverage:
+        facts["coverage"] = coverage[:MAX_COVERAGE]
+
+    textbook = _textbook_fact(snippets)
+    if textbook:
+        facts["textbook"] = textbook
+    return facts
+
+
+def render_facts(name: str, record: Dict[str, Any], facts: Dict[str, Any]) -> str:
+    """One compact JSON line per upload; pages cite `name`."""
+    payload: Dict[str, Any] = {"source": name, "pages": record.get("pages", 0)}
+    payload.update(facts)
+    return f"Artifact {name} facts (JSON, page numbers cite this file): " + json.dumps(
+        payload, separators=(",", ":"), ensure_ascii=False
+    )
+
+
+def prefill_state(name: str, facts: Dict[str, Any]) -> Optional[str]:
+    """Record a syllabus's course, exam date and coverage in planner state.
+
+    Only documents that name a course and list an exam or chapters count
+    as syllabi; values already in state are kept. Returns the course code.
+    """
+    course = facts.get("course")
+    if not course or not (facts.get("exams") or facts.get("coverage")):
+        return None
+    code = course["code"]
+    existing = get_state().courses.get(code)
+    changes: Dict[str, Any] = {}
+    if course.get("title") and not (existing and existing.name):
+        changes["name"] = course["title"]
+    if facts.get("exams") and not (existing and existing.exam_date):
+        changes["exam_date"] = facts["exams"][0]["date"]
+    materials = existing.materials if existing else ()
+    if not any(m.get("path") == name for m in materials):
+        material: Dict[str, Any] = {"path": name}
+        if facts.get("coverage"):
+            material["coverage"] = [c["chapters"] for c in facts["coverage"]]
+        changes["materials"] = materials + (material,)
+    if existing is None or changes:
+        _update_course(code, **changes)
+        mark_plan_changed(courses=[code])
+    return code
+
+
+def _course_fact(
+    mentions: List[Mention], snippets: Sequence[Sequence[Any]]
+) -> Optional[Dict[str, Any]]:
+    counts: Dict[str, int] = {}
+    first: Dict[str, Mention] = {}
+    for mention in mentions:
+        if mention[2] == KIND_COURSE:
+            counts[mention[3]] = counts.get(mention[3], 0) + 1
+            first.setdefault(mention[3], mention)
+    if not counts:
+        return None
+    # Most mentioned wins; ties go to the code seen first.
+    code = max(counts, key=lambda c: (counts[c], -mentions.index(first[c])))
+    page, offset, _, _ = first[code]
+    fact: Dict[str, Any] = {"code": code, "page": page}
+    text = dict((p, t) for p, t in snippets).get(page, "")
+    code_match = _CODE_RE.match(text, offset)
+    match = _TITLE_RE.match(text, code_match.end()) if code_match else None
+    if match is not None:
+        title = match.group(1).rstrip()
+        words = title.split()
+        for i, word in enumerate(words):
+            if word in _TITLE_STOP:
+                words = words[:i]
+                break
+        while words and not words[-1][0].isupper():
+            words.pop()
+        if len(words) >= 2:
+            fact["title"] = " ".join(words)
+    return fact
+
+
+def _textbook_fact(snippets: Sequence[Sequence[Any]]) -> Optional[Dict[str, Any]]:
+    for page, text in snippets:
+        match = _TEXTBOOK_RE.search(text)
+        if match is None:
+            continue
+        fact: Dict[str, Any] = {"title": match.group("title").strip(" ,."), "page": page}
+        isbn = _ISBN_RE.search(text, match.start())
+        if isbn is not None:
+            fact["isbn"] = re.sub(r"[\s-]", "", isbn.group(1))
+        return fact
+    return None
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+INDEX_KEY = "_upload_index"
+ORDER_KEY = "_upload_order"
+NAMES_KEY = "_upload_names"
+SEEN_KEY = "_upload_seen"
+# Bumped whenever uploads, their summaries or the artifact set change, so
+# rendered views of them (artifact_memory) can be reused until then.
+VERSION_KEY = "_uploads_version"
+
+
+def part_key(event_id: str, index: int) -> str:
+    """Key of an inline part in the session history: its event and position."""
+    return f"{event_id}/{index}"
+
+
+def uploads_version(state: Any) -> int:
+    value = state.get(VERSION_KEY)
+    return value if isinstance(value, int) else 0
+
+
+def bump_uploads_version(state: Any) -> None:
+    state[VERSION_KEY] = uploads_version(state) + 1
+
+
+class UploadRegistry:
+    """Session uploads keyed by sha256, with name and history-part lookups.
+
+    `_upload_index` (sha -> meta) and `_upload_order` stay the source of
+    truth; `_upload_names` (name -> sha) and `_upload_seen` (part_key ->
+    sha, for inline parts already handled) are secondary indexes kept
+    alongside them in session state.
+    """
+
+    def __init__(self, state: Any) -> None:
+        self._state = state
+        index = state.get(INDEX_KEY)
+        self.index: Dict[str, Dict[str, Any]] = index if isinstance(index, dict) else {}
+        order = state.get(ORDER_KEY)
+        self.order: List[str] = order if isinstance(order, list) else []
+        names = state.get(NAMES_KEY)
+        self.names: Dict[str, str] = names if isinstance(names, dict) else {}
+        seen = state.get(SEEN_KEY)
+        self.seen: Dict[str, str] = seen if isinstance(seen, dict) else {}
+        self._dirty = False
+        self._added = False
+        if len(self.names) != len(self.index):
+            # Sessions from before the name index existed, or edited by hand.
+            self.names = {
+                meta["name"]: sha
+                for sha, meta in self.index.items()
+                if isinstance(meta, dict) and meta.get("name")
+            }
+            self._dirty = True
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self.index
+
+    def sha_for_name(self, name: str) -> Optional[str]:
+        return self.names.get(name)
+
+    def meta_for_name(self, name: str) -> Optional[Dict[str, Any]]:
+        sha = self.names.get(name)
+        meta = self.index.get(sha) if sha else None
+        return meta if isinstance(meta, dict) else None
+
+    def sha_for_part(self, key: str) -> Optional[str]:
+        return self.seen.get(key)
+
+    def remember(self, key: str, sha: str) -> None:
+        if self.seen.get(key) != sha:
+            self.seen[key] = sha
+            self._dirty = True
+
+    def unique_name(self, base: str, ext: str) -> str:
+        filename = f"{base}{ext}"
+        suffix = 1
+        while filename in self.names:
+            filename = f"{base}_{suffix}{ext}"
+            suffix += 1
+        return filename
+
+    def add(self, sha: str, meta: Dict[str, Any]) -> None:
+        self.index[sha] = meta
+        self.names[meta["name"]] = sha
+        if sha not in self.order:
+            self.order.append(sha)
+        self._dirty = True
+        self._added = True
+
+    def touch(self) -> None:
+        """Mark the index changed after editing a meta dict in place."""
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self._state[INDEX_KEY] = self.index
+        self._state[ORDER_KEY] = self.order
+        self._state[NAMES_KEY] = self.names
+        self._state[SEEN_KEY] = self.seen
+        self._dirty = False
+        if self._added:
+            bump_uploads_version(self._state)
+            self._added = False
@@ -2,17 +2,73 @@ from __future__ import annotations
 
 import datetime as dt
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List, Optional
-
-try:
-    from dateutil import parser as date_parser  # type: ignore
-except Exception:  # pragma: no cover
-    date_parser = None
+from typing import Any, Iterable, List, Optional, Tuple
 
 COURSE_CODE_RE = re.compile(r"\b([A-Z]{2,4}\s?\d{3})\b", re.IGNORECASE)
 PDF_PATH_RE = re.compile(r"([A-Za-z]:\\[^\r\n\"]+?\.pdf)", re.IGNORECASE)
 PDF_NAME_RE = re.compile(r"([^\\/]+\.pdf)", re.IGNORECASE)
+WEEKDAYS = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
+MONTHS = {
+    name: i + 1
+    for i, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+    )
+}
+NUMBER_WORDS = {
+    "a": 1,
+    "an": 1,
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "eleven": 11,
+    "twelve": 12,
+}
+DATE_CACHE_SIZE = 1024
+
+_MONTH = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|"
+    r"aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+)
+_NUMBER = r"\d{1,4}|" + "|".join(NUMBER_WORDS)
+_ORDINAL = r"(?:st|nd|rd|th)?"
+# One alternation, so a single scan finds every date phrase in order. Kept
+# as a verbose pattern string so other scanners can embed it. A number
+# before "Month day" is a label ("Midterm 2 Nov 14"), not the day, so the
+# day-month form gives way when the month is followed by a day.
+DATE_PATTERN = rf"""
+      (?P<iso_y>\d{{4}})[-/.](?P<iso_m>\d{{1,2}})[-/.](?P<iso_d>\d{{1,2}})(?!\d)
+    | (?P<us_m>\d{{1,2}})/(?P<us_d>\d{{1,2}})/(?P<us_y>\d{{4}})\b
+    | (?P<md_mon>{_MONTH})\s+(?P<md_day>\d{{1,2}}){_ORDINAL}(?:,?\s+(?P<md_year>\d{{4}}))?\b
+    | (?P<dm_day>\d{{1,2}}){_ORDINAL}\s+(?:of\s+)?(?P<dm_mon>{_MONTH})(?!\s+\d{{1,2}}{_ORDINAL}\b(?!:))
+      (?:,?\s+(?P<dm_year>\d{{4}}))?\b
+    | (?P<word>today|tomorrow|yesterday)\b
+    | in\s+(?P<in_n>{_NUMBER})\s+(?P<in_unit>day|week)s?\b
+    | (?P<fwd_n>{_NUMBER})\s+(?P<fwd_unit>day|week)s?\s+from\s+(?:now|today)\b
+    | (?P<ago_n>{_NUMBER})\s+(?P<ago_unit>day|week)s?\s+(?:ago|before\s+today)\b
+    | next\s+(?P<next>{"|".join(WEEKDAYS)})\b
+"""
+DATE_RE = re.compile(rf"\b(?:{DATE_PATTERN})", re.IGNORECASE | re.VERBOSE)
+YEAR_RE = re.compile(r"\b\d{4}\b")
+WORD_OFFSETS = {"today": 0, "tomorrow": 1, "yesterday": -1}
+
+_date_parser: Any = None
 
 
 def normalize_course_code(code: str) -> str:
@@ -49,65 +105,105 @@ def resolve_path(candidate: str, search_dirs: Iterable[Path]) -> Optional[Path]:
 
 
 def parse_date_str(text: str, today: Optional[dt.date] = None) -> Optional[dt.date]:
+    """First date in free text, relative to `today` (default: the system date).
+
+    Explicit dates (ISO, "Nov 2", "2nd of November 2026", month-first
+    "10/28/2026") win over relative phrases (today/tomorrow/yesterday,
+    "in N days|weeks", "N days ago", "next friday"). A month and day
+    without a year that has already passed this year means next year.
+    dateutil's fuzzy parser is only imported and tried when nothing here
+    matches. Results are cached per (text, today).
+    """
     if not text:
         return None
-    if today is None:
-        today = dt.date.today()
-
-    t = text.lower()
-
-    if "today" in t:
-        return today
-    if "tomorrow" in t:
-        return today + dt.timedelta(days=1)
-    if "yesterday" in t:
-        return today - dt.timedelta(days=1)
-
-    for pattern in [
-        r"in\s+(\d+)\s+days?",
-        r"(\d+)\s+days?\s+from\s+now",
-        r"(\d+)\s+days?\s+from\s+today",
-    ]:
-        m = re.search(pattern, t)
-        if m:
-            return today + dt.timedelta(days=int(m.group(1)))
-
-    for pattern in [
-        r"(\d+)\s+days?\s+ago",
-        r"(\d+)\s+days?\s+before\s+today",
-    ]:
-        m = re.search(pattern, t)
-        if m:
-            return today - dt.timedelta(days=int(m.group(1)))
-
-    m = re.search(r"next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)", t)
-    if m:
-        target = [
-            "monday",
-            "tuesday",
-            "wednesday",
-            "thursday",
-            "friday",
-            "saturday",
-            "sunday",
-        ].index(m.group(1))
-        days_ahead = (target - today.weekday() + 7) % 7
-        if days_ahead == 0:
-            days_ahead = 7
+    return _parse_date_cached(text, today or dt.date.today())
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_cached(text: str, today: dt.date) -> Optional[dt.date]:
+    relative: Optional[dt.date] = None
+    for m in DATE_RE.finditer(text):
+        absolute, found = date_from_match(m, today)
+        if absolute and found is not None:
+            return found
+        if not absolute and relative is None:
+            relative = found
+    if relative is not None:
+        return relative
+    return _fuzzy_date(text, today)
+
+
+def date_from_match(m: "re.Match[str]", today: dt.date) -> Tuple[bool, Optional[dt.date]]:
+    """(is_absolute, date) for a match of DATE_PATTERN; date is None if invalid."""
+    if m.group("iso_y"):
+        return True, _make_date(m.group("iso_y"), m.group("iso_m"), m.group("iso_d"), today)
+    if m.group("us_y"):
+        return True, _make_date(m.group("us_y"), m.group("us_m"), m.group("us_d"), today)
+    if m.group("md_mon"):
+        return True, _make_date(m.group("md_year"), m.group("md_mon"), m.group("md_day"), today)
+    if m.group("dm_mon"):
+        return True, _make_date(m.group("dm_year"), m.group("dm_mon"), m.group("dm_day"), today)
+    return False, _relative_date(m, today)
+
+
+def _make_date(
+    year: Optional[str], month: str, day: str, today: dt.date
+) -> Optional[dt.date]:
+    month_num = int(month) if month.isdigit() else MONTHS[month[:3].lower()]
+    try:
+        if year is not None:
+            return dt.date(int(year), month_num, int(day))
+        found = dt.date(today.year, month_num, int(day))
+    except ValueError:
+        return None
+    if found < today:
+        try:
+            found = found.replace(year=today.year + 1)
+        except ValueError:  # Feb 29 without a leap year next year
+            return None
+    return found
+
+
+def _relative_date(m: "re.Match[str]", today: dt.date) -> Optional[dt.date]:
+    word = m.group("word")
+    if word:
+        return today + dt.timedelta(days=WORD_OFFSETS[word.lower()])
+    nxt = m.group("next")
+    if nxt:
+        days_ahead = (WEEKDAYS.index(nxt.lower()) - today.weekday() + 7) % 7 or 7
         return today + dt.timedelta(days=days_ahead)
+    for prefix, sign in (("in", 1), ("fwd", 1), ("ago", -1)):
+        count = m.group(f"{prefix}_n")
+        if count:
+            count = count.lower()
+            days = int(count) if count.isdigit() else NUMBER_WORDS[count]
+            if m.group(f"{prefix}_unit").lower() == "week":
+                days *= 7
+            return today + dt.timedelta(days=sign * days)
+    return None
+
 
-    if date_parser is None:
+def _fuzzy_date(text: str, today: dt.date) -> Optional[dt.date]:
+    global _date_parser
+    if _date_parser is None:
+        try:
+            from dateutil import parser as date_parser  # type: ignore
+        except Exception:  # pragma: no cover
+            _date_parser = False
+            return None
+        _date_parser = date_parser
+    if _date_parser is False:
         return None
 
     try:
         default_dt = dt.datetime.combine(today, dt.time())
-        parsed = date_parser.parse(text, fuzzy=True, default=default_dt)
+        parsed = _date_parser.parse(text, fuzzy=True, default=default_dt)
     except Exception:
         return None
 
     parsed_date = parsed.date()
-    has_year = re.search(r"\b\d{4}\b", text) is not None
+    has_year = YEAR_RE.search(text) is not None
     if not has_year and parsed_date < today:
         parsed_date = parsed_date.replace(year=parsed_date.year + 1)
 
-    return parsed_date
+    return parsed_date